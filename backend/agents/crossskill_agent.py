@@ -137,7 +137,7 @@ class CrossSkillAgent:
     def _find_cross_opportunities(self, state: CrossSkillState) -> CrossSkillState:
         """Find specific cross-skilling opportunities"""
         try:
-            current_skills = set(state["skills"])
+            current_skills = set(TeamUtils.canonical_skills(state["skills"]))
             adjacent_roles = state["adjacent_roles"]
             industry_trends = state["industry_trends"]
             
@@ -148,18 +148,17 @@ class CrossSkillAgent:
                 adjacent_skills.update(role_skills.get("core_skills", []))
                 adjacent_skills.update(role_skills.get("advanced_skills", []))
             
-            # Find skills that complement current skills
+            # Find skills that complement current skills (held skills are matched by canonical name)
             complementary_skills = []
-            for skill in adjacent_skills:
-                if skill not in current_skills:
-                    # Check if it's complementary to current skills
-                    if self._is_complementary_skill(skill, current_skills, state["role"]):
-                        complementary_skills.append(skill)
+            for skill in TeamUtils.missing_skills(sorted(adjacent_skills), state["skills"]):
+                # Check if it's complementary to current skills
+                if self._is_complementary_skill(skill, current_skills, state["role"]):
+                    complementary_skills.append(skill)
             
             # Add industry trend skills
             trend_skills = []
-            for trend in industry_trends:
-                if trend not in current_skills and trend not in complementary_skills:
+            for trend in TeamUtils.missing_skills(industry_trends, state["skills"]):
+                if trend not in complementary_skills:
                     trend_skills.append(trend)
             
             # Combine and prioritize
@@ -204,13 +203,10 @@ class CrossSkillAgent:
             role = state["role"]
             opportunities = state["cross_skill_opportunities"]
             
-            # Search for cross-functional skills
+            # Cross-functional and emerging skills, searched in one batch
             cross_query = f"cross-functional skills interdisciplinary {role} adjacent roles"
-            cross_docs = self.vectorstore.search(cross_query, k=3)
-            
-            # Search for emerging skills
             trends_query = f"emerging skills technology trends career development"
-            trends_docs = self.vectorstore.search(trends_query, k=2)
+            cross_docs, trends_docs = self.vectorstore.search_many([cross_query, trends_query], k=[3, 2])
             
             # Combine documents
             all_docs = cross_docs + trends_docs
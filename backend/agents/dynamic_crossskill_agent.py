@@ -1,8 +1,10 @@
+import asyncio
 from langgraph.graph import StateGraph, END
 from typing import Dict, Any, List, TypedDict
 from llm.groq_client import DynamicSkillRecommender
 from data_sources.trend_analyzer import TrendAnalyzer
 from models.schemas import SkillRecommendation
+from team_parser.utils import TeamUtils
 import logging
 
 logger = logging.getLogger(__name__)
@@ -171,13 +173,12 @@ class DynamicCrossSkillAgent:
         
         return state
     
-    def _analyze_cross_opportunities(self, state: DynamicCrossSkillState) -> DynamicCrossSkillState:
+    async def _analyze_cross_opportunities(self, state: DynamicCrossSkillState) -> DynamicCrossSkillState:
         """Analyze cross-skilling opportunities based on trends and adjacent roles"""
         try:
             trends = state["trends_data"].get("trends", [])
             cross_trends = state["trends_data"].get("cross_trends", [])
             adjacent_roles = state["adjacent_roles"]
-            current_skills = set(state["skills"])
             
             # Extract cross-skilling opportunities from trends
             cross_opportunities = set()
@@ -211,10 +212,13 @@ class DynamicCrossSkillAgent:
                     if skill in trend_text:
                         cross_opportunities.add(skill.title())
             
-            # Filter out skills already possessed
-            new_cross_opportunities = cross_opportunities - current_skills
+            # Filter out skills already possessed, under any name
+            # (in a thread: unseen skills are embedded by the model)
+            new_cross_opportunities = await asyncio.to_thread(
+                TeamUtils.missing_skills, sorted(cross_opportunities), state["skills"]
+            )
             
-            state["cross_opportunities"] = list(new_cross_opportunities)
+            state["cross_opportunities"] = new_cross_opportunities
             
             logger.info(f"Identified {len(new_cross_opportunities)} cross-skilling opportunities")
             
@@ -1,8 +1,10 @@
+import asyncio
 from langgraph.graph import StateGraph, END
 from typing import Dict, Any, List, TypedDict
 from llm.groq_client import DynamicSkillRecommender
 from data_sources.trend_analyzer import TrendAnalyzer
 from models.schemas import SkillRecommendation
+from team_parser.utils import TeamUtils
 import logging
 
 logger = logging.getLogger(__name__)
@@ -83,11 +85,10 @@ class DynamicUpskillAgent:
         
         return state
     
-    def _analyze_skill_gaps(self, state: DynamicAgentState) -> DynamicAgentState:
+    async def _analyze_skill_gaps(self, state: DynamicAgentState) -> DynamicAgentState:
         """Analyze skill gaps based on current trends"""
         try:
             trends = state["trends_data"].get("trends", [])
-            current_skills = set(state["skills"])
             
             # Extract trending skills from trends data
             trending_skills = set()
@@ -103,12 +104,15 @@ class DynamicUpskillAgent:
                         if keyword in title:
                             trending_skills.add(keyword.title())
             
-            # Identify missing trending skills
-            missing_trending_skills = trending_skills - current_skills
+            # Identify missing trending skills, matching aliases such as "K8s" / "Kubernetes"
+            # (in a thread: unseen skills are embedded by the model)
+            missing_trending_skills = await asyncio.to_thread(
+                TeamUtils.missing_skills, sorted(trending_skills), state["skills"]
+            )
             
             # Add to state for recommendation generation
             state["trending_skills"] = list(trending_skills)
-            state["missing_trending_skills"] = list(missing_trending_skills)
+            state["missing_trending_skills"] = missing_trending_skills
             
             logger.info(f"Identified {len(missing_trending_skills)} trending skills not in current skill set")
             
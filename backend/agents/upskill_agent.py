@@ -84,17 +84,14 @@ class UpskillAgent:
     def _identify_skill_gaps(self, state: AgentState) -> AgentState:
         """Identify missing core skills and potential advanced skills"""
         try:
-            current_skills = set(state["skills"])
             role_skills = state["role_skills"]
             years_experience = state["years_experience"]
             
             # Find missing core skills
-            core_skills = set(role_skills.get("core_skills", []))
-            missing_core = list(core_skills - current_skills)
+            missing_core = TeamUtils.missing_skills(role_skills.get("core_skills", []), state["skills"])
             
             # Identify advanced skills based on experience
-            advanced_skills = set(role_skills.get("advanced_skills", []))
-            available_advanced = list(advanced_skills - current_skills)
+            available_advanced = TeamUtils.missing_skills(role_skills.get("advanced_skills", []), state["skills"])
             
             # Filter advanced skills based on experience level
             if years_experience and years_experience >= 3:
@@ -120,13 +117,10 @@ class UpskillAgent:
             role = state["role"]
             skills = state["skills"]
             
-            # Search for role-specific documents
+            # Role-specific and skill-specific documents, searched in one batch
             role_query = f"{role} role skills career development requirements"
-            role_docs = self.vectorstore.search(role_query, k=3)
-            
-            # Search for skill-specific documents
             skills_query = f"skills: {', '.join(skills)}"
-            skills_docs = self.vectorstore.search(skills_query, k=2)
+            role_docs, skills_docs = self.vectorstore.search_many([role_query, skills_query], k=[3, 2])
             
             # Combine documents
             all_docs = role_docs + skills_docs
@@ -1,17 +1,26 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from typing import IO, List, Optional
 import os
 import tempfile
 from models.schemas import (
     TeamUploadRequest, 
     TeamUploadResponse, 
     IngestRequest, 
-    IngestResponse,
-    TeamMember
+    IngestJobResponse,
+    IngestJobStatus,
+    TeamMember,
+    DocumentSearchRequest,
+    DocumentSearchResult
 )
 from team_parser.parser import TeamParser
 from vectorizer.vectorstore import SkillVectorStore
-from vectorizer.embedder import SkillEmbedder
+from vectorizer.registry import DEFAULT_COLLECTION, get_registry, validate_collection_name
+from vectorizer.skill_index import observe_skills
+from ingestion.loaders import SUPPORTED_DOCUMENT_TYPES
+from ingestion.jobs import IngestionJob, QueueFullError, get_job_queue, peek_job_queue
+from data_sources.prewarm import get_trend_prewarmer
+from config import Config
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,10 +34,82 @@ def get_team_parser() -> TeamParser:
     """Get team parser instance"""
     return TeamParser()
 
-def get_vectorstore() -> SkillVectorStore:
-    """Get vector store instance"""
-    embedder = SkillEmbedder()
-    return SkillVectorStore(embedder)
+def warm_team_roles(roles: List[str]):
+    """Prefetch trends in the background for roles of a newly ingested team"""
+    if Config.TREND_PREWARM_ENABLED and roles:
+        get_trend_prewarmer().schedule(roles)
+
+async def observe_team_skills(team_members: List[TeamMember]):
+    """Add a newly ingested team's skills to the skill vocabulary index"""
+    skills = [skill for member in team_members for skill in member.skills]
+    if Config.SKILL_INDEX_ENABLED and skills:
+        await run_in_threadpool(observe_skills, skills)
+
+async def get_vectorstore(collection: str = DEFAULT_COLLECTION, create: bool = False) -> SkillVectorStore:
+    """Get the shared vector store of a collection (only ingestion creates new collections)"""
+    try:
+        # Off the event loop: the first use of a collection opens its files and may load the model
+        return await run_in_threadpool(get_registry().get_vectorstore, collection, create=create)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+async def copy_upload(file: UploadFile, destination: IO[bytes]) -> int:
+    """
+    Copy an upload into a file in Config.UPLOAD_CHUNK_BYTES pieces
+    
+    Only one piece is held in memory at a time, and the size limit is
+    checked as the bytes arrive rather than after the whole file is read.
+    
+    Args:
+        file: Uploaded file
+        destination: Binary file to write to
+        
+    Returns:
+        Number of bytes copied
+        
+    Raises:
+        HTTPException: 413 if the upload is larger than Config.UPLOAD_MAX_BYTES
+    """
+    if file.size is not None and file.size > Config.UPLOAD_MAX_BYTES:
+        raise upload_too_large(file)
+    
+    copied = 0
+    while True:
+        chunk = await file.read(Config.UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            return copied
+        copied += len(chunk)
+        if copied > Config.UPLOAD_MAX_BYTES:
+            raise upload_too_large(file)
+        destination.write(chunk)
+
+def upload_too_large(file: UploadFile) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File '{file.filename}' is larger than the {Config.UPLOAD_MAX_BYTES} byte upload limit"
+    )
+
+async def save_upload(file: UploadFile, suffix: str) -> str:
+    """
+    Stream an upload to a named temporary file
+    
+    Args:
+        file: Uploaded file
+        suffix: File name suffix (the extension loaders expect)
+        
+    Returns:
+        Path of the temporary file; the caller deletes it
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        try:
+            await copy_upload(file, temp_file)
+        except BaseException:
+            temp_file.close()
+            os.unlink(temp_file.name)
+            raise
+    return temp_file.name
 
 @router.post("/ingest/team", response_model=TeamUploadResponse)
 async def ingest_team_data(request: TeamUploadRequest):
@@ -46,8 +127,8 @@ async def ingest_team_data(request: TeamUploadRequest):
         
         team_parser = get_team_parser()
         
-        # Validate team data
-        validation_result = team_parser.validate_team_data(request.team_data)
+        # Validate team data (off the event loop: canonicalizing skills may embed them)
+        validation_result = await run_in_threadpool(team_parser.validate_team_data, request.team_data)
         
         if not validation_result["valid"]:
             raise HTTPException(
@@ -61,6 +142,8 @@ async def ingest_team_data(request: TeamUploadRequest):
         # Store team data in memory
         global team_data_store
         team_data_store = request.team_data
+        warm_team_roles(roles_found)
+        await observe_team_skills(request.team_data)
         
         response = TeamUploadResponse(
             message="Team data ingested successfully",
@@ -107,49 +190,45 @@ async def ingest_team_file(
                 detail=f"File extension ({file_ext}) doesn't match file type ({file_type})"
             )
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_type}") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        try:
+        # Spool the upload (in memory up to Config.UPLOAD_SPOOL_BYTES, then on disk) and parse it from there
+        with tempfile.SpooledTemporaryFile(max_size=Config.UPLOAD_SPOOL_BYTES) as spool:
+            await copy_upload(file, spool)
+            spool.seek(0)
+            
             # Parse team data
             team_parser = get_team_parser()
             
             if file_type == "csv":
-                team_members = team_parser.parse_csv(temp_file_path)
+                team_members = team_parser.parse_csv(spool)
             else:  # json
-                team_members = team_parser.parse_json(temp_file_path)
-            
-            # Validate parsed data
-            validation_result = team_parser.validate_team_data(team_members)
+                team_members = team_parser.parse_json(spool)
             
-            if not validation_result["valid"]:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Invalid team data: {validation_result['errors']}"
-                )
-            
-            # Extract unique roles
-            roles_found = list(set(member.role for member in team_members))
-            
-            # Store team data in memory
-            global team_data_store
-            team_data_store = team_members
-            
-            response = TeamUploadResponse(
-                message=f"Team file '{file.filename}' ingested successfully",
-                team_size=len(team_members),
-                roles_found=roles_found
+        # Validate parsed data (off the event loop: canonicalizing skills may embed them)
+        validation_result = await run_in_threadpool(team_parser.validate_team_data, team_members)
+        
+        if not validation_result["valid"]:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Invalid team data: {validation_result['errors']}"
             )
-            
-            logger.info(f"Successfully ingested team file: {len(team_members)} members, {len(roles_found)} roles")
-            return response
-            
-        finally:
-            # Clean up temporary file
-            os.unlink(temp_file_path)
+        
+        # Extract unique roles
+        roles_found = list(set(member.role for member in team_members))
+        
+        # Store team data in memory
+        global team_data_store
+        team_data_store = team_members
+        warm_team_roles(roles_found)
+        await observe_team_skills(team_members)
+        
+        response = TeamUploadResponse(
+            message=f"Team file '{file.filename}' ingested successfully",
+            team_size=len(team_members),
+            roles_found=roles_found
+        )
+        
+        logger.info(f"Successfully ingested team file: {len(team_members)} members, {len(roles_found)} roles")
+        return response
         
     except HTTPException:
         raise
@@ -157,16 +236,51 @@ async def ingest_team_file(
         logger.error(f"Failed to ingest team file: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to ingest team file: {str(e)}")
 
-@router.post("/ingest/documents", response_model=IngestResponse)
+def submit_document_job(file_path: str, document_type: str, source: str, collection: str,
+                        delete_file: bool = False) -> IngestJobResponse:
+    """
+    Queue a document for background ingestion
+    
+    Args:
+        file_path: Path to the document
+        document_type: Type of document (pdf, docx, txt)
+        source: Name recorded as the chunks' source
+        collection: Collection to ingest into
+        delete_file: Remove the file once the job has finished (uploaded temporary files)
+        
+    Returns:
+        IngestJobResponse with the job id and where to poll its status
+    """
+    # Rejects invalid collection names before the job is queued; the worker loads the store
+    try:
+        validate_collection_name(collection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        job = get_job_queue().submit(IngestionJob(file_path, document_type, source, collection, delete_file))
+    except QueueFullError as e:
+        raise queue_full(str(e))
+    
+    return IngestJobResponse(
+        job_id=job.id,
+        state=job.state,
+        status_url=f"/api/v1/ingest/jobs/{job.id}"
+    )
+
+def queue_full(detail: str) -> HTTPException:
+    """503 telling the client when to retry a submission rejected by a full ingestion queue"""
+    return HTTPException(status_code=503, detail=detail, headers={"Retry-After": str(Config.INGEST_RETRY_AFTER)})
+
+@router.post("/ingest/documents", response_model=IngestJobResponse, status_code=202)
 async def ingest_documents(request: IngestRequest):
     """
-    Ingest documents for the RAG pipeline
+    Queue a document for ingestion into the RAG pipeline
     
     Args:
         request: Document ingestion request
         
     Returns:
-        IngestResponse with processing results
+        IngestJobResponse with the id of the ingestion job
     """
     try:
         logger.info(f"Ingesting document: {request.file_path}")
@@ -176,110 +290,55 @@ async def ingest_documents(request: IngestRequest):
             raise HTTPException(status_code=404, detail=f"File not found: {request.file_path}")
         
         # Validate document type
-        if request.document_type not in ["pdf", "docx", "txt"]:
+        if request.document_type not in SUPPORTED_DOCUMENT_TYPES:
             raise HTTPException(status_code=400, detail="Document type must be 'pdf', 'docx', or 'txt'")
         
-        # Process document based on type
-        documents = []
-        metadata = []
-        
-        if request.document_type == "txt":
-            with open(request.file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                documents.append(content)
-                metadata.append({"source": os.path.basename(request.file_path)})
-        
-        elif request.document_type == "pdf":
-            try:
-                import PyPDF2
-                with open(request.file_path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    for page_num, page in enumerate(pdf_reader.pages):
-                        content = page.extract_text()
-                        if content.strip():
-                            documents.append(content)
-                            metadata.append({
-                                "source": os.path.basename(request.file_path),
-                                "page": page_num + 1
-                            })
-            except ImportError:
-                raise HTTPException(status_code=500, detail="PyPDF2 not available for PDF processing")
-        
-        elif request.document_type == "docx":
-            try:
-                from docx import Document
-                doc = Document(request.file_path)
-                content = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-                documents.append(content)
-                metadata.append({"source": os.path.basename(request.file_path)})
-            except ImportError:
-                raise HTTPException(status_code=500, detail="python-docx not available for DOCX processing")
-        
-        # Add documents to vector store
-        vectorstore = get_vectorstore()
-        vectorstore.add_documents(documents, metadata)
-        
-        response = IngestResponse(
-            message=f"Document '{os.path.basename(request.file_path)}' ingested successfully",
-            documents_processed=1,
-            chunks_created=len(documents)
+        return submit_document_job(
+            request.file_path, request.document_type, os.path.basename(request.file_path), request.collection
         )
         
-        logger.info(f"Successfully ingested document: {len(documents)} chunks created")
-        return response
-        
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Failed to ingest document: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to ingest document: {str(e)}")
 
-@router.post("/ingest/documents/file")
+@router.post("/ingest/documents/file", response_model=IngestJobResponse, status_code=202)
 async def ingest_document_file(
     file: UploadFile = File(...),
-    document_type: str = Form(...)
+    document_type: str = Form(...),
+    collection: str = Form(DEFAULT_COLLECTION)
 ):
     """
-    Ingest document from uploaded file
+    Queue an uploaded document for ingestion
     
     Args:
         file: Uploaded document file
         document_type: Type of document (pdf, docx, txt)
+        collection: Collection to ingest into
         
     Returns:
-        IngestResponse with processing results
+        IngestJobResponse with the id of the ingestion job
     """
     try:
         logger.info(f"Ingesting document file: {file.filename}, type: {document_type}")
         
         # Validate document type
-        if document_type not in ["pdf", "docx", "txt"]:
+        if document_type not in SUPPORTED_DOCUMENT_TYPES:
             raise HTTPException(status_code=400, detail="Document type must be 'pdf', 'docx', or 'txt'")
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{document_type}") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Don't bother saving an upload that would be rejected
+        if get_job_queue().is_full():
+            raise queue_full("Ingestion queue is full")
+        
+        # Save uploaded file temporarily; the job deletes it once ingested
+        temp_file_path = await save_upload(file, f".{document_type}")
         
         try:
-            # Create ingest request
-            request = IngestRequest(
-                file_path=temp_file_path,
-                document_type=document_type
-            )
-            
-            # Process document
-            response = await ingest_documents(request)
-            
-            # Update message to include filename
-            response.message = f"Document '{file.filename}' ingested successfully"
-            
-            return response
-            
-        finally:
-            # Clean up temporary file
+            return submit_document_job(temp_file_path, document_type, file.filename, collection, delete_file=True)
+        except BaseException:
             os.unlink(temp_file_path)
+            raise
         
     except HTTPException:
         raise
@@ -287,32 +346,183 @@ async def ingest_document_file(
         logger.error(f"Failed to ingest document file: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to ingest document file: {str(e)}")
 
+@router.get("/ingest/jobs/{job_id}", response_model=IngestJobStatus)
+async def get_ingest_job(job_id: str):
+    """
+    Get the state and progress of an ingestion job
+    
+    Args:
+        job_id: Id returned when the document was submitted
+        
+    Returns:
+        IngestJobStatus with the job's stage, running counts and, once finished, its result or error
+    """
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job not found: {job_id}")
+    return job.get_status()
+
+@router.get("/ingest/jobs")
+async def list_ingest_jobs(limit: int = 50):
+    """List recent ingestion jobs, newest first, with queue throughput"""
+    try:
+        job_queue = get_job_queue()
+        return {
+            "jobs": [job.get_status() for job in job_queue.list_jobs(limit)],
+            "queue": job_queue.get_stats()
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to list ingestion jobs: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to list ingestion jobs: {str(e)}")
+
 @router.delete("/ingest/clear")
-async def clear_vectorstore():
-    """Clear all documents from the vector store"""
+async def clear_vectorstore(collection: str = DEFAULT_COLLECTION):
+    """Clear all documents from a collection"""
     try:
-        vectorstore = get_vectorstore()
-        vectorstore.clear()
+        vectorstore = await get_vectorstore(collection)
+        
+        # Off the event loop: it waits for commits in progress and background compaction
+        await run_in_threadpool(vectorstore.clear)
         
-        logger.info("Vector store cleared successfully")
-        return {"message": "Vector store cleared successfully"}
+        logger.info(f"Collection '{collection}' cleared successfully")
+        return {"message": f"Collection '{collection}' cleared successfully"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to clear vector store: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to clear vector store: {str(e)}")
 
+@router.delete("/ingest/documents/{doc_id:path}")
+async def delete_document(doc_id: str, collection: str = DEFAULT_COLLECTION):
+    """
+    Delete every chunk of an ingested document
+    
+    Args:
+        doc_id: Document id (the source file name for ingested documents)
+        collection: Collection holding the document
+        
+    Returns:
+        Number of chunks deleted
+    """
+    try:
+        vectorstore = await get_vectorstore(collection)
+        
+        chunks_deleted = await run_in_threadpool(vectorstore.delete, doc_id)
+        if chunks_deleted == 0:
+            raise HTTPException(status_code=404, detail=f"Document not found: {doc_id}")
+        
+        logger.info(f"Deleted document {doc_id}: {chunks_deleted} chunks")
+        return {"message": f"Document '{doc_id}' deleted successfully", "chunks_deleted": chunks_deleted}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to delete document: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to delete document: {str(e)}")
+
+@router.get("/ingest/collections")
+async def list_collections():
+    """List vector store collections and which are loaded"""
+    try:
+        registry = get_registry()
+        loaded = registry.get_status()["collections_loaded"]
+        return {
+            "collections": [
+                {"name": name, "loaded": name in loaded}
+                for name in registry.list_collections()
+            ]
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to list collections: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to list collections: {str(e)}")
+
+@router.delete("/ingest/collections/{collection}")
+async def drop_collection(collection: str):
+    """Delete a collection and its files (the default collection is cleared instead)"""
+    try:
+        if not await run_in_threadpool(get_registry().drop_collection, collection):
+            raise HTTPException(status_code=404, detail=f"Collection not found: {collection}")
+        
+        return {"message": f"Collection '{collection}' deleted successfully"}
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to drop collection: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to drop collection: {str(e)}")
+
+@router.post("/ingest/reload")
+async def reload_vectorstore(reload_model: bool = False):
+    """Reload the shared vector store from disk, and optionally the embedding model"""
+    try:
+        registry = get_registry()
+        # Off the event loop: reloading waits for the write lock and may load the model
+        await run_in_threadpool(registry.reload, reload_model=reload_model)
+        
+        return {
+            "message": "Vector store reloaded successfully",
+            "registry": registry.get_status()
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to reload vector store: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to reload vector store: {str(e)}")
+
+@router.post("/ingest/search", response_model=List[DocumentSearchResult])
+async def search_documents(request: DocumentSearchRequest):
+    """
+    Search ingested documents, optionally restricted by metadata
+    
+    Args:
+        request: Query, number of results and optional metadata filter
+        
+    Returns:
+        Matching documents ordered by similarity
+    """
+    try:
+        vectorstore = await get_vectorstore(request.collection)
+        # Off the event loop, so concurrent searches can share one embedding batch
+        results = await run_in_threadpool(
+            vectorstore.search, request.query, k=request.k, filters=request.filters, hybrid=request.hybrid,
+            mmr=request.mmr, mmr_lambda=request.mmr_lambda, mmr_candidates=request.mmr_candidates
+        )
+        
+        return [
+            DocumentSearchResult(content=doc, score=score, metadata=metadata)
+            for doc, score, metadata in results
+        ]
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to search documents: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to search documents: {str(e)}")
+
 @router.get("/ingest/stats")
-async def get_ingest_stats():
-    """Get ingestion statistics"""
+async def get_ingest_stats(collection: str = DEFAULT_COLLECTION):
+    """Get ingestion statistics for a collection"""
     try:
-        vectorstore = get_vectorstore()
+        vectorstore = await get_vectorstore(collection)
         stats = vectorstore.get_stats()
+        job_queue = peek_job_queue()
         
         return {
+            "collection": collection,
             "vectorstore_stats": stats,
+            "registry": get_registry().get_status(),
+            "ingestion_jobs": job_queue.get_stats() if job_queue is not None else None,
             "supported_formats": ["csv", "json", "pdf", "docx", "txt"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get ingest stats: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get ingestion statistics")
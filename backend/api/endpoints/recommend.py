@@ -8,6 +8,8 @@ from models.schemas import (
 )
 from agents.dynamic_upskill_agent import DynamicUpskillAgent
 from agents.dynamic_crossskill_agent import DynamicCrossSkillAgent
+from data_sources.prewarm import get_trend_prewarmer
+from fastapi.responses import JSONResponse
 import logging
 import os
 
@@ -139,6 +141,19 @@ async def health_check():
         "groq_api_key": groq_key_status
     }
 
+@router.get("/ready")
+async def readiness_check():
+    """Readiness endpoint; returns 503 until startup trend prewarming has finished"""
+    warmup = get_trend_prewarmer().get_status()
+    if not warmup["ready"]:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming", "trends": warmup}
+        )
+    
+    # "degraded" while some roles were warmed with failed sources
+    return {"status": warmup["state"], "trends": warmup}
+
 @router.get("/trends/{role}")
 async def get_current_trends(role: str):
     """
@@ -1,24 +1,59 @@
 from dotenv import load_dotenv
 load_dotenv()
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
 import uvicorn
 import logging
+import threading
 from api.endpoints import recommend, ingest
 from fastapi.responses import JSONResponse
+from config import Config
+from ingestion.jobs import close_job_queue
+from data_sources.prewarm import get_trend_prewarmer, load_known_roles
+from vectorizer.registry import init_registry
+from vectorizer.sharding import peek_shard_pool
+from vectorizer.skill_index import init_skill_index
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared services and start background warmup on startup; stop it on shutdown"""
+    # Embedder and vector store are shared process-wide and loaded lazily
+    registry = init_registry()
+    
+    prewarmer = get_trend_prewarmer()
+    if Config.TREND_PREWARM_ENABLED:
+        team_roles = [member.role for member in ingest.team_data_store]
+        prewarmer.schedule(load_known_roles(Config.ROLE_SKILLS_PATH, team_roles))
+    else:
+        prewarmer.mark_ready()
+    
+    # Embed the skill vocabulary in the background; skills match by alias only until it is ready
+    if Config.SKILL_INDEX_ENABLED:
+        team_skills = [skill for member in ingest.team_data_store for skill in member.skills]
+        threading.Thread(target=init_skill_index, args=(team_skills,), name="skill-index-build", daemon=True).start()
+    
+    yield
+    
+    prewarmer.cancel()
+    # Let running ingestion jobs finish before the stores are closed
+    close_job_queue()
+    registry.close()
+
 # Create FastAPI app
 app = FastAPI(
     title="GenAI Team Skill Recommendation System",
     description="AI-powered system for recommending role-based upskilling and cross-skilling to team members",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -50,12 +85,18 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {
+    """Health check endpoint (also pings the search shard workers, restarting unresponsive ones)"""
+    health = {
         "status": "healthy",
         "service": "skill-recommendation-api",
         "version": "1.0.0"
     }
+    
+    shard_pool = peek_shard_pool()
+    if shard_pool is not None:
+        health["search_shards"] = await run_in_threadpool(shard_pool.health_check)
+    
+    return health
 
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
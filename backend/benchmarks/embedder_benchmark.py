@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Throughput, latency and memory of SkillEmbedder's inference backends
+
+Each backend runs in its own subprocess so import cost and peak RSS are
+measured in isolation, and embeddings are compared against the PyTorch
+backend for numerical agreement:
+    python -m benchmarks.embedder_benchmark --backends torch onnx onnx-int8 --texts 512 --batch-size 32 --clients 16
+
+Concurrent single-text throughput is measured both with direct calls and
+through the micro-batching worker (BatchingEmbedder).
+
+Export the ONNX model ahead of time (otherwise the first onnx run exports it):
+    python -m benchmarks.embedder_benchmark --export --quantize
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Dict, Any
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from benchmarks.trend_benchmark import percentile
+
+SAMPLE_TEXTS = [
+    "Data Engineer role requirements skills career development",
+    "skills: Python, SQL, Apache Airflow, Spark",
+    "Senior DevOps Engineer with Kubernetes, Terraform and CI/CD pipelines",
+    "emerging skills technology trends career development",
+    "Machine learning engineers increasingly deploy models with MLOps tooling such as MLflow and Kubeflow.",
+    "industry trends Product Manager technology evolution market changes"
+]
+
+
+def sample_texts(count: int) -> List[str]:
+    """Deterministic mix of short queries and longer document-like texts"""
+    return [f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} ({i})" for i in range(count)]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def run_concurrent(embedder, texts: List[str], clients: int) -> Dict[str, float]:
+    """Embed one text per call from many threads at once, as concurrent requests do"""
+    latencies = []
+    lock = threading.Lock()
+
+    def client(offset: int):
+        for text in texts[offset::clients]:
+            start = time.perf_counter()
+            embedder.embed_text(text)
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000.0)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "texts_per_s": len(texts) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95)
+    }
+
+
+def run_backend(backend: str, texts: List[str], batch_size: int, iterations: int, embeddings_path: str,
+                clients: int) -> Dict[str, Any]:
+    """Load one backend, embed the texts and report timings (runs inside the child process)"""
+    Config.EMBEDDING_BACKEND = "onnx" if backend.startswith("onnx") else "torch"
+    Config.EMBEDDING_ONNX_QUANTIZE = backend == "onnx-int8"
+
+    from vectorizer.batcher import BatchingEmbedder
+    from vectorizer.embedder import SkillEmbedder
+
+    start = time.perf_counter()
+    embedder = SkillEmbedder(Config.EMBEDDING_MODEL, use_cache=False)
+    load_s = time.perf_counter() - start
+
+    # Single-query latency, as on the retrieval hot path
+    latencies = []
+    for text in texts[:iterations]:
+        start = time.perf_counter()
+        embedder.embed_text(text)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+
+    # Batch throughput, as during ingestion
+    batches = []
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        batches.append(embedder.embed_text(texts[i:i + batch_size]))
+    elapsed = time.perf_counter() - start
+
+    np.save(embeddings_path, np.concatenate(batches).astype(np.float32))
+
+    # Concurrent single-text calls, direct vs through the micro-batching worker
+    concurrent = run_concurrent(embedder, texts, clients)
+    batcher = BatchingEmbedder(embedder, Config.EMBEDDING_BATCH_SIZE, Config.EMBEDDING_BATCH_WAIT_MS,
+                               Config.EMBEDDING_TORCH_THREADS)
+    try:
+        micro_batched = run_concurrent(batcher, texts, clients)
+        micro_batched["mean_batch_texts"] = batcher.get_stats()["mean_batch_texts"]
+    finally:
+        batcher.close()
+
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "query_p50_ms": percentile(latencies, 50),
+        "query_p95_ms": percentile(latencies, 95),
+        "query_mean_ms": statistics.mean(latencies) if latencies else 0.0,
+        "batch_texts_per_s": len(texts) / elapsed if elapsed else 0.0,
+        f"concurrent_{clients}_clients": concurrent,
+        f"micro_batched_{clients}_clients": micro_batched,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def cosine_agreement(reference: np.ndarray, other: np.ndarray) -> Dict[str, float]:
+    """Row-wise cosine similarity between two embedding matrices"""
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    other = other / np.linalg.norm(other, axis=1, keepdims=True)
+    cosines = (reference * other).sum(axis=1)
+    return {"mean_cosine_vs_torch": float(cosines.mean()), "min_cosine_vs_torch": float(cosines.min())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend benchmark")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"],
+                        choices=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=100, help="Single-text latency samples")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent single-text callers")
+    parser.add_argument("--export", action="store_true", help="Export the ONNX model and exit")
+    parser.add_argument("--quantize", action="store_true", help="With --export, also write the int8 model")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--embeddings-path", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    texts = sample_texts(args.texts)
+
+    if args.export:
+        from vectorizer.onnx_backend import export_onnx_model, onnx_model_directory
+        export_onnx_model(Config.EMBEDDING_MODEL, onnx_model_directory(Config.EMBEDDING_ONNX_PATH, Config.EMBEDDING_MODEL),
+                          quantize=args.quantize)
+        return
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, texts, args.batch_size, args.iterations, args.embeddings_path,
+                                     args.clients)))
+        return
+
+    results = []
+    embeddings = {}
+    with tempfile.TemporaryDirectory(prefix="embedder-benchmark-") as directory:
+        for backend in args.backends:
+            embeddings_path = os.path.join(directory, f"{backend}.npy")
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.embedder_benchmark", "--child", backend,
+                 "--embeddings-path", embeddings_path, "--texts", str(args.texts),
+                 "--batch-size", str(args.batch_size), "--iterations", str(args.iterations),
+                 "--clients", str(args.clients)],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                results.append({"backend": backend, "error": completed.stderr.strip().splitlines()[-1:]})
+                continue
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+            embeddings[backend] = np.load(embeddings_path)
+
+    if "torch" in embeddings:
+        for result in results:
+            if result["backend"] in embeddings and result["backend"] != "torch":
+                result.update(cosine_agreement(embeddings["torch"], embeddings[result["backend"]]))
+
+    report = {
+        "model": Config.EMBEDDING_MODEL,
+        "texts": args.texts,
+        "batch_size": args.batch_size,
+        "clients": args.clients,
+        "onnx_threads": Config.EMBEDDING_ONNX_THREADS,
+        "results": results
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
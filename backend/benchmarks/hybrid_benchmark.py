@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Dense vs hybrid (BM25 + dense) retrieval benchmark for SkillVectorStore
+
+Builds a synthetic corpus from the role-skill mapping, where every document
+mentions a known set of skills, then runs one "skills: <name>" query per
+skill in both modes and reports latency and recall@k:
+    python -m benchmarks.hybrid_benchmark --docs-per-role 200 --k 10
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, Dict, Any, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from vectorizer.embedder import SkillEmbedder
+from vectorizer.vectorstore import SkillVectorStore
+from benchmarks.trend_benchmark import percentile
+
+TEMPLATES = [
+    "Job posting for a {role}: hands-on experience with {skills} is required.",
+    "{role} learning path covering {skills}, with projects and exercises.",
+    "Team update: our {role} group standardized on {skills} this quarter.",
+    "Interview guide for {role} candidates focusing on {skills}."
+]
+
+
+def build_corpus(role_skills_path: str, docs_per_role: int, skills_per_doc: int,
+                 seed: int) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, List[int]]]:
+    """
+    Generate documents with known skill mentions
+
+    Returns:
+        (documents, metadata, rows of every document mentioning each skill)
+    """
+    with open(role_skills_path, "r") as f:
+        role_skills = json.load(f)
+
+    rng = random.Random(seed)
+    documents = []
+    metadata = []
+    relevant: Dict[str, List[int]] = {}
+
+    for role, groups in role_skills.items():
+        pool = sorted({skill for skills in groups.values() for skill in skills})
+        for _ in range(docs_per_role):
+            skills = rng.sample(pool, min(skills_per_doc, len(pool)))
+            template = rng.choice(TEMPLATES)
+            for skill in skills:
+                relevant.setdefault(skill, []).append(len(documents))
+            documents.append(template.format(role=role, skills=", ".join(skills)))
+            metadata.append({"source": "synthetic", "role": role})
+
+    return documents, metadata, relevant
+
+
+def run_queries(store: SkillVectorStore, relevant: Dict[str, List[int]], row_of: Dict[str, int],
+                k: int, hybrid: bool) -> Dict[str, Any]:
+    """Run one skill query per skill and measure latency and recall@k"""
+    timings = []
+    recalls = []
+
+    for skill, rows in relevant.items():
+        start = time.perf_counter()
+        results = store.search_skills([skill], k=k, hybrid=hybrid)
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+        retrieved = {row_of[document] for document, _, _ in results}
+        recalls.append(len(retrieved & set(rows)) / min(k, len(rows)))
+
+    return {
+        "queries": len(timings),
+        "mean_ms": statistics.mean(timings) if timings else 0.0,
+        "p50_ms": percentile(timings, 50),
+        "p95_ms": percentile(timings, 95),
+        f"recall_at_{k}": statistics.mean(recalls) if recalls else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dense vs hybrid retrieval benchmark")
+    parser.add_argument("--role-skills-path", default=Config.ROLE_SKILLS_PATH)
+    parser.add_argument("--docs-per-role", type=int, default=100)
+    parser.add_argument("--skills-per-doc", type=int, default=3)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--index-type", default=Config.VECTOR_INDEX_TYPE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    documents, metadata, relevant = build_corpus(
+        args.role_skills_path, args.docs_per_role, args.skills_per_doc, args.seed
+    )
+    # Templates make texts collide rarely; map each text to its first row for scoring
+    row_of: Dict[str, int] = {}
+    for row, document in enumerate(documents):
+        row_of.setdefault(document, row)
+
+    directory = tempfile.mkdtemp(prefix="hybrid-benchmark-")
+    try:
+        store = SkillVectorStore(SkillEmbedder(Config.EMBEDDING_MODEL), directory, index_type=args.index_type)
+
+        start = time.perf_counter()
+        store.add_documents(documents, metadata)
+        ingest_s = time.perf_counter() - start
+
+        # Build the lexical index outside the timed queries
+        store.search("warmup", k=1, hybrid=True)
+
+        report = {
+            "documents": len(documents),
+            "skills": len(relevant),
+            "k": args.k,
+            "index_type": args.index_type,
+            "lexical_weight": Config.VECTOR_HYBRID_LEXICAL_WEIGHT,
+            "ingest_s": ingest_s,
+            "dense": run_queries(store, relevant, row_of, args.k, hybrid=False),
+            "hybrid": run_queries(store, relevant, row_of, args.k, hybrid=True)
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
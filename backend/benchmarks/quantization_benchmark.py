@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Memory, latency and recall of quantized vector indexes against exact search
+
+Uses synthetic clustered unit vectors (no embedding model needed), or
+embeddings loaded from an existing store's segments:
+    python -m benchmarks.quantization_benchmark --vectors 100000 --dimension 384 --k 10
+    python -m benchmarks.quantization_benchmark --store data/vectorstore
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, Any
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from vectorizer.index import create_index
+from vectorizer.segments import SegmentStore
+from vectorizer.vectorstore import normalize_rows
+from benchmarks.trend_benchmark import percentile
+
+
+def synthetic_vectors(count: int, dimension: int, clusters: int, seed: int) -> np.ndarray:
+    """Unit vectors scattered around random cluster centers, roughly like sentence embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = normalize_rows(rng.standard_normal((clusters, dimension)))
+    assignments = rng.integers(0, clusters, count)
+    return normalize_rows(centers[assignments] + 0.35 * rng.standard_normal((count, dimension)) / np.sqrt(dimension) * 4)
+
+
+def run_index(index_type: str, vectors: np.ndarray, queries: np.ndarray,
+              truth: np.ndarray, k: int) -> Dict[str, Any]:
+    """Build one index type over the vectors and measure it against exact results"""
+    gather_rows = lambda rows: vectors[rows]
+    index = create_index(index_type, vectors.shape[1], lambda: [vectors], gather_rows)
+
+    start = time.perf_counter()
+    index.build(vectors)
+    build_s = time.perf_counter() - start
+
+    timings = []
+    recalls = []
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        timings.append((time.perf_counter() - start) * 1000.0)
+        recalls.append(len(set(ids[0].tolist()) & set(truth[i].tolist())) / k)
+
+    memory_bytes = getattr(index, "code_bytes", vectors.nbytes)
+    return {
+        "build_s": build_s,
+        "memory_bytes": memory_bytes,
+        "memory_reduction": vectors.nbytes / memory_bytes if memory_bytes else 0.0,
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": percentile(timings, 50),
+        "p95_ms": percentile(timings, 95),
+        f"recall_at_{k}": statistics.mean(recalls)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized index benchmark")
+    parser.add_argument("--store", help="Benchmark on the embeddings of an existing vector store directory")
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--index-types", nargs="+", default=["exact", "int8", "binary"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.store:
+        vectors = SegmentStore(args.store).read_all_vectors()
+    else:
+        vectors = synthetic_vectors(args.vectors, args.dimension, args.clusters, args.seed)
+
+    # Queries are perturbed corpus vectors, so every query has close neighbours
+    rng = np.random.default_rng(args.seed + 1)
+    picks = rng.integers(0, len(vectors), args.queries)
+    queries = normalize_rows(vectors[picks] + 0.05 * rng.standard_normal((args.queries, vectors.shape[1])))
+
+    _, truth = create_index("exact", vectors.shape[1], lambda: [vectors]).search(queries, args.k)
+
+    report = {
+        "vectors": len(vectors),
+        "dimension": int(vectors.shape[1]),
+        "k": args.k,
+        "rescore_factor": Config.VECTOR_INDEX_RESCORE_FACTOR,
+        "float32_bytes": vectors.nbytes,
+        "indexes": {
+            index_type: run_index(index_type, vectors, queries, truth, args.k)
+            for index_type in args.index_types
+        }
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
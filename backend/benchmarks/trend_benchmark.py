@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for TrendAnalyzer.get_comprehensive_trends
+
+Record fixtures once on a machine with network access:
+    python -m benchmarks.trend_benchmark --record --roles "Data Engineer" "DevOps Engineer"
+
+Then replay them anywhere, with optional injected latency and errors:
+    python -m benchmarks.trend_benchmark --iterations 50 --latency-ms 80 --jitter-ms 40 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import List, Dict, Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from data_sources.trend_analyzer import TrendAnalyzer
+from data_sources.http_replay import ReplaySession
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def record(roles: List[str], fixture_path: str):
+    """Fetch trends live for each role and capture all responses"""
+    for role in roles:
+        async with TrendAnalyzer(http_mode="record", fixture_path=fixture_path, use_cache=False) as analyzer:
+            result = await analyzer.get_comprehensive_trends(role, [])
+        print(f"Recorded {role}: {len(result.get('trends', []))} trends")
+
+
+async def replay(roles: List[str], fixture_path: str, iterations: int, latency_ms: float,
+                 jitter_ms: float, error_rate: float, seed: int) -> Dict[str, Any]:
+    """Run get_comprehensive_trends repeatedly against recorded fixtures"""
+    timings = []
+    trend_counts = []
+    errors_injected = 0
+    misses = 0
+
+    for _ in range(iterations):
+        for role in roles:
+            analyzer = TrendAnalyzer(http_mode="replay", fixture_path=fixture_path, use_cache=False)
+            session = ReplaySession(fixture_path, latency_ms, jitter_ms, error_rate, seed + len(timings))
+            analyzer.session = session
+
+            start = time.perf_counter()
+            result = await analyzer.get_comprehensive_trends(role, [])
+            timings.append((time.perf_counter() - start) * 1000.0)
+            trend_counts.append(len(result.get("trends", [])))
+
+            errors_injected += session.errors_injected
+            misses += session.misses
+            await session.close()
+
+    return {
+        "fixture_path": fixture_path,
+        "roles": roles,
+        "iterations": iterations,
+        "latency_ms": latency_ms,
+        "jitter_ms": jitter_ms,
+        "error_rate": error_rate,
+        "runs": len(timings),
+        "mean_ms": statistics.mean(timings) if timings else 0.0,
+        "p50_ms": percentile(timings, 50),
+        "p95_ms": percentile(timings, 95),
+        "p99_ms": percentile(timings, 99),
+        "mean_trends": statistics.mean(trend_counts) if trend_counts else 0.0,
+        "errors_injected": errors_injected,
+        "fixture_misses": misses
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline TrendAnalyzer benchmark")
+    parser.add_argument("--roles", nargs="+", default=["Data Engineer", "Software Engineer", "DevOps Engineer"])
+    parser.add_argument("--fixture-path", default=Config.TREND_FIXTURE_PATH)
+    parser.add_argument("--record", action="store_true", help="Record fixtures from the live sources")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=Config.TREND_REPLAY_LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=Config.TREND_REPLAY_JITTER_MS)
+    parser.add_argument("--error-rate", type=float, default=Config.TREND_REPLAY_ERROR_RATE)
+    parser.add_argument("--seed", type=int, default=Config.TREND_REPLAY_SEED or 0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.roles, args.fixture_path))
+        return
+
+    report = asyncio.run(replay(
+        args.roles, args.fixture_path, args.iterations,
+        args.latency_ms, args.jitter_ms, args.error_rate, args.seed
+    ))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
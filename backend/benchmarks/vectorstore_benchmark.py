@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of SkillVectorStore across corpus sizes and index backends
+
+For every (corpus size, index type) the store is built in one subprocess and
+reopened cold in another, so peak RSS is measured for ingest and for serving
+separately. Reported per run: ingest throughput, size on disk, cold-load
+time, first-query time (lazy index builds), p50/p99 search latency and
+recall@k against the exact backend.
+
+Synthetic corpora use a model-free embedder, so million-chunk runs measure
+the store rather than the model:
+    python -m benchmarks.vectorstore_benchmark --sizes 1000 10000 100000 1000000 --index-types exact hnsw int8
+
+Fixture corpora (JSONL lines with "text" and optional "metadata") are embedded
+with the configured model:
+    python -m benchmarks.vectorstore_benchmark --corpus chunks.jsonl --sizes 10000 --embedder model
+
+Reports are plain JSON with sorted keys; --baseline adds the relative change
+of every metric against an earlier report, e.g. from the parent commit.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from vectorizer.vectorstore import SkillVectorStore, normalize_rows
+from benchmarks.trend_benchmark import percentile
+
+BACKEND_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = [
+    "python", "sql", "spark", "airflow", "kafka", "kubernetes", "terraform", "docker", "react", "typescript",
+    "pytorch", "tensorflow", "mlflow", "dbt", "snowflake", "aws", "azure", "gcp", "linux", "graphql",
+    "pipelines", "testing", "monitoring", "security", "analytics", "streaming", "modeling", "deployment",
+    "architecture", "leadership", "mentoring", "roadmap", "observability", "automation", "governance"
+]
+
+
+class SyntheticEmbedder:
+    """
+    Deterministic model-free embedder for synthetic corpora
+
+    A text's first word picks one of `clusters` random unit centers and the
+    rest of the text seeds the noise around it, so texts about the same
+    topic are neighbours, as with sentence embeddings, at a tiny fraction
+    of the cost.
+    """
+
+    def __init__(self, dimension: int = 384, clusters: int = 200, seed: int = 0):
+        self.dimension = dimension
+        self.clusters = clusters
+        rng = np.random.default_rng(seed)
+        self.centers = normalize_rows(rng.standard_normal((clusters, dimension)))
+
+    @staticmethod
+    def _seed(text: str) -> int:
+        return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+    def get_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def embed_text(self, text) -> np.ndarray:
+        texts = [text] if isinstance(text, str) else text
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for i, item in enumerate(texts):
+            topic = item.split(" ", 1)[0]
+            noise = np.random.default_rng(self._seed(item)).standard_normal(self.dimension)
+            embeddings[i] = self.centers[self._seed(topic) % self.clusters] + 1.4 * noise / np.sqrt(self.dimension)
+        return embeddings
+
+
+def synthetic_chunks(count: int, topics: int, seed: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Unique chunk texts "topicN note i: words..." with document-like metadata"""
+    rng = random.Random(seed)
+    for i in range(count):
+        topic = f"topic{rng.randrange(topics)}"
+        words = " ".join(rng.choices(WORDS, k=12))
+        yield f"{topic} note {i}: {words}", {"source": f"doc{i // 20}.txt", "chunk": i % 20}
+
+
+def fixture_chunks(path: str, count: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """First `count` chunks of a JSONL fixture corpus"""
+    with open(path, "r") as f:
+        for i, line in enumerate(f):
+            if i >= count:
+                break
+            record = json.loads(line)
+            yield record["text"], record.get("metadata") or {"source": os.path.basename(path), "chunk": i}
+
+
+def make_queries(args, count: int) -> List[str]:
+    """Queries sharing a topic (synthetic) or a chunk prefix (fixture) with the corpus"""
+    rng = random.Random(args.seed + 1)
+    if not args.corpus:
+        return [f"topic{rng.randrange(args.topics)} " + " ".join(rng.choices(WORDS, k=6))
+                for _ in range(args.queries)]
+    texts = [text for text, _ in fixture_chunks(args.corpus, count)]
+    return [" ".join(rng.choice(texts).split()[:12]) for _ in range(args.queries)]
+
+
+def make_embedder(args):
+    if args.embedder == "model":
+        from vectorizer.embedder import SkillEmbedder
+        return SkillEmbedder(Config.EMBEDDING_MODEL, use_cache=False)
+    return SyntheticEmbedder(args.dimension, args.topics, args.seed)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def directory_bytes(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory)
+        for name in names
+    )
+
+
+def run_ingest(args, directory: str) -> Dict[str, Any]:
+    """Build the store in batches of Config.INGEST_BATCH_SIZE (runs inside the child process)"""
+    store = SkillVectorStore(make_embedder(args), directory, index_type=args.index_type)
+    chunks = fixture_chunks(args.corpus, args.size) if args.corpus else \
+        synthetic_chunks(args.size, args.topics, args.seed)
+
+    added = 0
+    start = time.perf_counter()
+    batch: List[Tuple[str, Dict[str, Any]]] = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= Config.INGEST_BATCH_SIZE:
+            added += store.add_documents([text for text, _ in batch], [metadata for _, metadata in batch])
+            batch = []
+    if batch:
+        added += store.add_documents([text for text, _ in batch], [metadata for _, metadata in batch])
+    store.flush()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "chunks": added,
+        "ingest_s": elapsed,
+        "chunks_per_s": added / elapsed if elapsed else 0.0,
+        "disk_bytes": directory_bytes(directory),
+        "segments": store.get_stats()["segments"],
+        "ingest_peak_rss_mb": peak_rss_mb()
+    }
+
+
+def run_queries(args, directory: str) -> Dict[str, Any]:
+    """Reopen the store cold and time searches (runs inside the child process)"""
+    queries = make_queries(args, args.size)
+    embedder = make_embedder(args)
+
+    start = time.perf_counter()
+    store = SkillVectorStore(embedder, directory, index_type=args.index_type)
+    cold_load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.search(queries[0], k=args.k, hybrid=args.hybrid)
+    first_query_ms = (time.perf_counter() - start) * 1000.0
+
+    timings = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        found = store.search(query, k=args.k, hybrid=args.hybrid)
+        timings.append((time.perf_counter() - start) * 1000.0)
+        results.append([text for text, _, _ in found])
+
+    # Search timings include embedding the query; report that cost so backends can be compared net of it
+    start = time.perf_counter()
+    for query in queries:
+        embedder.embed_text(query)
+    embed_ms = (time.perf_counter() - start) * 1000.0 / len(queries)
+
+    with open(args.results_path, "w") as f:
+        json.dump(results, f)
+
+    return {
+        "cold_load_s": cold_load_s,
+        "first_query_ms": first_query_ms,
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": percentile(timings, 50),
+        "p99_ms": percentile(timings, 99),
+        "query_embed_ms": embed_ms,
+        "query_peak_rss_mb": peak_rss_mb()
+    }
+
+
+def run_child(phase: str, args, size: int, index_type: str, directory: str,
+              results_path: Optional[str] = None) -> Dict[str, Any]:
+    command = [
+        sys.executable, "-m", "benchmarks.vectorstore_benchmark", "--child", phase,
+        "--directory", directory, "--size", str(size), "--index-type", index_type,
+        "--dimension", str(args.dimension), "--topics", str(args.topics), "--queries", str(args.queries),
+        "--k", str(args.k), "--seed", str(args.seed), "--embedder", args.embedder
+    ]
+    if args.corpus:
+        command += ["--corpus", args.corpus]
+    if args.hybrid:
+        command.append("--hybrid")
+    if results_path:
+        command += ["--results-path", results_path]
+
+    completed = subprocess.run(command, cwd=BACKEND_DIRECTORY, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def recall_at_k(results: List[List[str]], truth: List[List[str]], k: int) -> float:
+    recalls = [len(set(found) & set(expected)) / min(k, len(expected))
+               for found, expected in zip(results, truth) if expected]
+    return statistics.mean(recalls) if recalls else 0.0
+
+
+def run_size(args, size: int, work_directory: str) -> List[Dict[str, Any]]:
+    """Benchmark every index type at one corpus size; exact runs first and is the recall reference"""
+    index_types = ["exact"] + [index_type for index_type in args.index_types if index_type != "exact"]
+    truth = None
+    runs = []
+
+    for index_type in index_types:
+        directory = os.path.join(work_directory, f"{size}-{index_type}")
+        results_path = os.path.join(work_directory, f"{size}-{index_type}.json")
+        run = {"size": size, "index_type": index_type}
+        try:
+            run.update(run_child("ingest", args, size, index_type, directory))
+            if "error" not in run:
+                run.update(run_child("query", args, size, index_type, directory, results_path))
+            if "error" not in run:
+                with open(results_path, "r") as f:
+                    results = json.load(f)
+                if truth is None:
+                    truth = results
+                run[f"recall_at_{args.k}"] = recall_at_k(results, truth, args.k)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        print(f"{size} chunks, {index_type}: {json.dumps(run, sort_keys=True)}", file=sys.stderr)
+        if index_type in args.index_types:
+            runs.append(run)
+    return runs
+
+
+def compare(runs: List[Dict[str, Any]], baseline_path: str):
+    """Attach the relative change of every numeric metric against a matching baseline run"""
+    with open(baseline_path, "r") as f:
+        baseline = {(run["size"], run["index_type"]): run for run in json.load(f)["runs"]}
+
+    for run in runs:
+        previous = baseline.get((run["size"], run["index_type"]))
+        if previous is None:
+            continue
+        run["change_vs_baseline"] = {
+            key: (value - previous[key]) / previous[key]
+            for key, value in run.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+            and key != "size" and isinstance(previous.get(key), (int, float)) and previous[key]
+        }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIRECTORY,
+                                   capture_output=True, text=True)
+        return completed.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector store benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--index-types", nargs="+", default=["exact", "flat", "hnsw", "ivf", "int8", "binary"])
+    parser.add_argument("--corpus", help="JSONL fixture corpus instead of synthetic chunks")
+    parser.add_argument("--embedder", choices=["synthetic", "model"], default="synthetic")
+    parser.add_argument("--dimension", type=int, default=384, help="Synthetic embedding dimension")
+    parser.add_argument("--topics", type=int, default=200, help="Synthetic topic clusters")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--hybrid", action="store_true", help="Search in hybrid (BM25 + dense) mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--work-directory", help="Where stores are built (defaults to a temporary directory)")
+    parser.add_argument("--child", choices=["ingest", "query"], help=argparse.SUPPRESS)
+    parser.add_argument("--directory", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--index-type", help=argparse.SUPPRESS)
+    parser.add_argument("--results-path", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.corpus and args.embedder == "synthetic":
+        parser.error("--corpus needs --embedder model")
+
+    if args.child == "ingest":
+        print(json.dumps(run_ingest(args, args.directory)))
+        return
+    if args.child == "query":
+        print(json.dumps(run_queries(args, args.directory)))
+        return
+
+    work_directory = args.work_directory or tempfile.mkdtemp(prefix="vectorstore-benchmark-")
+    os.makedirs(work_directory, exist_ok=True)
+    try:
+        runs = [run for size in args.sizes for run in run_size(args, size, work_directory)]
+    finally:
+        if not args.work_directory:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+    if args.baseline:
+        compare(runs, args.baseline)
+
+    report = {
+        "commit": git_commit(),
+        "embedder": Config.EMBEDDING_MODEL if args.embedder == "model" else f"synthetic-{args.dimension}d",
+        "corpus": args.corpus or "synthetic",
+        "queries": args.queries,
+        "k": args.k,
+        "hybrid": args.hybrid,
+        "ingest_batch_size": Config.INGEST_BATCH_SIZE,
+        "search_shards": Config.VECTOR_SEARCH_SHARDS,
+        "runs": runs
+    }
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
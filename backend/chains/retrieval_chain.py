@@ -1,4 +1,6 @@
 from typing import List, Dict, Any, Tuple
+from config import Config
+from vectorizer.content_hashes import content_hash
 from vectorizer.vectorstore import SkillVectorStore
 import logging
 
@@ -7,6 +9,11 @@ logger = logging.getLogger(__name__)
 class RetrievalChain:
     """
     RAG (Retrieval-Augmented Generation) chain for skill recommendations
+    
+    Context that draws on several queries is retrieved as one pooled search
+    per context, diversified with maximal marginal relevance when
+    Config.RETRIEVAL_MMR is set, so near-duplicate chunks don't crowd the
+    prompt's context budget.
     """
     
     def __init__(self, vectorstore: SkillVectorStore):
@@ -18,6 +25,49 @@ class RetrievalChain:
         """
         self.vectorstore = vectorstore
     
+    def _role_queries(self, role: str, skills: List[str]) -> List[str]:
+        """Queries behind role-based context"""
+        return [
+            # Role-specific documents
+            f"{role} role requirements skills career development",
+            # Skill-specific documents
+            f"skills: {', '.join(skills)}"
+        ]
+    
+    def _crossskill_queries(self, role: str) -> List[str]:
+        """Queries behind cross-skilling context"""
+        return [
+            # Cross-functional skills
+            f"cross-functional skills interdisciplinary {role} adjacent roles",
+            # Emerging skills and trends
+            "emerging skills technology trends career development"
+        ]
+    
+    def _trends_query(self, role: str) -> str:
+        """Query behind industry trend context"""
+        return f"industry trends {role} technology evolution market changes"
+    
+    def _search(self, groups: List[List[str]], ks: List[int]) -> List[List[Tuple[str, float, Dict[str, Any]]]]:
+        """
+        Run one pooled (and optionally diversified) search per query group as one batched vector store call
+        
+        Returns:
+            One deduplicated result list per group
+        """
+        results = self.vectorstore.search_groups(groups, ks, mmr=Config.RETRIEVAL_MMR)
+        return [self._deduplicate_documents(docs) for docs in results]
+    
+    def _format_documents(self, docs: List[Tuple[str, float, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Format (document, score, metadata) tuples for chain consumption"""
+        return [
+            {
+                "content": doc,
+                "score": score,
+                "metadata": metadata
+            }
+            for doc, score, metadata in docs
+        ]
+    
     def retrieve_role_context(self, role: str, skills: List[str], k: int = 5) -> List[Dict[str, Any]]:
         """
         Retrieve relevant context for role-based recommendations
@@ -31,29 +81,8 @@ class RetrievalChain:
             List of relevant documents with metadata
         """
         try:
-            # Search for role-specific documents
-            role_query = f"{role} role requirements skills career development"
-            role_docs = self.vectorstore.search(role_query, k=k//2)
-            
-            # Search for skill-specific documents
-            skills_query = f"skills: {', '.join(skills)}"
-            skills_docs = self.vectorstore.search(skills_query, k=k//2)
-            
-            # Combine and deduplicate
-            all_docs = role_docs + skills_docs
-            unique_docs = self._deduplicate_documents(all_docs)
-            
-            # Sort by relevance score
-            unique_docs.sort(key=lambda x: x[1], reverse=True)
-            
-            # Format for chain consumption
-            formatted_docs = []
-            for doc, score, metadata in unique_docs[:k]:
-                formatted_docs.append({
-                    "content": doc,
-                    "score": score,
-                    "metadata": metadata
-                })
+            docs = self._search([self._role_queries(role, skills)], [k])[0]
+            formatted_docs = self._format_documents(docs)
             
             logger.debug(f"Retrieved {len(formatted_docs)} documents for role {role}")
             return formatted_docs
@@ -75,29 +104,8 @@ class RetrievalChain:
             List of relevant documents with metadata
         """
         try:
-            # Search for cross-functional skills
-            cross_query = f"cross-functional skills interdisciplinary {role} adjacent roles"
-            cross_docs = self.vectorstore.search(cross_query, k=k//2)
-            
-            # Search for emerging skills and trends
-            trends_query = f"emerging skills technology trends career development"
-            trends_docs = self.vectorstore.search(trends_query, k=k//2)
-            
-            # Combine and deduplicate
-            all_docs = cross_docs + trends_docs
-            unique_docs = self._deduplicate_documents(all_docs)
-            
-            # Sort by relevance score
-            unique_docs.sort(key=lambda x: x[1], reverse=True)
-            
-            # Format for chain consumption
-            formatted_docs = []
-            for doc, score, metadata in unique_docs[:k]:
-                formatted_docs.append({
-                    "content": doc,
-                    "score": score,
-                    "metadata": metadata
-                })
+            docs = self._search([self._crossskill_queries(role)], [k])[0]
+            formatted_docs = self._format_documents(docs)
             
             logger.debug(f"Retrieved {len(formatted_docs)} documents for cross-skilling")
             return formatted_docs
@@ -120,16 +128,9 @@ class RetrievalChain:
         try:
             # Search for skill-specific information
             skill_query = f"{skill_name} learning resources tutorials best practices"
-            skill_docs = self.vectorstore.search(skill_query, k=k)
+            skill_docs = self._search([[skill_query]], [k])[0]
             
-            # Format for chain consumption
-            formatted_docs = []
-            for doc, score, metadata in skill_docs:
-                formatted_docs.append({
-                    "content": doc,
-                    "score": score,
-                    "metadata": metadata
-                })
+            formatted_docs = self._format_documents(skill_docs)
             
             logger.debug(f"Retrieved {len(formatted_docs)} documents for skill {skill_name}")
             return formatted_docs
@@ -150,18 +151,9 @@ class RetrievalChain:
             List of relevant documents with metadata
         """
         try:
-            # Search for industry trends
-            trends_query = f"industry trends {role} technology evolution market changes"
-            trends_docs = self.vectorstore.search(trends_query, k=k)
+            trends_docs = self._search([[self._trends_query(role)]], [k])[0]
             
-            # Format for chain consumption
-            formatted_docs = []
-            for doc, score, metadata in trends_docs:
-                formatted_docs.append({
-                    "content": doc,
-                    "score": score,
-                    "metadata": metadata
-                })
+            formatted_docs = self._format_documents(trends_docs)
             
             logger.debug(f"Retrieved {len(formatted_docs)} industry trend documents")
             return formatted_docs
@@ -172,7 +164,7 @@ class RetrievalChain:
     
     def _deduplicate_documents(self, docs: List[Tuple[str, float, Dict[str, Any]]]) -> List[Tuple[str, float, Dict[str, Any]]]:
         """
-        Remove duplicate documents based on content similarity
+        Remove duplicate documents returned by more than one query
         
         Args:
             docs: List of (document, score, metadata) tuples
@@ -184,11 +176,11 @@ class RetrievalChain:
         seen_contents = set()
         
         for doc, score, metadata in docs:
-            # Create a simple hash of the content for deduplication
-            content_hash = hash(doc[:100])  # Use first 100 chars as hash
+            # Same full-content hash the store deduplicates ingestion with
+            doc_hash = content_hash(doc)
             
-            if content_hash not in seen_contents:
-                seen_contents.add(content_hash)
+            if doc_hash not in seen_contents:
+                seen_contents.add(doc_hash)
                 unique_docs.append((doc, score, metadata))
         
         return unique_docs
@@ -246,13 +238,13 @@ class RetrievalChain:
         """
         try:
             if recommendation_type == "upskill":
-                role_docs = self.retrieve_role_context(role, skills, k=4)
-                trends_docs = self.retrieve_industry_trends(role, k=2)
-                all_docs = role_docs + trends_docs
+                primary_queries = self._role_queries(role, skills)
             else:  # cross_skill
-                cross_docs = self.retrieve_crossskill_context(role, skills, k=4)
-                trends_docs = self.retrieve_industry_trends(role, k=2)
-                all_docs = cross_docs + trends_docs
+                primary_queries = self._crossskill_queries(role)
+            
+            # Embed and score every query in one batch
+            primary_docs, trends_docs = self._search([primary_queries, [self._trends_query(role)]], [4, 2])
+            all_docs = self._format_documents(self._deduplicate_documents(primary_docs + trends_docs))
             
             # Format context
             context_text = self.format_context_for_prompt(all_docs)
@@ -27,10 +27,104 @@ class Config:
     TREND_FETCH_RATE_LIMIT: int = int(os.getenv("TREND_FETCH_RATE_LIMIT", "10"))
     TREND_FETCH_PERIOD: int = int(os.getenv("TREND_FETCH_PERIOD", "1"))
     
+    # Trend HTTP record/replay ("live", "record" or "replay")
+    TREND_HTTP_MODE: str = os.getenv("TREND_HTTP_MODE", "live")
+    TREND_FIXTURE_PATH: str = os.getenv("TREND_FIXTURE_PATH", "data/fixtures/trend_http.json")
+    TREND_REPLAY_LATENCY_MS: float = float(os.getenv("TREND_REPLAY_LATENCY_MS", "0"))
+    TREND_REPLAY_JITTER_MS: float = float(os.getenv("TREND_REPLAY_JITTER_MS", "0"))
+    TREND_REPLAY_ERROR_RATE: float = float(os.getenv("TREND_REPLAY_ERROR_RATE", "0"))
+    TREND_REPLAY_SEED: Optional[int] = int(os.getenv("TREND_REPLAY_SEED")) if os.getenv("TREND_REPLAY_SEED") else None
+    
+    # Near-duplicate trend clustering (max SimHash Hamming distance, 0 disables)
+    TREND_DEDUP_MAX_DISTANCE: int = int(os.getenv("TREND_DEDUP_MAX_DISTANCE", "3"))
+    
+    # Trend caching and startup prewarming
+    TREND_CACHE_TTL: float = float(os.getenv("TREND_CACHE_TTL", "900"))
+    # Fetches where a source failed are kept only this long (0 doesn't cache them)
+    TREND_CACHE_FAILURE_TTL: float = float(os.getenv("TREND_CACHE_FAILURE_TTL", "60"))
+    TREND_PREWARM_ENABLED: bool = os.getenv("TREND_PREWARM_ENABLED", "true").lower() == "true"
+    TREND_PREWARM_CONCURRENCY: int = int(os.getenv("TREND_PREWARM_CONCURRENCY", "3"))
+    ROLE_SKILLS_PATH: str = os.getenv("ROLE_SKILLS_PATH", "data/static_role_skills.json")
+    
     # Vector Store Configuration
     VECTOR_STORE_PATH: str = os.getenv("VECTOR_STORE_PATH", "data/vectorstore/skill_index")
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
     
+    # Embedding inference backend ("torch" or "onnx") and ONNX Runtime settings
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+    EMBEDDING_ONNX_PATH: str = os.getenv("EMBEDDING_ONNX_PATH", "data/onnx")
+    EMBEDDING_ONNX_QUANTIZE: bool = os.getenv("EMBEDDING_ONNX_QUANTIZE", "false").lower() == "true"
+    EMBEDDING_ONNX_THREADS: int = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+    EMBEDDING_MAX_SEQ_LENGTH: int = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", "256"))
+    
+    # Micro-batching: coalesce concurrent embed calls into one model call per flush
+    EMBEDDING_BATCHING: bool = os.getenv("EMBEDDING_BATCHING", "true").lower() == "true"
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    EMBEDDING_BATCH_WAIT_MS: float = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+    EMBEDDING_TORCH_THREADS: int = int(os.getenv("EMBEDDING_TORCH_THREADS", "0"))
+    
+    # Embedding cache: in-memory LRU entries (0 disables) and optional SQLite file ("" disables)
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.db")
+    
+    # Document ingestion: token-bounded chunks (capped by the model's max sequence length) embedded in batches
+    CHUNK_MAX_TOKENS: int = int(os.getenv("CHUNK_MAX_TOKENS", "200"))
+    CHUNK_OVERLAP_TOKENS: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+    # Uploads: copied in fixed-size pieces, rejected (413) past the size limit; team files spool to disk past UPLOAD_SPOOL_BYTES
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+    UPLOAD_CHUNK_BYTES: int = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+    UPLOAD_SPOOL_BYTES: int = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+    # Background ingestion jobs: worker threads, jobs waiting before submissions are rejected, finished jobs kept
+    INGEST_WORKERS: int = int(os.getenv("INGEST_WORKERS", "2"))
+    INGEST_QUEUE_SIZE: int = int(os.getenv("INGEST_QUEUE_SIZE", "16"))
+    INGEST_JOB_RETENTION: int = int(os.getenv("INGEST_JOB_RETENTION", "1000"))
+    INGEST_RETRY_AFTER: int = int(os.getenv("INGEST_RETRY_AFTER", "5"))  # seconds, sent with 503 when the queue is full
+    
+    # Skill vocabulary index: resolve skill aliases ("K8s" -> "Kubernetes") by embedding similarity
+    SKILL_INDEX_ENABLED: bool = os.getenv("SKILL_INDEX_ENABLED", "true").lower() == "true"
+    SKILL_MATCH_THRESHOLD: float = float(os.getenv("SKILL_MATCH_THRESHOLD", "0.85"))
+    SKILL_RESOLVE_CACHE_SIZE: int = int(os.getenv("SKILL_RESOLVE_CACHE_SIZE", "10000"))
+    
+    # Vector index backend ("exact", "flat", "ivf", "hnsw", or quantized "int8" / "binary")
+    VECTOR_INDEX_TYPE: str = os.getenv("VECTOR_INDEX_TYPE", "exact")
+    VECTOR_INDEX_IVF_NLIST: int = int(os.getenv("VECTOR_INDEX_IVF_NLIST", "1024"))
+    VECTOR_INDEX_IVF_NPROBE: int = int(os.getenv("VECTOR_INDEX_IVF_NPROBE", "16"))
+    VECTOR_INDEX_HNSW_M: int = int(os.getenv("VECTOR_INDEX_HNSW_M", "32"))
+    VECTOR_INDEX_HNSW_EF_CONSTRUCTION: int = int(os.getenv("VECTOR_INDEX_HNSW_EF_CONSTRUCTION", "200"))
+    VECTOR_INDEX_HNSW_EF_SEARCH: int = int(os.getenv("VECTOR_INDEX_HNSW_EF_SEARCH", "64"))
+    VECTOR_INDEX_RETRAIN_FACTOR: float = float(os.getenv("VECTOR_INDEX_RETRAIN_FACTOR", "2.0"))
+    VECTOR_INDEX_SAVE_GROWTH: float = float(os.getenv("VECTOR_INDEX_SAVE_GROWTH", "1.1"))
+    # Quantized indexes rescore k * this many code-scan candidates in float32
+    VECTOR_INDEX_RESCORE_FACTOR: int = int(os.getenv("VECTOR_INDEX_RESCORE_FACTOR", "8"))
+    # Rows appended since the published index version are scanned exactly until there are this many
+    VECTOR_INDEX_DELTA_ROWS: int = int(os.getenv("VECTOR_INDEX_DELTA_ROWS", "10000"))
+    
+    # Sharded exact search: worker processes scanning memory-mapped segments (0 or 1 disables)
+    VECTOR_SEARCH_SHARDS: int = int(os.getenv("VECTOR_SEARCH_SHARDS", "0"))
+    # Stores smaller than this are scanned in-process, where scatter overhead would dominate
+    VECTOR_SHARD_MIN_ROWS: int = int(os.getenv("VECTOR_SHARD_MIN_ROWS", "50000"))
+    VECTOR_SHARD_TIMEOUT: float = float(os.getenv("VECTOR_SHARD_TIMEOUT", "10.0"))
+    # Searches each shard worker can have in flight at once
+    VECTOR_SHARD_CONNECTIONS: int = int(os.getenv("VECTOR_SHARD_CONNECTIONS", "4"))
+    
+    # Segmented persistence: merge this many similar-sized segments in the background
+    VECTOR_STORE_COMPACT_THRESHOLD: int = int(os.getenv("VECTOR_STORE_COMPACT_THRESHOLD", "8"))
+    # Purge tombstoned rows in the background once they reach this fraction of the store
+    VECTOR_STORE_PURGE_RATIO: float = float(os.getenv("VECTOR_STORE_PURGE_RATIO", "0.2"))
+    
+    # Hybrid retrieval: blend BM25 lexical scores into dense similarity
+    VECTOR_HYBRID_SEARCH: bool = os.getenv("VECTOR_HYBRID_SEARCH", "true").lower() == "true"
+    VECTOR_HYBRID_LEXICAL_WEIGHT: float = float(os.getenv("VECTOR_HYBRID_LEXICAL_WEIGHT", "0.3"))
+    VECTOR_HYBRID_CANDIDATE_FACTOR: int = int(os.getenv("VECTOR_HYBRID_CANDIDATE_FACTOR", "4"))
+    
+    # Maximal marginal relevance: 1.0 ranks by relevance only, lower values favour novel results
+    VECTOR_MMR_LAMBDA: float = float(os.getenv("VECTOR_MMR_LAMBDA", "0.7"))
+    # MMR chooses k results from k * this many candidates per query
+    VECTOR_MMR_CANDIDATE_FACTOR: int = int(os.getenv("VECTOR_MMR_CANDIDATE_FACTOR", "4"))
+    # Diversify the recommendation chains' retrieved context with MMR
+    RETRIEVAL_MMR: bool = os.getenv("RETRIEVAL_MMR", "true").lower() == "true"
+    
     @classmethod
     def validate(cls) -> bool:
         """Validate required configuration"""
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import os
+import random
+from datetime import datetime
+from typing import Dict, Any, Optional
+import aiohttp
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk fixture layout changes; older files are rejected on load
+FIXTURE_FORMAT_VERSION = 1
+
+HTTP_MODES = ("live", "record", "replay")
+
+
+class FixtureResponse:
+    """
+    Minimal stand-in for aiohttp.ClientResponse built from a recorded fixture
+    """
+
+    def __init__(self, url: str, status: int, body: str, content_type: str = "text/html"):
+        self.url = url
+        self.status = status
+        self.content_type = content_type
+        self._body = body
+
+    async def text(self) -> str:
+        return self._body
+
+    async def read(self) -> bytes:
+        return self._body.encode("utf-8")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class _PendingRequest:
+    """Async context manager returned by the fake sessions' get()"""
+
+    def __init__(self, fetch):
+        self._fetch = fetch
+
+    async def __aenter__(self) -> FixtureResponse:
+        return await self._fetch()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+def load_fixtures(path: str) -> Dict[str, Any]:
+    """
+    Load a fixture file and check its format version
+
+    Args:
+        path: Path to fixture JSON file
+
+    Returns:
+        Mapping of URL to recorded response
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    version = data.get("version")
+    if version != FIXTURE_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported fixture version {version} in {path} (expected {FIXTURE_FORMAT_VERSION})"
+        )
+
+    return data.get("responses", {})
+
+
+class RecordingSession:
+    """
+    Wraps a live aiohttp session and captures every GET response into a fixture file
+    """
+
+    def __init__(self, fixture_path: str, headers: Optional[Dict[str, str]] = None):
+        self.fixture_path = fixture_path
+        self._session = aiohttp.ClientSession(headers=headers)
+        self._responses: Dict[str, Any] = {}
+
+        # Merge into an existing recording so several runs can build one fixture set
+        if os.path.exists(fixture_path):
+            try:
+                self._responses = load_fixtures(fixture_path)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable fixture file {fixture_path}: {e}")
+
+    def get(self, url: str, **kwargs) -> _PendingRequest:
+        async def fetch() -> FixtureResponse:
+            async with self._session.get(url, **kwargs) as response:
+                body = await response.text()
+                self._responses[url] = {
+                    "status": response.status,
+                    "content_type": response.content_type,
+                    "body": body
+                }
+                return FixtureResponse(url, response.status, body, response.content_type)
+
+        return _PendingRequest(fetch)
+
+    async def close(self):
+        await self._session.close()
+
+        directory = os.path.dirname(self.fixture_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.fixture_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": FIXTURE_FORMAT_VERSION,
+                "recorded_at": datetime.now().isoformat(),
+                "responses": self._responses
+            }, f, indent=2)
+        os.replace(tmp_path, self.fixture_path)
+
+        logger.info(f"Recorded {len(self._responses)} responses to {self.fixture_path}")
+
+
+class ReplaySession:
+    """
+    Serves GET requests from a fixture file with injected latency and errors
+    """
+
+    def __init__(self, fixture_path: str, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, seed: Optional[int] = None):
+        """
+        Initialize the replay session
+
+        Args:
+            fixture_path: Path to a recorded fixture file
+            latency_ms: Base latency added to every request
+            jitter_ms: Uniform random jitter added on top of the base latency
+            error_rate: Probability (0.0 to 1.0) that a request raises a connection error
+            seed: Seed for latency/error randomness so runs are reproducible
+        """
+        self.fixture_path = fixture_path
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._responses = load_fixtures(fixture_path)
+        self.requests_served = 0
+        self.errors_injected = 0
+        self.misses = 0
+
+    def get(self, url: str, **kwargs) -> _PendingRequest:
+        async def fetch() -> FixtureResponse:
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000.0)
+
+            if self.error_rate > 0 and self._random.random() < self.error_rate:
+                self.errors_injected += 1
+                raise aiohttp.ClientConnectionError(f"Injected replay error for {url}")
+
+            recorded = self._responses.get(url)
+            if recorded is None:
+                self.misses += 1
+                logger.warning(f"No fixture recorded for {url}")
+                return FixtureResponse(url, 404, "")
+
+            self.requests_served += 1
+            return FixtureResponse(
+                url,
+                recorded.get("status", 200),
+                recorded.get("body", ""),
+                recorded.get("content_type", "text/html")
+            )
+
+        return _PendingRequest(fetch)
+
+    async def close(self):
+        logger.debug(
+            f"Replay session closed: {self.requests_served} served, "
+            f"{self.misses} misses, {self.errors_injected} injected errors"
+        )
+
+
+def create_trend_session(mode: str, headers: Dict[str, str], fixture_path: str,
+                         latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                         error_rate: float = 0.0, seed: Optional[int] = None):
+    """
+    Create the HTTP session used by TrendAnalyzer for the given mode
+
+    Args:
+        mode: "live", "record" or "replay"
+        headers: Default request headers
+        fixture_path: Fixture file for record/replay modes
+        latency_ms, jitter_ms, error_rate, seed: Replay fault injection settings
+
+    Returns:
+        Object exposing get(url) and close() like aiohttp.ClientSession
+    """
+    if mode not in HTTP_MODES:
+        raise ValueError(f"Unknown trend HTTP mode '{mode}', expected one of {HTTP_MODES}")
+
+    if mode == "record":
+        return RecordingSession(fixture_path, headers=headers)
+    if mode == "replay":
+        return ReplaySession(fixture_path, latency_ms, jitter_ms, error_rate, seed)
+    return aiohttp.ClientSession(headers=headers)
@@ -0,0 +1,160 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable
+import logging
+from config import Config
+from .trend_analyzer import TrendAnalyzer
+from .trend_cache import get_trend_cache
+
+logger = logging.getLogger(__name__)
+
+
+def load_known_roles(role_skills_path: str, team_roles: Iterable[str] = ()) -> List[str]:
+    """
+    Collect the roles worth prewarming
+
+    Args:
+        role_skills_path: Path to role-skill mapping JSON file
+        team_roles: Roles of the currently ingested team
+
+    Returns:
+        De-duplicated list of roles, mapped roles first
+    """
+    roles = []
+    try:
+        with open(role_skills_path, 'r') as f:
+            roles.extend(json.load(f).keys())
+    except FileNotFoundError:
+        logger.warning(f"Role skills file not found: {role_skills_path}")
+    except Exception as e:
+        logger.error(f"Failed to load roles for prewarming: {e}")
+
+    for role in team_roles:
+        if role and role not in roles:
+            roles.append(role)
+
+    return roles
+
+
+class TrendPrewarmer:
+    """
+    Prefetches trends for known roles into the trend cache with bounded concurrency
+    """
+
+    def __init__(self, concurrency: int = 3):
+        """
+        Initialize the prewarmer
+
+        Args:
+            concurrency: Maximum number of roles fetched at once
+        """
+        self.concurrency = max(1, concurrency)
+        self.state = "idle"
+        self.ready = False
+        self.roles_total = 0
+        self.roles_warmed = 0
+        self.failed_roles: List[str] = []
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self._tasks = set()
+
+    async def _warm_role(self, role: str, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            try:
+                async with TrendAnalyzer() as analyzer:
+                    failed_sources = await analyzer.prefetch(role)
+                if failed_sources:
+                    # Cached only briefly, so the next request or warm pass refetches
+                    self._mark_failed(role)
+                    logger.warning(f"Prewarmed trends for {role} without sources: {', '.join(failed_sources)}")
+                else:
+                    self.roles_warmed += 1
+                    if role in self.failed_roles:
+                        self.failed_roles.remove(role)
+                    logger.debug(f"Prewarmed trends for {role}")
+            except Exception as e:
+                self._mark_failed(role)
+                logger.warning(f"Failed to prewarm trends for {role}: {e}")
+
+    def _mark_failed(self, role: str):
+        if role not in self.failed_roles:
+            self.failed_roles.append(role)
+
+    async def warm(self, roles: List[str]):
+        """
+        Prefetch trends for every role not already cached
+
+        The prewarmer becomes ready after the first warm pass completes, even if
+        some roles failed; those fall back to fetching on first request, and the
+        state is "degraded" until a later pass warms them.
+
+        Args:
+            roles: Roles to warm
+        """
+        cache = get_trend_cache()
+        pending = [role for role in roles if not cache.is_fresh(role)]
+
+        self.state = "warming"
+        self.roles_total += len(pending)
+        self.started_at = self.started_at or datetime.now().isoformat()
+        logger.info(f"Prewarming trends for {len(pending)} roles (concurrency {self.concurrency})")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            await asyncio.gather(*(self._warm_role(role, semaphore) for role in pending))
+        finally:
+            self.state = "degraded" if self.failed_roles else "ready"
+            self.ready = True
+            self.finished_at = datetime.now().isoformat()
+
+        logger.info(f"Trend prewarm finished: {self.roles_warmed}/{self.roles_total} roles warmed")
+
+    def schedule(self, roles: List[str]) -> asyncio.Task:
+        """
+        Warm roles in the background on the running event loop
+
+        Args:
+            roles: Roles to warm
+
+        Returns:
+            The background task
+        """
+        task = asyncio.create_task(self.warm(roles))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def cancel(self):
+        """Cancel any warming still in progress"""
+        for task in list(self._tasks):
+            task.cancel()
+
+    def mark_ready(self):
+        """Mark ready without warming (prewarming disabled)"""
+        self.state = "ready"
+        self.ready = True
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "roles_total": self.roles_total,
+            "roles_warmed": self.roles_warmed,
+            "failed_roles": self.failed_roles,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "cache": get_trend_cache().get_stats()
+        }
+
+
+_prewarmer: Optional[TrendPrewarmer] = None
+
+
+def get_trend_prewarmer() -> TrendPrewarmer:
+    """Get or create the process-wide trend prewarmer"""
+    global _prewarmer
+    if _prewarmer is None:
+        _prewarmer = TrendPrewarmer(Config.TREND_PREWARM_CONCURRENCY)
+    return _prewarmer
@@ -1,40 +1,70 @@
 import asyncio
-import aiohttp
 import requests
 import feedparser
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 from datetime import datetime, timedelta
 import json
 import re
 from asyncio_throttle import Throttler
+from config import Config
+from .http_replay import create_trend_session
+from .trend_dedup import TrendClusterer
+from .trend_cache import get_trend_cache
 
 logger = logging.getLogger(__name__)
 
+# Source names, in the order _fetch_source_trends returns their trend lists
+TREND_SOURCES = ("github", "blogs", "learning", "job_market", "ai")
+
 class TrendAnalyzer:
     """
     Fetches real-time industry trends and skill data from multiple sources
     """
     
-    def __init__(self):
-        self.throttler = Throttler(rate_limit=10, period=1)  # 10 requests per second
+    def __init__(self, http_mode: Optional[str] = None, fixture_path: Optional[str] = None,
+                 use_cache: bool = True):
+        """
+        Initialize the trend analyzer
+        
+        Args:
+            http_mode: "live", "record" or "replay" (defaults to Config.TREND_HTTP_MODE)
+            fixture_path: Fixture file for record/replay (defaults to Config.TREND_FIXTURE_PATH)
+            use_cache: Serve source fetches from the process-wide trend cache
+        """
+        self.use_cache = use_cache
+        self.throttler = Throttler(rate_limit=Config.TREND_FETCH_RATE_LIMIT, period=Config.TREND_FETCH_PERIOD)
         self.session = None
+        self.http_mode = http_mode or Config.TREND_HTTP_MODE
+        self.fixture_path = fixture_path or Config.TREND_FIXTURE_PATH
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        self.session = create_trend_session(
+            self.http_mode,
+            self.headers,
+            self.fixture_path,
+            latency_ms=Config.TREND_REPLAY_LATENCY_MS,
+            jitter_ms=Config.TREND_REPLAY_JITTER_MS,
+            error_rate=Config.TREND_REPLAY_ERROR_RATE,
+            seed=Config.TREND_REPLAY_SEED
+        )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
     
-    async def get_github_trends(self, language: str = None, timeframe: str = "weekly") -> List[Dict[str, Any]]:
+    async def get_github_trends(self, language: str = None, timeframe: str = "weekly",
+                                raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         Fetch trending repositories from GitHub
+        
+        Args:
+            raise_errors: Re-raise a failed fetch instead of returning an empty list
         """
         try:
             async with self.throttler:
@@ -76,16 +106,20 @@ class TrendAnalyzer:
                         
                         return trends
                     else:
-                        logger.error(f"GitHub trends request failed: {response.status}")
-                        return []
+                        raise RuntimeError(f"GitHub trends request failed: {response.status}")
                         
         except Exception as e:
             logger.error(f"Failed to fetch GitHub trends: {e}")
+            if raise_errors:
+                raise
             return []
     
-    async def get_tech_blog_posts(self, role: str) -> List[Dict[str, Any]]:
+    async def get_tech_blog_posts(self, role: str, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         Fetch relevant tech blog posts for a specific role
+        
+        Args:
+            raise_errors: Re-raise when every blog failed instead of returning an empty list
         """
         try:
             # Define role-specific blog sources
@@ -122,10 +156,11 @@ class TrendAnalyzer:
                 ]
             }
             
-            sources = blog_sources.get(role, blog_sources["Software Engineer"])
+            sources = blog_sources.get(role, blog_sources["Software Engineer"])[:2]  # Limit to 2 sources per role
             all_posts = []
+            failures = 0
             
-            for source in sources[:2]:  # Limit to 2 sources per role
+            for source in sources:
                 try:
                     async with self.throttler:
                         async with self.session.get(source) as response:
@@ -150,20 +185,30 @@ class TrendAnalyzer:
                                             })
                                     except Exception as e:
                                         continue
+                            else:
+                                raise RuntimeError(f"request failed: {response.status}")
                                         
                 except Exception as e:
                     logger.warning(f"Failed to fetch from {source}: {e}")
+                    failures += 1
                     continue
             
+            if failures == len(sources):
+                raise RuntimeError(f"all {failures} blog sources failed")
             return all_posts
             
         except Exception as e:
             logger.error(f"Failed to fetch tech blog posts: {e}")
+            if raise_errors:
+                raise
             return []
     
-    async def get_learning_platform_trends(self) -> List[Dict[str, Any]]:
+    async def get_learning_platform_trends(self, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         Fetch trending courses and skills from learning platforms
+        
+        Args:
+            raise_errors: Re-raise a failed fetch instead of returning an empty list
         """
         try:
             # Simulate fetching from learning platforms
@@ -203,11 +248,16 @@ class TrendAnalyzer:
             
         except Exception as e:
             logger.error(f"Failed to fetch learning platform trends: {e}")
+            if raise_errors:
+                raise
             return []
     
-    async def get_job_market_trends(self, role: str) -> List[Dict[str, Any]]:
+    async def get_job_market_trends(self, role: str, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         Fetch job market trends for a specific role
+        
+        Args:
+            raise_errors: Re-raise a failed fetch instead of returning an empty list
         """
         try:
             # This would integrate with job APIs like Indeed, LinkedIn, etc.
@@ -255,11 +305,16 @@ class TrendAnalyzer:
             
         except Exception as e:
             logger.error(f"Failed to fetch job market trends: {e}")
+            if raise_errors:
+                raise
             return []
     
-    async def get_ai_trends(self) -> List[Dict[str, Any]]:
+    async def get_ai_trends(self, raise_errors: bool = False) -> List[Dict[str, Any]]:
         """
         Fetch AI and ML trends from various sources
+        
+        Args:
+            raise_errors: Re-raise when every feed failed instead of returning an empty list
         """
         try:
             # Fetch from AI-focused RSS feeds and blogs
@@ -270,6 +325,7 @@ class TrendAnalyzer:
             ]
             
             all_trends = []
+            failures = 0
             
             for source in ai_sources:
                 try:
@@ -287,15 +343,22 @@ class TrendAnalyzer:
                                         "type": "ai_trend",
                                         "published": entry.published if hasattr(entry, 'published') else ""
                                     })
+                            else:
+                                raise RuntimeError(f"request failed: {response.status}")
                                     
                 except Exception as e:
                     logger.warning(f"Failed to fetch from {source}: {e}")
+                    failures += 1
                     continue
             
+            if failures == len(ai_sources):
+                raise RuntimeError(f"all {failures} AI feeds failed")
             return all_trends
             
         except Exception as e:
             logger.error(f"Failed to fetch AI trends: {e}")
+            if raise_errors:
+                raise
             return []
     
     async def get_comprehensive_trends(self, role: str, skills: List[str]) -> Dict[str, Any]:
@@ -303,24 +366,23 @@ class TrendAnalyzer:
         Fetch comprehensive trends for a specific role and skills
         """
         try:
-            # Fetch all trend data concurrently
-            tasks = [
-                self.get_github_trends(),
-                self.get_tech_blog_posts(role),
-                self.get_learning_platform_trends(),
-                self.get_job_market_trends(role),
-                self.get_ai_trends()
-            ]
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Fetch all trend data, from the cache when it is warm
+            if self.use_cache:
+                results, failed_sources = await get_trend_cache().get_or_fetch(role, lambda: self._fetch_source_trends(role))
+            else:
+                results, failed_sources = await self._fetch_source_trends(role)
             
             # Process results
             github_trends, blog_posts, learning_trends, job_trends, ai_trends = results
             
+            # Collapse near-duplicates across sources so each signal is scored once
+            trend_lists = [github_trends, blog_posts, learning_trends, job_trends, ai_trends]
+            if Config.TREND_DEDUP_MAX_DISTANCE > 0:
+                fetched = [trend for trend_list in trend_lists if isinstance(trend_list, list) for trend in trend_list]
+                trend_lists = [TrendClusterer(Config.TREND_DEDUP_MAX_DISTANCE).merge(fetched)]
+            
             # Filter and rank trends based on relevance
-            relevant_trends = self._filter_relevant_trends(
-                role, skills, github_trends, blog_posts, learning_trends, job_trends, ai_trends
-            )
+            relevant_trends = self._filter_relevant_trends(role, skills, *trend_lists)
             
             # Add fallback trends if we have very few or no trends
             if len(relevant_trends) < 3:
@@ -338,7 +400,8 @@ class TrendAnalyzer:
                     "learning": len(learning_trends) if isinstance(learning_trends, list) else 0,
                     "job_market": len(job_trends) if isinstance(job_trends, list) else 0,
                     "ai": len(ai_trends) if isinstance(ai_trends, list) else 0
-                }
+                },
+                "failed_sources": failed_sources
             }
             
         except Exception as e:
@@ -354,6 +417,40 @@ class TrendAnalyzer:
                 "error": str(e)
             }
     
+    async def _fetch_source_trends(self, role: str) -> Tuple[List[List[Dict[str, Any]]], List[str]]:
+        """
+        Fetch raw trends from every source concurrently
+        
+        Returns:
+            Per-source trend lists (github, blogs, learning, job market, ai), with failed
+            sources empty, and the names of the sources that failed
+        """
+        tasks = [
+            self.get_github_trends(raise_errors=True),
+            self.get_tech_blog_posts(role, raise_errors=True),
+            self.get_learning_platform_trends(raise_errors=True),
+            self.get_job_market_trends(role, raise_errors=True),
+            self.get_ai_trends(raise_errors=True)
+        ]
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        failed_sources = [name for name, result in zip(TREND_SOURCES, results) if not isinstance(result, list)]
+        return [result if isinstance(result, list) else [] for result in results], failed_sources
+    
+    async def prefetch(self, role: str) -> List[str]:
+        """
+        Warm the trend cache for a role without scoring
+        
+        Args:
+            role: Job role to fetch trends for
+            
+        Returns:
+            Names of the sources that failed to fetch
+        """
+        _, failed_sources = await get_trend_cache().get_or_fetch(role, lambda: self._fetch_source_trends(role))
+        return failed_sources
+    
     def _filter_relevant_trends(self, role: str, skills: List[str], *trend_lists) -> List[Dict[str, Any]]:
         """
         Filter and rank trends based on relevance to role and skills
@@ -367,8 +464,8 @@ class TrendAnalyzer:
             for trend in trend_list:
                 relevance_score = self._calculate_relevance(trend, role, skills)
                 if relevance_score > 0.3:  # Minimum relevance threshold
-                    trend["relevance_score"] = relevance_score
-                    relevant_trends.append(trend)
+                    # Copy so cached source trends are never mutated
+                    relevant_trends.append(dict(trend, relevance_score=relevance_score))
         
         # Sort by relevance score
         relevant_trends.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
@@ -397,6 +494,11 @@ class TrendAnalyzer:
             if keyword in trend_text:
                 score += 0.1
         
+        # Signals reported by several sources are more popular
+        source_count = trend.get("source_count", 1)
+        if source_count > 1:
+            score += min(0.1 * (source_count - 1), 0.3)
+        
         return min(score, 1.0)  # Cap at 1.0
     
     def _get_fallback_trends(self, role: str, skills: List[str]) -> List[Dict[str, Any]]:
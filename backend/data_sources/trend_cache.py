@@ -0,0 +1,125 @@
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+import logging
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class TrendCache:
+    """
+    Process-wide TTL cache of raw per-role source fetches
+
+    Concurrent misses for the same role share a single in-flight fetch, so a
+    burst of cold requests (or a prewarm racing a request) scrapes only once.
+    A fetch where some source failed is kept for failure_ttl_seconds only, so
+    the empty lists it holds for those sources are retried soon.
+    """
+
+    def __init__(self, ttl_seconds: float = 900.0, failure_ttl_seconds: float = 60.0):
+        """
+        Initialize the cache
+
+        Args:
+            ttl_seconds: How long fetched trends stay fresh
+            failure_ttl_seconds: How long a fetch with failed sources stays fresh (0 doesn't cache it)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = min(failure_ttl_seconds, ttl_seconds)
+        self._entries: Dict[str, Tuple[float, float, List[List[Dict[str, Any]]], List[str]]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, role: str) -> Optional[Tuple[List[List[Dict[str, Any]]], List[str]]]:
+        """Return cached source lists and failed source names for a role if still fresh"""
+        entry = self._entries.get(role)
+        if entry is None:
+            return None
+
+        stored_at, ttl, trend_lists, failed_sources = entry
+        if time.monotonic() - stored_at > ttl:
+            del self._entries[role]
+            return None
+
+        return trend_lists, failed_sources
+
+    def set(self, role: str, trend_lists: List[List[Dict[str, Any]]], failed_sources: List[str] = ()):
+        """Store source lists for a role, briefly if some source failed"""
+        ttl = self.failure_ttl_seconds if failed_sources else self.ttl_seconds
+        if ttl > 0:
+            self._entries[role] = (time.monotonic(), ttl, trend_lists, list(failed_sources))
+
+    def is_fresh(self, role: str) -> bool:
+        return self.get(role) is not None
+
+    async def get_or_fetch(
+        self, role: str,
+        fetch: Callable[[], Awaitable[Tuple[List[List[Dict[str, Any]]], List[str]]]]
+    ) -> Tuple[List[List[Dict[str, Any]]], List[str]]:
+        """
+        Return cached source lists for a role, fetching them once on a miss
+
+        Args:
+            role: Job role used as cache key
+            fetch: Coroutine factory that fetches the raw source lists and the names of failed sources
+
+        Returns:
+            List of per-source trend lists and the names of the sources that failed
+        """
+        if self.ttl_seconds <= 0:
+            return await fetch()
+
+        cached = self.get(role)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        inflight = self._inflight.get(role)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[role] = future
+        try:
+            result = await fetch()
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure doesn't log "exception never retrieved"
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[role]
+
+        self.set(role, *result)
+        future.set_result(result)
+        return result
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cached_roles": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "failure_ttl_seconds": self.failure_ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+_trend_cache: Optional[TrendCache] = None
+
+
+def get_trend_cache() -> TrendCache:
+    """Get or create the process-wide trend cache"""
+    global _trend_cache
+    if _trend_cache is None:
+        _trend_cache = TrendCache(Config.TREND_CACHE_TTL, Config.TREND_CACHE_FAILURE_TTL)
+    return _trend_cache
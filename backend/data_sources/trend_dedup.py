@@ -0,0 +1,179 @@
+import hashlib
+import re
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+# Cluster representatives compared per band bucket; bounds the work for crowded buckets
+MAX_BUCKET_SCAN = 32
+
+
+def trend_text(trend: Dict[str, Any]) -> str:
+    """Text used to fingerprint a trend, regardless of which source produced it"""
+    title = trend.get("title", trend.get("name", trend.get("skill", "")))
+    description = trend.get("description", trend.get("summary", ""))
+    return f"{title} {description}".lower()
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int:
+    """
+    Compute a 64-bit SimHash over word unigrams and bigrams
+
+    Args:
+        text: Normalized text
+
+    Returns:
+        SimHash fingerprint as an int
+    """
+    tokens = _TOKEN_PATTERN.findall(text)
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        h = _token_hash(feature)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def _published_sort_key(published: str) -> tuple:
+    """Sort key ordering feed dates chronologically (RFC 822 or ISO), unparseable dates last"""
+    parsed: Optional[float] = None
+    try:
+        parsed = parsedate_to_datetime(published).timestamp()
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(published).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return (parsed is None, parsed or 0.0, published)
+
+
+class TrendClusterer:
+    """
+    Groups near-duplicate trends from different sources using SimHash with banded lookup
+    """
+
+    def __init__(self, max_distance: int = 3):
+        """
+        Initialize the clusterer
+
+        Args:
+            max_distance: Maximum Hamming distance between fingerprints of duplicates
+        """
+        self.max_distance = max_distance
+        # With max_distance + 1 bands, any two fingerprints within max_distance bits
+        # agree exactly on at least one band (pigeonhole), so bands are the only
+        # candidates we need to compare
+        self.bands = max_distance + 1
+        self.band_width = SIMHASH_BITS // self.bands
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_width) - 1
+        return [(fingerprint >> (i * self.band_width)) & mask for i in range(self.bands)]
+
+    def cluster(self, trends: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Cluster trends into near-duplicate groups
+
+        Args:
+            trends: List of trend dictionaries
+
+        Returns:
+            List of clusters, each a list of indices into trends
+        """
+        parent = list(range(len(trends)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        texts = [trend_text(trend) for trend in trends]
+        fingerprints = [simhash(text) for text in texts]
+        # Buckets hold cluster representatives only: a trend joins the cluster of
+        # the first representative within max_distance, and only trends that
+        # match none start a new cluster and enter the buckets. A representative
+        # shares a band with everything within max_distance of it, so this finds
+        # every match while keeping buckets as small as the number of clusters.
+        buckets: Dict[tuple, List[int]] = {}
+
+        for i, fingerprint in enumerate(fingerprints):
+            if not texts[i].strip():
+                continue
+            keys = [(band, key) for band, key in enumerate(self._band_keys(fingerprint))]
+            matched = False
+            for band_key in keys:
+                for j in buckets.get(band_key, ())[-MAX_BUCKET_SCAN:]:
+                    if bin(fingerprint ^ fingerprints[j]).count("1") <= self.max_distance:
+                        root_i, root_j = find(i), find(j)
+                        if root_i != root_j:
+                            parent[root_i] = root_j
+                        matched = True
+            if not matched:
+                for band_key in keys:
+                    buckets.setdefault(band_key, []).append(i)
+
+        clusters: Dict[int, List[int]] = {}
+        for i in range(len(trends)):
+            clusters.setdefault(find(i), []).append(i)
+        return list(clusters.values())
+
+    def merge(self, trends: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Collapse each near-duplicate cluster into one representative trend
+
+        The representative is the most descriptive member. It gains the list
+        of distinct "sources" and their count as "source_count", the earliest
+        "published" date and the largest "courses_count" of the cluster; its
+        other fields are left as they are.
+
+        Args:
+            trends: List of trend dictionaries
+
+        Returns:
+            List of merged trends, in first-seen order
+        """
+        merged = []
+        for indices in self.cluster(trends):
+            members = [trends[i] for i in indices]
+            representative = dict(max(members, key=lambda t: len(trend_text(t))))
+
+            sources = []
+            for member in members:
+                source = member.get("source", "Unknown")
+                if source not in sources:
+                    sources.append(source)
+            representative["source_count"] = len(sources)
+            representative["sources"] = sources
+
+            published = [member["published"] for member in members if member.get("published")]
+            if published:
+                representative["published"] = min(published, key=_published_sort_key)
+            courses = [member["courses_count"] for member in members
+                       if isinstance(member.get("courses_count"), (int, float))]
+            if courses:
+                representative["courses_count"] = max(courses)
+            merged.append((indices[0], representative))
+
+        merged.sort(key=lambda item: item[0])
+        if len(merged) < len(trends):
+            logger.debug(f"Merged {len(trends)} trends into {len(merged)} distinct signals")
+        return [trend for _, trend in merged]
@@ -0,0 +1 @@
+# Ingestion package 
\ No newline at end of file
@@ -0,0 +1,130 @@
+import re
+from typing import Callable, Iterable, Iterator, List, Tuple, Dict, Any
+import logging
+from .loaders import Section
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends followed by whitespace, or line breaks (list items, table rows)
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, keeping the original sentence text"""
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+class TokenChunker:
+    """
+    Splits document sections into token-bounded, overlapping chunks
+
+    Sentences are packed into a chunk until the next one would exceed
+    max_tokens; the chunk's trailing sentences (up to overlap_tokens) then
+    start the next chunk so context isn't lost at the boundary. A section
+    change (heading, page) always starts a new chunk, and a single sentence
+    longer than max_tokens is split on word boundaries. Token counts come
+    from the embedding model's tokenizer, so chunks are never truncated
+    at embedding time.
+
+    Chunks are yielded lazily; only the current chunk is kept in memory.
+    """
+
+    def __init__(self, count_tokens: Callable[[str], int], max_tokens: int = 200, overlap_tokens: int = 32):
+        """
+        Configure the chunker
+
+        Args:
+            count_tokens: Returns the number of model tokens in a text
+            max_tokens: Upper bound on tokens per chunk
+            overlap_tokens: Tokens of trailing context repeated at the start of the next chunk
+        """
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        self.count_tokens = count_tokens
+        self.max_tokens = max_tokens
+        self.overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+
+    def _split_long_sentence(self, sentence: str) -> Iterator[Tuple[str, int]]:
+        """Split a sentence over max_tokens into word windows that fit"""
+        words = sentence.split()
+        piece: List[str] = []
+        for word in words:
+            candidate = " ".join(piece + [word])
+            if piece and self.count_tokens(candidate) > self.max_tokens:
+                text = " ".join(piece)
+                yield text, self.count_tokens(text)
+                piece = [word]
+            else:
+                piece.append(word)
+        if piece:
+            text = " ".join(piece)
+            yield text, self.count_tokens(text)
+
+    def _units(self, text: str) -> Iterator[Tuple[str, int]]:
+        """Sentences of a section with their token counts, long sentences pre-split"""
+        for sentence in split_sentences(text):
+            tokens = self.count_tokens(sentence)
+            if tokens > self.max_tokens:
+                yield from self._split_long_sentence(sentence)
+            else:
+                yield sentence, tokens
+
+    def _overlap(self, units: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        """Trailing units of a finished chunk that fit in overlap_tokens"""
+        carried: List[Tuple[str, int]] = []
+        total = 0
+        for unit in reversed(units):
+            if total + unit[1] > self.overlap_tokens:
+                break
+            carried.insert(0, unit)
+            total += unit[1]
+        return carried
+
+    def chunk_sections(self, sections: Iterable[Section]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Chunk a stream of sections
+
+        Args:
+            sections: (text, metadata) pairs, e.g. from iter_document_sections
+
+        Returns:
+            Iterator of (chunk_text, metadata) with a per-document "chunk" index added
+        """
+        chunk_index = 0
+        units: List[Tuple[str, int]] = []
+        tokens = 0
+        metadata: Dict[str, Any] = {}
+        # Units carried over as overlap; a chunk made only of them adds nothing new
+        carried = 0
+
+        def emit():
+            nonlocal chunk_index
+            chunk = (" ".join(text for text, _ in units), {**metadata, "chunk": chunk_index})
+            chunk_index += 1
+            return chunk
+
+        for text, section_metadata in sections:
+            # Merge consecutive paragraphs of the same section; a new section starts a new chunk
+            if units and section_metadata != metadata:
+                if len(units) > carried:
+                    yield emit()
+                units, tokens, carried = [], 0, 0
+            metadata = section_metadata
+
+            for unit in self._units(text):
+                if units and tokens + unit[1] > self.max_tokens:
+                    if len(units) > carried:
+                        yield emit()
+                    units = self._overlap(units)
+                    # Drop overlap that would leave no room for the new unit
+                    while units and sum(t for _, t in units) + unit[1] > self.max_tokens:
+                        units.pop(0)
+                    tokens = sum(t for _, t in units)
+                    carried = len(units)
+                units.append(unit)
+                tokens += unit[1]
+
+        if len(units) > carried:
+            yield emit()
+
+        logger.debug(f"Chunked document into {chunk_index} chunks")
@@ -0,0 +1,338 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+import logging
+from config import Config
+from vectorizer.registry import get_registry
+from .pipeline import ingest_document
+
+logger = logging.getLogger(__name__)
+
+JOB_STATES = ("queued", "running", "succeeded", "failed")
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the ingestion queue is at capacity"""
+
+
+class IngestionJob:
+    """
+    One document waiting for or going through ingestion
+
+    Progress is written by the worker running the job and read by status
+    requests; every update replaces whole values, so readers never see a
+    half-updated count.
+    """
+
+    def __init__(self, file_path: str, document_type: str, source: str, collection: str,
+                 delete_file: bool = False):
+        """
+        Args:
+            file_path: Path to the document
+            document_type: "pdf", "docx" or "txt"
+            source: Name recorded as the chunks' source
+            collection: Collection to ingest into
+            delete_file: Remove the file once the job has finished (uploaded temporary files)
+        """
+        self.id = uuid.uuid4().hex
+        self.file_path = file_path
+        self.document_type = document_type
+        self.source = source
+        self.collection = collection
+        self.delete_file = delete_file
+        self.file_bytes = os.path.getsize(file_path)
+
+        self.state = "queued"
+        self.stage: Optional[str] = None
+        self.progress: Dict[str, int] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+        self.submitted_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self._submitted = time.monotonic()
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("succeeded", "failed")
+
+    @property
+    def queue_wait_s(self) -> float:
+        return (self._started or time.monotonic()) - self._submitted
+
+    @property
+    def elapsed_s(self) -> float:
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.monotonic()) - self._started
+
+    def update(self, stage: str, counts: Dict[str, int]):
+        """Record the stage and running counts reported by the pipeline"""
+        self.progress = dict(counts)
+        self.stage = stage
+
+    def start(self):
+        self._started = time.monotonic()
+        self.started_at = datetime.now().isoformat()
+        self.state = "running"
+
+    def finish(self, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        self._finished = time.monotonic()
+        self.finished_at = datetime.now().isoformat()
+        self.result = result
+        self.error = error
+        self.stage = None
+        self.state = "failed" if error is not None else "succeeded"
+
+    def get_status(self) -> Dict[str, Any]:
+        elapsed = self.elapsed_s
+        chunks = self.progress.get("chunks", 0)
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "source": self.source,
+            "collection": self.collection,
+            "document_type": self.document_type,
+            "file_bytes": self.file_bytes,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_wait_s": round(self.queue_wait_s, 3),
+            "elapsed_s": round(elapsed, 3),
+            "chunks_per_s": round(chunks / elapsed, 1) if elapsed > 0 else None
+        }
+
+
+class IngestionJobQueue:
+    """
+    Bounded queue of ingestion jobs drained by a pool of worker threads
+
+    Submitting never blocks: when Config.INGEST_QUEUE_SIZE jobs are already
+    waiting, submit raises QueueFullError so the API can tell the client to
+    retry later instead of piling up uploads. Finished jobs are kept for
+    status requests until Config.INGEST_JOB_RETENTION newer ones have
+    finished.
+    """
+
+    def __init__(self, run_job: Callable[[IngestionJob], Dict[str, Any]], workers: int = 2,
+                 max_queued: int = 16, retention: int = 1000):
+        """
+        Start the worker threads
+
+        Args:
+            run_job: Runs a job to completion, returning its result (exceptions fail the job)
+            workers: Number of jobs run at once
+            max_queued: Jobs waiting beyond the running ones before submissions are rejected
+            retention: Finished jobs kept for status requests
+        """
+        self.run_job = run_job
+        self.max_queued = max(1, max_queued)
+        self.retention = max(1, retention)
+        self._queue: "queue.Queue[Optional[IngestionJob]]" = queue.Queue(maxsize=self.max_queued)
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.submitted = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.chunks_processed = 0
+        self.bytes_processed = 0
+        self.busy_s = 0.0
+        self.queue_wait_s = 0.0
+        self._started = time.monotonic()
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"ingest-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+        logger.info(f"Started {len(self._workers)} ingestion workers (queue capacity {self.max_queued})")
+
+    def submit(self, job: IngestionJob) -> IngestionJob:
+        """
+        Queue a job
+
+        Raises:
+            QueueFullError: If the queue is at capacity or shutting down
+        """
+        with self._lock:
+            if self._closed:
+                raise QueueFullError("Ingestion queue is shutting down")
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.rejected += 1
+                raise QueueFullError(f"Ingestion queue is full ({self.max_queued} jobs waiting)")
+            self._jobs[job.id] = job
+            self.submitted += 1
+
+        logger.info(f"Queued ingestion job {job.id} for {job.source} ({self._queue.qsize()} waiting)")
+        return job
+
+    def is_full(self) -> bool:
+        return self._closed or self._queue.full()
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, limit: int = 50) -> List[IngestionJob]:
+        """Most recently submitted jobs first"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return jobs[::-1][:limit]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            self._run(job)
+
+    def _run(self, job: IngestionJob):
+        job.start()
+        logger.info(f"Running ingestion job {job.id} for {job.source}")
+        try:
+            job.finish(result=self.run_job(job))
+        except Exception as e:
+            logger.error(f"Ingestion job {job.id} for {job.source} failed: {e}")
+            job.finish(error=str(e))
+        finally:
+            if job.delete_file:
+                try:
+                    os.unlink(job.file_path)
+                except OSError:
+                    pass
+        self._record(job)
+
+    def _record(self, job: IngestionJob):
+        """Count a finished job into the metrics and forget the oldest finished jobs"""
+        with self._lock:
+            if job.state == "succeeded":
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.chunks_processed += job.progress.get("chunks", 0)
+            self.bytes_processed += job.file_bytes
+            self.busy_s += job.elapsed_s
+            self.queue_wait_s += job.queue_wait_s
+
+            finished = [job_id for job_id, queued in self._jobs.items() if queued.finished]
+            for job_id in finished[:max(0, len(finished) - self.retention)]:
+                del self._jobs[job_id]
+
+    def close(self):
+        """Fail jobs still waiting and stop the workers once their current jobs finish"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.finish(error="Cancelled: server shutting down")
+                if job.delete_file:
+                    try:
+                        os.unlink(job.file_path)
+                    except OSError:
+                        pass
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        finished = self.succeeded + self.failed
+        return {
+            "workers": len(self._workers),
+            "running": sum(1 for job in list(self._jobs.values()) if job.state == "running"),
+            "queued": self._queue.qsize(),
+            "capacity": self.max_queued,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "chunks_processed": self.chunks_processed,
+            "bytes_processed": self.bytes_processed,
+            # Per busy worker-second, and over the queue's lifetime
+            "chunks_per_busy_s": round(self.chunks_processed / self.busy_s, 1) if self.busy_s > 0 else None,
+            "jobs_per_minute": round(60.0 * finished / (time.monotonic() - self._started), 2),
+            "mean_queue_wait_s": round(self.queue_wait_s / finished, 3) if finished else None
+        }
+
+
+def run_document_job(job: IngestionJob) -> Dict[str, Any]:
+    """
+    Ingest a job's document into its collection
+
+    Returns:
+        IngestResponse fields: message and chunk counts
+    """
+    # A reload or drop while the job runs closes this instance, and its remaining writes fail
+    vectorstore = get_registry().get_vectorstore(job.collection, create=True)
+    try:
+        counts = ingest_document(job.file_path, job.document_type, vectorstore, job.source, progress=job.update)
+    except ImportError:
+        library = "PyPDF2" if job.document_type == "pdf" else "python-docx"
+        raise RuntimeError(f"{library} not available for {job.document_type.upper()} processing")
+
+    if counts["added"] == 0 and counts["removed"] == 0 and counts["skipped"] > 0:
+        message = f"Document '{job.source}' was already ingested"
+    elif counts["removed"] > 0:
+        message = f"Document '{job.source}' updated successfully"
+    else:
+        message = f"Document '{job.source}' ingested successfully"
+
+    logger.info(f"Ingested document {job.source}: {counts['added']} chunks created, "
+                f"{counts['skipped']} skipped, {counts['removed']} removed")
+    return {
+        "message": message,
+        "documents_processed": 1,
+        "chunks_created": counts["added"],
+        "chunks_skipped": counts["skipped"],
+        "chunks_removed": counts["removed"]
+    }
+
+
+_job_queue: Optional[IngestionJobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> IngestionJobQueue:
+    """Get the process-wide ingestion job queue, starting its workers on first use"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = IngestionJobQueue(run_document_job, Config.INGEST_WORKERS,
+                                               Config.INGEST_QUEUE_SIZE, Config.INGEST_JOB_RETENTION)
+    return _job_queue
+
+
+def peek_job_queue() -> Optional[IngestionJobQueue]:
+    """The ingestion job queue if it has been started, without starting it"""
+    return _job_queue
+
+
+def close_job_queue():
+    """Stop the ingestion workers, if they were started"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is not None:
+            _job_queue.close()
+            _job_queue = None
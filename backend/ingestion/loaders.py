@@ -0,0 +1,117 @@
+import os
+from typing import Iterator, Tuple, Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_DOCUMENT_TYPES = ["pdf", "docx", "txt"]
+
+# A section is a piece of document text plus the metadata it was found under
+Section = Tuple[str, Dict[str, Any]]
+
+
+def _is_markdown_heading(line: str) -> bool:
+    stripped = line.lstrip()
+    return stripped.startswith("#") and stripped.lstrip("#").startswith(" ")
+
+
+def iter_txt_sections(file_path: str, base_metadata: Dict[str, Any]) -> Iterator[Section]:
+    """
+    Stream a text file as paragraphs, tracking markdown-style headings
+
+    Only one paragraph is held in memory at a time.
+    """
+    heading = None
+    paragraph = []
+
+    def flush():
+        text = "\n".join(paragraph).strip()
+        paragraph.clear()
+        if text:
+            metadata = dict(base_metadata)
+            if heading:
+                metadata["section"] = heading
+            return text, metadata
+        return None
+
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if _is_markdown_heading(line):
+                section = flush()
+                if section:
+                    yield section
+                heading = line.strip().lstrip("#").strip()
+                # Headings also start the next chunk, so keep them in the text
+                paragraph.append(line.strip())
+            elif not line.strip():
+                section = flush()
+                if section:
+                    yield section
+            else:
+                paragraph.append(line)
+
+    section = flush()
+    if section:
+        yield section
+
+
+def iter_pdf_sections(file_path: str, base_metadata: Dict[str, Any]) -> Iterator[Section]:
+    """Stream a PDF page by page"""
+    import PyPDF2
+
+    with open(file_path, "rb") as f:
+        pdf_reader = PyPDF2.PdfReader(f)
+        for page_num, page in enumerate(pdf_reader.pages):
+            content = page.extract_text() or ""
+            if content.strip():
+                yield content, {**base_metadata, "page": page_num + 1}
+
+
+def iter_docx_sections(file_path: str, base_metadata: Dict[str, Any]) -> Iterator[Section]:
+    """Stream a DOCX file paragraph by paragraph, tracking Heading-styled paragraphs"""
+    from docx import Document
+
+    heading = None
+    for paragraph in Document(file_path).paragraphs:
+        text = paragraph.text.strip()
+        if not text:
+            continue
+        style = paragraph.style.name if paragraph.style is not None else ""
+        if style.startswith("Heading") or style == "Title":
+            heading = text
+        metadata = dict(base_metadata)
+        if heading:
+            metadata["section"] = heading
+        yield text, metadata
+
+
+def iter_document_sections(file_path: str, document_type: str, source: Optional[str] = None) -> Iterator[Section]:
+    """
+    Lazily read a document as (text, metadata) sections
+
+    Args:
+        file_path: Path to the document
+        document_type: One of SUPPORTED_DOCUMENT_TYPES
+        source: Name recorded as the chunks' source (defaults to the file name)
+
+    Returns:
+        Iterator of sections in document order
+
+    Raises:
+        ValueError: For unsupported document types
+        ImportError: If the parser library for the type isn't installed
+    """
+    base_metadata = {
+        "source": source or os.path.basename(file_path),
+        "document_type": document_type
+    }
+
+    if document_type == "txt":
+        return iter_txt_sections(file_path, base_metadata)
+    if document_type == "pdf":
+        return iter_pdf_sections(file_path, base_metadata)
+    if document_type == "docx":
+        return iter_docx_sections(file_path, base_metadata)
+
+    raise ValueError(f"Document type must be one of {SUPPORTED_DOCUMENT_TYPES}")
@@ -0,0 +1,92 @@
+from typing import Callable, Dict, Iterable, Optional
+import logging
+import os
+from config import Config
+from vectorizer.content_hashes import file_hash
+from vectorizer.vectorstore import SkillVectorStore
+from .chunker import TokenChunker
+from .loaders import iter_document_sections
+
+logger = logging.getLogger(__name__)
+
+# Room for the [CLS] / [SEP] tokens the model adds around every chunk
+SPECIAL_TOKENS = 2
+
+
+def build_chunker(embedder) -> TokenChunker:
+    """
+    Chunker sized to the embedder's tokenizer
+
+    Args:
+        embedder: SkillEmbedder (or a wrapper delegating to one)
+
+    Returns:
+        TokenChunker whose chunks fit the model without truncation
+    """
+    max_tokens = min(Config.CHUNK_MAX_TOKENS, embedder.max_seq_length - SPECIAL_TOKENS)
+    return TokenChunker(embedder.count_tokens, max_tokens, Config.CHUNK_OVERLAP_TOKENS)
+
+
+def _counted(items: Iterable, counts: Dict[str, int], key: str):
+    """Pass items through, counting them in counts[key]"""
+    for item in items:
+        counts[key] += 1
+        yield item
+
+
+def ingest_document(file_path: str, document_type: str, vectorstore: SkillVectorStore,
+                    source: Optional[str] = None, progress: Optional[Callable[[str, Dict[str, int]], None]] = None) -> Dict[str, int]:
+    """
+    Load, chunk, embed and store one document
+
+    The source name is the document's id: ingesting a new version of a file
+    replaces the chunks of the old one, embedding only the chunks that
+    changed. A file whose bytes are already ingested under the same source
+    is skipped without parsing.
+
+    Parsing, chunking, embedding and indexing are streamed batch by batch,
+    so progress is reported as the stage of the latest step: "hashing",
+    "parsing" (until the first batch is stored), "embedding" (after each
+    stored batch) and "indexing" (once every chunk is stored, while rows of
+    an older version are tombstoned). The store's write lock is only taken
+    for each batch's commit, so documents are parsed and embedded in
+    parallel.
+
+    Args:
+        file_path: Path to the document
+        document_type: "pdf", "docx" or "txt"
+        vectorstore: Store to add to
+        source: Name recorded as the chunks' source and doc_id (defaults to the file name)
+        progress: Called with (stage, counts of "sections", "chunks", "added" and "skipped" so far)
+
+    Returns:
+        Counts of chunks "added", "skipped" (already stored) and "removed" (from an older version)
+    """
+    source = source or os.path.basename(file_path)
+    running = {"sections": 0, "chunks": 0, "added": 0, "skipped": 0}
+    report = progress or (lambda stage, counts: None)
+
+    report("hashing", running)
+    document_hash = file_hash(file_path)
+    previous = vectorstore.get_ingested_document(document_hash)
+    if previous is not None and previous["source"] == source:
+        logger.info(f"Skipping {source}: identical to the version already ingested")
+        return {"added": 0, "skipped": previous["chunks"], "removed": 0}
+
+    def batch_stored(added: int, skipped: int):
+        running.update(added=added, skipped=skipped)
+        report("embedding", running)
+
+    def stream_chunks():
+        sections = _counted(iter_document_sections(file_path, document_type, source), running, "sections")
+        yield from _counted(chunker.chunk_sections(sections), running, "chunks")
+        report("indexing", running)
+
+    chunker = build_chunker(vectorstore.embedder)
+    report("parsing", running)
+    counts = vectorstore.upsert_chunks(source, stream_chunks(), progress=batch_stored)
+    vectorstore.record_ingested_document(document_hash, source, counts["added"] + counts["skipped"])
+
+    logger.info(f"Ingested {source}: {counts['added']} new chunks, {counts['skipped']} unchanged, "
+                f"{counts['removed']} removed (up to {chunker.max_tokens} tokens each)")
+    return counts
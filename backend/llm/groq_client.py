@@ -233,6 +233,8 @@ Focus on skills that will broaden their perspective and make them more versatile
             if description:
                 formatted_trends.append(f"   Description: {description[:200]}...")
             formatted_trends.append(f"   Source: {source}")
+            if trend.get("source_count", 1) > 1:
+                formatted_trends.append(f"   Reported by {trend['source_count']} sources")
             formatted_trends.append("")
         
         return "\n".join(formatted_trends)
@@ -47,8 +47,49 @@ class TeamUploadResponse(BaseModel):
 class IngestRequest(BaseModel):
     file_path: str = Field(..., description="Path to document to ingest")
     document_type: str = Field(..., description="Type of document (pdf, docx, txt)")
+    collection: str = Field("default", description="Collection to ingest into")
 
 class IngestResponse(BaseModel):
     message: str = Field(..., description="Ingestion status message")
     documents_processed: int = Field(..., description="Number of documents processed")
-    chunks_created: int = Field(..., description="Number of text chunks created") 
\ No newline at end of file
+    chunks_created: int = Field(..., description="Number of text chunks created")
+    chunks_skipped: int = Field(0, description="Number of chunks skipped because identical content was already stored")
+    chunks_removed: int = Field(0, description="Number of chunks of a previous version of the document that were deleted")
+
+class IngestJobResponse(BaseModel):
+    job_id: str = Field(..., description="Id of the queued ingestion job")
+    state: str = Field(..., description="Job state (queued, running, succeeded, failed)")
+    status_url: str = Field(..., description="Where to poll the job's status")
+
+class IngestJobStatus(BaseModel):
+    job_id: str = Field(..., description="Ingestion job id")
+    state: str = Field(..., description="Job state (queued, running, succeeded, failed)")
+    stage: Optional[str] = Field(None, description="Current stage while running (hashing, parsing, embedding, indexing)")
+    source: str = Field(..., description="Document name")
+    collection: str = Field(..., description="Collection the document is ingested into")
+    document_type: str = Field(..., description="Type of document (pdf, docx, txt)")
+    file_bytes: int = Field(..., description="Size of the document file")
+    progress: Dict[str, int] = Field(..., description="Sections parsed, chunks produced, added and skipped so far")
+    result: Optional[IngestResponse] = Field(None, description="Ingestion result once the job has succeeded")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    submitted_at: str = Field(..., description="When the job was queued")
+    started_at: Optional[str] = Field(None, description="When a worker started the job")
+    finished_at: Optional[str] = Field(None, description="When the job finished")
+    queue_wait_s: float = Field(..., description="Seconds spent waiting for a worker")
+    elapsed_s: float = Field(..., description="Seconds spent running")
+    chunks_per_s: Optional[float] = Field(None, description="Chunks produced per second of running time")
+
+class DocumentSearchRequest(BaseModel):
+    query: str = Field(..., description="Search query")
+    k: int = Field(5, ge=1, le=100, description="Number of results to return")
+    filters: Optional[Dict[str, Any]] = Field(None, description="Metadata filter, e.g. {\"source\": \"guide.pdf\", \"page\": {\"$gte\": 2}}")
+    hybrid: Optional[bool] = Field(None, description="Blend BM25 lexical scores with dense similarity (server default if omitted)")
+    mmr: bool = Field(False, description="Diversify results with maximal marginal relevance")
+    mmr_lambda: Optional[float] = Field(None, ge=0.0, le=1.0, description="MMR relevance/novelty trade-off, 1.0 = relevance only (server default if omitted)")
+    mmr_candidates: Optional[int] = Field(None, ge=1, le=1000, description="Candidates MMR chooses from (server default if omitted)")
+    collection: str = Field("default", description="Collection to search")
+
+class DocumentSearchResult(BaseModel):
+    content: str = Field(..., description="Document text")
+    score: float = Field(..., description="Cosine similarity to the query")
+    metadata: Dict[str, Any] = Field(..., description="Document metadata")
@@ -1,8 +1,9 @@
 import pandas as pd
 import json
 import csv
-from typing import List, Dict, Any, Optional
+from typing import IO, List, Dict, Any, Optional, Union
 from models.schemas import TeamMember
+from team_parser.utils import TeamUtils
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,14 +34,14 @@ class TeamParser:
             logger.error(f"Failed to load role skills: {e}")
             return {}
     
-    def parse_csv(self, file_path: str) -> List[TeamMember]:
+    def parse_csv(self, file_path: Union[str, IO]) -> List[TeamMember]:
         """
         Parse team data from CSV file
         
         Expected columns: name, role, level, skills, years_experience (optional)
         
         Args:
-            file_path: Path to CSV file
+            file_path: Path to CSV file, or a file object open for reading
             
         Returns:
             List of TeamMember objects
@@ -52,21 +53,24 @@ class TeamParser:
             logger.error(f"Failed to parse CSV file: {e}")
             raise
     
-    def parse_json(self, file_path: str) -> List[TeamMember]:
+    def parse_json(self, file_path: Union[str, IO]) -> List[TeamMember]:
         """
         Parse team data from JSON file
         
         Expected format: list of objects with name, role, level, skills, years_experience
         
         Args:
-            file_path: Path to JSON file
+            file_path: Path to JSON file, or a file object open for reading
             
         Returns:
             List of TeamMember objects
         """
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            if isinstance(file_path, str):
+                with open(file_path, 'r') as f:
+                    data = json.load(f)
+            else:
+                data = json.load(file_path)
             
             if isinstance(data, list):
                 return [self._create_team_member(item) for item in data]
@@ -220,6 +224,9 @@ class TeamParser:
             "skill_coverage": {}
         }
         
+        # Resolve every member's skills in one batch; the per-member checks below hit the memo
+        TeamUtils.canonical_skills([skill for member in team_members for skill in member.skills])
+        
         for member in team_members:
             # Check role mapping
             if member.role not in self.role_skills:
@@ -231,10 +238,7 @@ class TeamParser:
             
             # Check skill coverage
             role_skills = self.get_role_skills(member.role)
-            core_skills = set(role_skills.get("core_skills", []))
-            member_skills = set(member.skills)
-            
-            missing_core = core_skills - member_skills
+            missing_core = TeamUtils.find_missing_core_skills(member.skills, role_skills.get("core_skills", []))
             if missing_core:
                 warnings.append(f"{member.name} missing core skills: {', '.join(missing_core)}")
         
@@ -4,6 +4,48 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Common skill name mappings (lower-cased, whitespace-collapsed key -> canonical name)
+SKILL_ALIASES = {
+    'javascript': 'JavaScript',
+    'js': 'JavaScript',
+    'python': 'Python',
+    'java': 'Java',
+    'sql': 'SQL',
+    'html': 'HTML',
+    'css': 'CSS',
+    'react': 'React',
+    'vue': 'Vue.js',
+    'angular': 'Angular',
+    'node.js': 'Node.js',
+    'nodejs': 'Node.js',
+    'docker': 'Docker',
+    'kubernetes': 'Kubernetes',
+    'k8s': 'Kubernetes',
+    'aws': 'AWS',
+    'amazon web services': 'AWS',
+    'azure': 'Azure',
+    'gcp': 'Google Cloud',
+    'google cloud': 'Google Cloud',
+    'machine learning': 'Machine Learning',
+    'ml': 'Machine Learning',
+    'deep learning': 'Deep Learning',
+    'ai': 'Artificial Intelligence',
+    'artificial intelligence': 'Artificial Intelligence',
+    'data science': 'Data Science',
+    'devops': 'DevOps',
+    'ci/cd': 'CI/CD',
+    'continuous integration': 'CI/CD',
+    'agile': 'Agile',
+    'scrum': 'Scrum',
+    'kanban': 'Kanban'
+}
+
+
+def skill_key(skill: str) -> str:
+    """Case- and whitespace-insensitive lookup key of a skill name"""
+    return " ".join(skill.lower().split())
+
+
 class TeamUtils:
     """
     Utility functions for team data processing and skill analysis
@@ -23,43 +65,52 @@ class TeamUtils:
         # Convert to lowercase and remove extra spaces
         normalized = re.sub(r'\s+', ' ', skill.lower().strip())
         
-        # Common skill name mappings
-        skill_mappings = {
-            'javascript': 'JavaScript',
-            'js': 'JavaScript',
-            'python': 'Python',
-            'java': 'Java',
-            'sql': 'SQL',
-            'html': 'HTML',
-            'css': 'CSS',
-            'react': 'React',
-            'vue': 'Vue.js',
-            'angular': 'Angular',
-            'node.js': 'Node.js',
-            'nodejs': 'Node.js',
-            'docker': 'Docker',
-            'kubernetes': 'Kubernetes',
-            'k8s': 'Kubernetes',
-            'aws': 'AWS',
-            'amazon web services': 'AWS',
-            'azure': 'Azure',
-            'gcp': 'Google Cloud',
-            'google cloud': 'Google Cloud',
-            'machine learning': 'Machine Learning',
-            'ml': 'Machine Learning',
-            'deep learning': 'Deep Learning',
-            'ai': 'Artificial Intelligence',
-            'artificial intelligence': 'Artificial Intelligence',
-            'data science': 'Data Science',
-            'devops': 'DevOps',
-            'ci/cd': 'CI/CD',
-            'continuous integration': 'CI/CD',
-            'agile': 'Agile',
-            'scrum': 'Scrum',
-            'kanban': 'Kanban'
-        }
+        return SKILL_ALIASES.get(normalized, skill.title())
+    
+    @staticmethod
+    def canonical_skills(skills: List[str]) -> List[str]:
+        """
+        Resolve skill names to canonical skills in one batch
+        
+        Uses the skill vocabulary index once it is built ("K8s" and
+        "Kubernetes" both become "Kubernetes"), and only SKILL_ALIASES before.
         
-        return skill_mappings.get(normalized, skill.title())
+        Args:
+            skills: Raw skill names
+            
+        Returns:
+            Canonical name of each skill (the raw name where nothing matches)
+        """
+        from vectorizer.skill_index import get_skill_index
+        
+        index = get_skill_index()
+        if index is not None:
+            return index.canonicalize(skills)
+        return [SKILL_ALIASES.get(skill_key(skill), " ".join(skill.split())) for skill in skills]
+    
+    @staticmethod
+    def missing_skills(candidates: List[str], current_skills: List[str]) -> List[str]:
+        """
+        Candidate skills not held under any name, compared by canonical skill
+        
+        Args:
+            candidates: Skills to check (e.g. a role's core skills)
+            current_skills: Skills already held
+            
+        Returns:
+            Candidates, in order and once per canonical skill, that current_skills don't cover
+        """
+        candidates = list(candidates)
+        canonical = TeamUtils.canonical_skills(candidates + list(current_skills))
+        held = {skill_key(skill) for skill in canonical[len(candidates):]}
+        
+        missing = []
+        for skill, canonical_skill in zip(candidates, canonical):
+            key = skill_key(canonical_skill)
+            if key not in held:
+                held.add(key)
+                missing.append(skill)
+        return missing
     
     @staticmethod
     def calculate_skill_overlap(skills1: List[str], skills2: List[str]) -> float:
@@ -76,8 +127,9 @@ class TeamUtils:
         if not skills1 or not skills2:
             return 0.0
         
-        set1 = set(skills1)
-        set2 = set(skills2)
+        canonical = [skill_key(skill) for skill in TeamUtils.canonical_skills(list(skills1) + list(skills2))]
+        set1 = set(canonical[:len(skills1)])
+        set2 = set(canonical[len(skills1):])
         
         intersection = set1.intersection(set2)
         union = set1.union(set2)
@@ -96,10 +148,7 @@ class TeamUtils:
         Returns:
             List of missing core skills
         """
-        member_skill_set = set(member_skills)
-        core_skill_set = set(role_core_skills)
-        
-        return list(core_skill_set - member_skill_set)
+        return TeamUtils.missing_skills(role_core_skills, member_skills)
     
     @staticmethod
     def suggest_skill_priorities(member_skills: List[str], role_skills: Dict[str, List[str]], 
@@ -115,22 +164,17 @@ class TeamUtils:
         Returns:
             Dictionary with high, medium, low priority skills
         """
-        member_skill_set = set(member_skills)
-        core_skills = set(role_skills.get("core_skills", []))
-        advanced_skills = set(role_skills.get("advanced_skills", []))
-        cross_skills = set(role_skills.get("cross_skills", []))
-        
         # Missing core skills are high priority
-        high_priority = list(core_skills - member_skill_set)
+        high_priority = TeamUtils.missing_skills(role_skills.get("core_skills", []), member_skills)
         
         # Advanced skills based on experience
         if years_experience and years_experience >= 3:
-            medium_priority = list(advanced_skills - member_skill_set)
+            medium_priority = TeamUtils.missing_skills(role_skills.get("advanced_skills", []), member_skills)
         else:
             medium_priority = []
         
         # Cross-skilling opportunities
-        low_priority = list(cross_skills - member_skill_set)
+        low_priority = TeamUtils.missing_skills(role_skills.get("cross_skills", []), member_skills)
         
         return {
             "high": high_priority,
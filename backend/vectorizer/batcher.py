@@ -0,0 +1,175 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Dict, Any, Union, Optional, Tuple
+import numpy as np
+import logging
+from .embedder import SkillEmbedder
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingEmbedder:
+    """
+    Coalesces concurrent embed requests into shared model calls
+
+    Callers submit texts from any thread and get a future back.
+    A single worker thread owns the model: it takes the first waiting request,
+    keeps collecting until max_batch_size texts are queued or max_wait_ms has
+    passed, then embeds everything in one padded batch and resolves each
+    caller's future with its slice. Because only the worker runs inference,
+    the model's intra-op threads are not contended by request threads.
+
+    It is a drop-in replacement for SkillEmbedder: embed_text blocks on the
+    future, and every other attribute is delegated to the wrapped embedder.
+    """
+
+    def __init__(self, embedder: SkillEmbedder, max_batch_size: int = 64, max_wait_ms: float = 5.0,
+                 num_threads: int = 0):
+        """
+        Start the batching worker
+
+        Args:
+            embedder: Embedder that runs the model
+            max_batch_size: Flush once this many texts are collected
+            max_wait_ms: Flush once the oldest request has waited this long
+            num_threads: Intra-op threads for the torch backend (0 keeps the default)
+        """
+        self.embedder = embedder
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.num_threads = num_threads
+
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._closed = False
+        self._submit_lock = threading.Lock()
+
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def __getattr__(self, name: str):
+        # Only called for attributes not defined here (model, model_name, get_embedding_dimension, ...)
+        return getattr(self.embedder, name)
+
+    def submit(self, text: Union[str, List[str]]) -> Future:
+        """
+        Queue texts for embedding
+
+        Args:
+            text: Single text string or list of text strings
+
+        Returns:
+            Future resolving to the numpy array of embeddings
+        """
+        texts = [text] if isinstance(text, str) else list(text)
+        future: Future = Future()
+        if not texts:
+            future.set_result(np.empty((0, self.embedder.get_embedding_dimension()), dtype=np.float32))
+            return future
+
+        with self._submit_lock:
+            if self._closed:
+                future.set_exception(RuntimeError("Embedding batcher is closed"))
+            else:
+                self._queue.put((texts, future))
+        return future
+
+    def embed_text(self, text: Union[str, List[str]]) -> np.ndarray:
+        """Embed texts through the shared batch, blocking the calling thread until done"""
+        return self.submit(text).result()
+
+    def _configure_threads(self):
+        if self.num_threads > 0 and getattr(self.embedder, "backend", "torch") == "torch":
+            try:
+                import torch
+                torch.set_num_threads(self.num_threads)
+            except ImportError:
+                pass
+
+    def _collect(self, first: Tuple[List[str], Future]) -> Tuple[List[Tuple[List[str], Future]], bool]:
+        """Gather requests until the batch is full or the oldest request's wait is up"""
+        batch = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            size += len(item[0])
+        return batch, False
+
+    def _run(self):
+        self._configure_threads()
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch, stop = self._collect(first)
+            # Skip requests whose callers already gave up
+            batch = [(texts, future) for texts, future in batch if future.set_running_or_notify_cancel()]
+            if batch:
+                self._embed_batch(batch)
+            if stop:
+                break
+
+        self._fail_pending()
+
+    def _embed_batch(self, batch: List[Tuple[List[str], Future]]):
+        texts = [t for request_texts, _ in batch for t in request_texts]
+        try:
+            embeddings = self.embedder.embed_text(texts)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for request_texts, future in batch:
+            future.set_result(embeddings[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+        self.batches += 1
+        self.requests += len(batch)
+        self.texts += len(texts)
+        logger.debug(f"Embedded batch of {len(texts)} texts for {len(batch)} requests")
+
+    def _fail_pending(self):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("Embedding batcher is closed"))
+
+    def close(self):
+        """Stop the worker after the requests already queued are embedded"""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "requests": self.requests,
+            "texts": self.texts,
+            "mean_batch_texts": self.texts / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize()
+        }
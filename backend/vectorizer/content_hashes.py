@@ -0,0 +1,195 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Iterable, List, Dict, Any, Optional, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+HASHES_FILENAME = "hashes.db"
+
+
+def content_hash(text: str) -> str:
+    """Hash of a text with whitespace runs collapsed, so re-extracted copies still match"""
+    return hashlib.blake2b(" ".join(text.split()).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def record_hash(text: str, metadata: Dict[str, Any]) -> str:
+    """
+    Identity of a stored row for deduplication
+
+    Rows without a doc_id are identified by content alone. Rows of an
+    addressable document also include the doc_id and metadata (apart from
+    the chunk ordinal), so each document owns its rows and a re-ingested
+    chunk whose page or section moved counts as changed.
+    """
+    if metadata.get("doc_id") is None:
+        return content_hash(text)
+    fields = {key: value for key, value in metadata.items() if key != "chunk"}
+    return content_hash(f"{json.dumps(fields, sort_keys=True, default=str)}\0{text}")
+
+
+def file_hash(path: str, block_size: int = 1 << 20) -> str:
+    """Hash of a file's bytes, read in blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ContentHashIndex:
+    """
+    Persistent content hashes of a vector store's rows and ingested documents
+
+    Chunk hashes map to the first row holding that text, so duplicates can
+    be dropped before they are embedded. Document hashes (of the raw file)
+    let a re-uploaded file be skipped without parsing it. The index records
+    how many store rows it covers, and the store catches it up from the
+    segments after a crash between appending and hashing. Chunk and
+    document counts are kept in the state table as they change, so stats
+    don't have to count the tables.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (creating if needed) the SQLite hash index
+
+        Args:
+            path: SQLite file, normally hashes.db in the store directory
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS chunks (hash TEXT PRIMARY KEY, row INTEGER)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS chunks_row ON chunks (row)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS documents (hash TEXT PRIMARY KEY, source TEXT, chunks INTEGER)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER)")
+        # Counted once on open, which also fills them in for indexes written before they existed
+        self._db.execute("INSERT OR REPLACE INTO state VALUES ('chunks', (SELECT COUNT(*) FROM chunks))")
+        self._db.execute("INSERT OR REPLACE INTO state VALUES ('documents', (SELECT COUNT(*) FROM documents))")
+        self._db.commit()
+
+    def _count(self, key: str, delta: int):
+        """Adjust a counter in the state table (caller holds the lock and commits)"""
+        if delta:
+            self._db.execute("UPDATE state SET value = value + ? WHERE key = ?", (delta, key))
+
+    def _reset_counts(self, *keys: str):
+        self._db.executemany("INSERT OR REPLACE INTO state VALUES (?, 0)", [(key,) for key in keys])
+
+    @property
+    def rows(self) -> int:
+        """Number of store rows whose hashes have been recorded"""
+        with self._lock:
+            found = self._db.execute("SELECT value FROM state WHERE key = 'rows'").fetchone()
+        return found[0] if found else 0
+
+    def find_chunks(self, hashes: Iterable[str]) -> Set[str]:
+        """
+        Look up chunk hashes
+
+        Args:
+            hashes: Chunk content hashes
+
+        Returns:
+            The subset already present in the store
+        """
+        hashes = list(dict.fromkeys(hashes))
+        found: Set[str] = set()
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(row[0] for row in self._db.execute(
+                    f"SELECT hash FROM chunks WHERE hash IN ({placeholders})", chunk
+                ))
+        return found
+
+    def hashes_for_rows(self, rows: Iterable[int]) -> Dict[int, str]:
+        """Chunk hashes recorded for the given rows (a row holding a duplicate has none)"""
+        rows = [int(row) for row in rows]
+        found: Dict[int, str] = {}
+        with self._lock:
+            for start in range(0, len(rows), 500):
+                chunk = rows[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update((row, h) for h, row in self._db.execute(
+                    f"SELECT hash, row FROM chunks WHERE row IN ({placeholders})", chunk
+                ))
+        return found
+
+    def remove_rows(self, rows: Iterable[int]):
+        """Forget the hashes of deleted rows so their content can be added again"""
+        rows = [(int(row),) for row in rows]
+        with self._lock:
+            removed = self._db.executemany("DELETE FROM chunks WHERE row = ?", rows).rowcount
+            self._count("chunks", -removed)
+            self._db.commit()
+
+    def reset_chunks(self):
+        """Forget every chunk hash (after rows are renumbered); the store re-hashes its segments"""
+        with self._lock:
+            self._db.execute("DELETE FROM chunks")
+            self._db.execute("DELETE FROM state WHERE key = 'rows'")
+            self._reset_counts("chunks")
+            self._db.commit()
+
+    def add_chunks(self, first_row: int, hashes: List[str]):
+        """
+        Record the hashes of rows just appended to the store
+
+        Args:
+            first_row: Row id of the first hash
+            hashes: Content hashes in row order (an existing hash keeps its earlier row)
+        """
+        with self._lock:
+            added = self._db.executemany(
+                "INSERT OR IGNORE INTO chunks VALUES (?, ?)",
+                [(h, first_row + i) for i, h in enumerate(hashes)]
+            ).rowcount
+            self._count("chunks", added)
+            self._db.execute("INSERT OR REPLACE INTO state VALUES ('rows', ?)", (first_row + len(hashes),))
+            self._db.commit()
+
+    def get_document(self, document_hash: str) -> Optional[Dict[str, Any]]:
+        """Get the ingestion record of a file hash, or None if it hasn't been ingested"""
+        with self._lock:
+            found = self._db.execute(
+                "SELECT source, chunks FROM documents WHERE hash = ?", (document_hash,)
+            ).fetchone()
+        return {"source": found[0], "chunks": found[1]} if found else None
+
+    def add_document(self, document_hash: str, source: str, chunks: int):
+        """Record a fully ingested file as the current version of its source"""
+        with self._lock:
+            removed = self._db.execute(
+                "DELETE FROM documents WHERE source = ? OR hash = ?", (source, document_hash)
+            ).rowcount
+            self._db.execute("INSERT INTO documents VALUES (?, ?, ?)", (document_hash, source, chunks))
+            self._count("documents", 1 - removed)
+            self._db.commit()
+
+    def remove_documents(self, source: str):
+        """Forget the ingested files recorded under a source, so re-uploading them ingests again"""
+        with self._lock:
+            removed = self._db.execute("DELETE FROM documents WHERE source = ?", (source,)).rowcount
+            self._count("documents", -removed)
+            self._db.commit()
+
+    def clear(self):
+        """Forget every chunk and document hash"""
+        with self._lock:
+            self._db.execute("DELETE FROM chunks")
+            self._db.execute("DELETE FROM documents")
+            self._db.execute("DELETE FROM state")
+            self._reset_counts("chunks", "documents")
+            self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT key, value FROM state WHERE key IN ('chunks', 'documents')"))
+        return {"unique_chunks": counts.get("chunks", 0), "documents": counts.get("documents", 0)}
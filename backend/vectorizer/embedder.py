@@ -1,30 +1,67 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from typing import List, Union
+from typing import List, Union, Optional
 import logging
+from config import Config
+from .embedding_cache import EmbeddingCache, embedding_key, get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
 class SkillEmbedder:
     """
-    Handles text embedding using SentenceTransformer for skill recommendations
+    Handles text embedding for skill recommendations
+    
+    The model runs either as a SentenceTransformer under PyTorch ("torch") or
+    as an exported ONNX model under ONNX Runtime ("onnx"), selected by
+    Config.EMBEDDING_BACKEND.
     """
     
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 cache: Optional[EmbeddingCache] = None, use_cache: bool = True,
+                 backend: Optional[str] = None):
         """
         Initialize the embedder with a specific model
         
         Args:
             model_name: HuggingFace model name for sentence embeddings
+            cache: Embedding cache to use (defaults to the process-wide cache)
+            use_cache: Set False to always run the model
+            backend: "torch" or "onnx" (defaults to Config.EMBEDDING_BACKEND)
         """
         try:
-            self.model = SentenceTransformer(model_name)
+            self.backend = backend or Config.EMBEDDING_BACKEND
+            self.model = self._load_model(model_name)
             self.model_name = model_name
-            logger.info(f"Initialized embedder with model: {model_name}")
+            self.cache = (cache or get_embedding_cache()) if use_cache else None
+            logger.info(f"Initialized embedder with model: {model_name} ({self.backend})")
         except Exception as e:
             logger.error(f"Failed to initialize embedder: {e}")
             raise
     
+    def _load_model(self, model_name: str):
+        """Load the model for the selected backend (imports are deferred so each backend pulls in only its own runtime)"""
+        if self.backend == "torch":
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer(model_name)
+        
+        if self.backend == "onnx":
+            from .onnx_backend import OnnxSentenceEncoder, onnx_model_directory
+            return OnnxSentenceEncoder(
+                model_name,
+                onnx_model_directory(Config.EMBEDDING_ONNX_PATH, model_name),
+                quantized=Config.EMBEDDING_ONNX_QUANTIZE,
+                num_threads=Config.EMBEDDING_ONNX_THREADS,
+                max_seq_length=Config.EMBEDDING_MAX_SEQ_LENGTH
+            )
+        
+        raise ValueError(f"Unknown embedding backend '{self.backend}', expected 'torch' or 'onnx'")
+    
+    @property
+    def cache_namespace(self) -> str:
+        """Model identity for cache keys; quantized ONNX output differs slightly from the float model"""
+        if self.backend == "onnx" and Config.EMBEDDING_ONNX_QUANTIZE:
+            return f"{self.model_name}#onnx-int8"
+        return self.model_name
+    
     def embed_text(self, text: Union[str, List[str]]) -> np.ndarray:
         """
         Generate embeddings for text or list of texts
@@ -39,13 +76,34 @@ class SkillEmbedder:
             if isinstance(text, str):
                 text = [text]
             
-            embeddings = self.model.encode(text, convert_to_numpy=True)
-            logger.debug(f"Generated embeddings for {len(text)} texts")
-            return embeddings
+            if self.cache is None:
+                embeddings = self.model.encode(text, convert_to_numpy=True)
+                logger.debug(f"Generated embeddings for {len(text)} texts")
+                return embeddings
+            
+            return self._embed_cached(text)
         except Exception as e:
             logger.error(f"Failed to generate embeddings: {e}")
             raise
     
+    def _embed_cached(self, texts: List[str]) -> np.ndarray:
+        """Serve embeddings from the cache, encoding all distinct misses in one forward pass"""
+        keys = [embedding_key(self.cache_namespace, t) for t in texts]
+        unique_keys = list(dict.fromkeys(keys))
+        found = self.cache.get_many(unique_keys)
+        
+        missing = [key for key in unique_keys if key not in found]
+        if missing:
+            missing_set = set(missing)
+            texts_by_key = {key: t for key, t in zip(keys, texts) if key in missing_set}
+            computed = np.asarray(self.model.encode([texts_by_key[key] for key in missing], convert_to_numpy=True),
+                                  dtype=np.float32)
+            self.cache.put_many(missing, computed)
+            found.update(zip(missing, computed))
+        
+        logger.debug(f"Embedded {len(texts)} texts ({len(missing)} computed, {len(unique_keys) - len(missing)} cached)")
+        return np.stack([found[key] for key in keys])
+    
     def embed_skills(self, skills: List[str]) -> np.ndarray:
         """
         Generate embeddings for a list of skills
@@ -72,6 +130,31 @@ class SkillEmbedder:
         combined_text = f"{role}: {', '.join(skills)}"
         return self.embed_text(combined_text)
     
+    @property
+    def max_seq_length(self) -> int:
+        """Tokens the model reads before truncating, including special tokens"""
+        return int(getattr(self.model, "max_seq_length", None) or Config.EMBEDDING_MAX_SEQ_LENGTH)
+    
+    def count_tokens(self, text: str) -> int:
+        """
+        Count model tokens in a text, excluding special tokens
+        
+        Args:
+            text: Text to measure
+            
+        Returns:
+            Token count (estimated from words if the model exposes no tokenizer)
+        """
+        if hasattr(self.model, "count_tokens"):
+            return self.model.count_tokens(text)
+        
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is not None:
+            return len(tokenizer.encode(text, add_special_tokens=False))
+        
+        # WordPiece averages a little over one token per English word
+        return int(len(text.split()) * 1.3) + 1
+    
     def get_embedding_dimension(self) -> int:
         """
         Get the dimension of embeddings generated by the model
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+import numpy as np
+import logging
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    """Cache key for a text embedded by a given model"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-level embedding cache: an in-memory LRU in front of an optional SQLite store
+
+    Keys combine the model name and a hash of the text, so one cache can be
+    shared by embedders for different models. Disk hits are promoted into
+    the LRU.
+    """
+
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[str] = None):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of embeddings kept in memory
+            disk_path: SQLite file for the persistent level (None disables it)
+        """
+        self.max_entries = max(1, max_entries)
+        self.disk_path = disk_path
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if disk_path:
+            try:
+                directory = os.path.dirname(disk_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(disk_path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, dimension INTEGER, vector BLOB)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Disabling on-disk embedding cache at {disk_path}: {e}")
+                self._db = None
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up embeddings, memory first and then disk
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of the keys that were found to their (read-only) embeddings
+        """
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self.memory_hits += 1
+                elif key not in found:
+                    missing.append(key)
+
+            if missing and self._db is not None:
+                for key, dimension, blob in self._select(missing):
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    if len(vector) == dimension:
+                        found[key] = vector
+                        self._remember(key, vector)
+                        self.disk_hits += 1
+
+            self.misses += sum(1 for key in missing if key not in found)
+        return found
+
+    def _select(self, keys: List[str]):
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            try:
+                yield from self._db.execute(
+                    f"SELECT key, dimension, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"On-disk embedding cache lookup failed: {e}")
+                return
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """
+        Store freshly computed embeddings in both levels
+
+        Args:
+            keys: Cache keys
+            vectors: Embedding matrix aligned with keys
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            rows = []
+            for key, vector in zip(keys, vectors):
+                vector = vector.copy()
+                vector.setflags(write=False)
+                self._remember(key, vector)
+                rows.append((key, len(vector), vector.tobytes()))
+
+            if rows and self._db is not None:
+                try:
+                    self._db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"On-disk embedding cache write failed: {e}")
+
+    def clear(self):
+        """Drop every cached embedding, including the on-disk level"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "disk_path": self.disk_path if self._db is not None else None,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+        }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get the process-wide embedding cache, or None if caching is disabled"""
+    global _embedding_cache
+    if Config.EMBEDDING_CACHE_SIZE <= 0:
+        return None
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache(Config.EMBEDDING_CACHE_SIZE, Config.EMBEDDING_CACHE_PATH or None)
+    return _embedding_cache
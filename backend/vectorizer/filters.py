@@ -0,0 +1,177 @@
+import threading
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+import numpy as np
+import logging
+from .index import top_k_rows
+
+logger = logging.getLogger(__name__)
+
+RANGE_OPERATORS = {
+    "$gt": lambda value, bound: value > bound,
+    "$gte": lambda value, bound: value >= bound,
+    "$lt": lambda value, bound: value < bound,
+    "$lte": lambda value, bound: value <= bound
+}
+OPERATORS = ("$eq", "$in") + tuple(RANGE_OPERATORS)
+
+
+def _index_key(value: Any) -> Optional[Any]:
+    """Hashable key for a metadata value, or None if the value isn't indexable"""
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return None
+
+
+def validate_filter(filters: Dict[str, Any]):
+    """
+    Check a metadata filter before it is evaluated
+
+    Filters map field names to either a plain value (equality) or a dict of
+    operators: {"source": "guide.pdf", "page": {"$gte": 2, "$lte": 5},
+    "document_type": {"$in": ["pdf", "docx"]}}. All fields must match.
+
+    Raises:
+        ValueError: If the filter uses an unknown operator or malformed value
+    """
+    if not isinstance(filters, dict):
+        raise ValueError("Metadata filter must be a dictionary of field conditions")
+
+    for field, condition in filters.items():
+        if not isinstance(condition, dict):
+            if _index_key(condition) is None:
+                raise ValueError(f"Unsupported filter value for '{field}': {condition!r}")
+            continue
+
+        for operator, operand in condition.items():
+            if operator not in OPERATORS:
+                raise ValueError(f"Unknown filter operator '{operator}' for '{field}', expected one of {OPERATORS}")
+            if operator == "$in" and not isinstance(operand, (list, tuple)):
+                raise ValueError(f"'$in' for '{field}' expects a list")
+
+
+class MetadataIndex:
+    """
+    Per-field inverted index from metadata values to row ids
+
+    Each field maps its distinct values to the (ascending) row ids that carry
+    them. Equality and $in look up postings directly; range operators scan the
+    field's distinct values, which stays cheap for fields like source or page.
+
+    Readers take no lock: postings only ever grow by appending higher row ids,
+    and each lookup copies a posting list in one step, so a concurrent add
+    can at most make rows beyond the reader's snapshot visible (callers cut
+    them off). Adds are serialized with each other.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Any, List[int]]] = {}
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, first_row: int, metadata: Iterable[Dict[str, Any]]):
+        """
+        Index metadata for consecutive rows
+
+        Args:
+            first_row: Row id of the first metadata entry
+            metadata: Metadata dictionaries in row order
+        """
+        with self._lock:
+            for row, entry in enumerate(metadata, start=first_row):
+                for field, value in (entry or {}).items():
+                    key = _index_key(value)
+                    if key is not None:
+                        self._postings.setdefault(field, {}).setdefault(key, []).append(row)
+                self.count = max(self.count, row + 1)
+
+    def _field_rows(self, field: str, condition: Any) -> np.ndarray:
+        values = self._postings.get(field, {})
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        keys: Optional[List[Any]] = None
+        if "$eq" in condition:
+            keys = [condition["$eq"]]
+        if "$in" in condition:
+            wanted = list(condition["$in"])
+            keys = wanted if keys is None else [key for key in keys if key in wanted]
+        if keys is None:
+            keys = list(values)
+
+        ranges = [(RANGE_OPERATORS[op], bound) for op, bound in condition.items() if op in RANGE_OPERATORS]
+
+        postings = []
+        for key in keys:
+            rows = values.get(key) if _index_key(key) is not None else None
+            if not rows:
+                continue
+            try:
+                if all(compare(key, bound) for compare, bound in ranges):
+                    postings.append(rows)
+            except TypeError:
+                # Range against an incomparable value (e.g. a string page) never matches
+                continue
+
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        if len(postings) == 1:
+            return np.asarray(postings[0], dtype=np.int64)
+        return np.unique(np.concatenate([np.asarray(rows, dtype=np.int64) for rows in postings]))
+
+    def match(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Row ids whose metadata satisfies every field condition
+
+        Args:
+            filters: Metadata filter (see validate_filter)
+
+        Returns:
+            Sorted array of matching row ids
+        """
+        validate_filter(filters)
+
+        # Evaluate the most selective fields first so intersections stay small
+        field_rows = sorted((self._field_rows(field, condition) for field, condition in filters.items()), key=len)
+
+        if not field_rows:
+            return np.arange(self.count, dtype=np.int64)
+
+        rows = field_rows[0]
+        for other in field_rows[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "fields": len(self._postings),
+            "distinct_values": {field: len(values) for field, values in list(self._postings.items())}
+        }
+
+
+def score_candidates(queries: np.ndarray, vectors: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact top-k over a pre-filtered candidate set
+
+    Args:
+        queries: Normalized query matrix
+        vectors: Candidate embeddings, aligned with rows
+        rows: Global row ids of the candidates
+        k: Number of results per query
+
+    Returns:
+        (scores, ids) matrices of shape (len(queries), k), padded with -inf / -1
+    """
+    scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    ids = np.full((len(queries), k), -1, dtype=np.int64)
+    if len(rows) == 0:
+        return scores, ids
+
+    similarities = queries @ vectors.T
+    top = top_k_rows(similarities, k)
+    found = top.shape[1]
+    scores[:, :found] = np.take_along_axis(similarities, top, axis=1)
+    ids[:, :found] = rows[top]
+    return scores, ids
@@ -0,0 +1,656 @@
+import json
+import math
+import os
+from typing import Dict, Any, List, Tuple, Callable, Optional
+import numpy as np
+import logging
+from config import Config
+
+try:
+    import faiss
+except ImportError:  # faiss-cpu is optional; the exact index needs only numpy
+    faiss = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("exact", "flat", "ivf", "hnsw", "int8", "binary")
+FAISS_INDEX_TYPES = ("flat", "ivf", "hnsw")
+QUANTIZED_INDEX_TYPES = ("int8", "binary")
+
+INDEX_FILENAME = "index.faiss"
+INDEX_META_FILENAME = "index.json"
+QUANTIZED_INDEX_FILENAME = "index.quant.npz"
+
+# Rows of quantized codes expanded per scoring step, bounding temporary memory
+SCAN_BLOCK_ROWS = 65536
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Column indices of the k highest scores in each row, best first
+
+    Args:
+        scores: 2-D matrix of scores, one row per query
+        k: Number of indices per row
+
+    Returns:
+        Matrix of shape (rows, min(k, columns)) ordered by descending score
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def mmr_select(vectors: np.ndarray, relevance: np.ndarray, k: int, lambda_mult: float) -> np.ndarray:
+    """
+    Maximal marginal relevance selection, batched over independent candidate pools
+
+    Greedily picks the candidate maximizing
+    lambda * relevance - (1 - lambda) * max similarity to those already picked.
+    The pairwise similarity matrix of every pool is computed once, and each
+    of the k steps is a handful of array operations across all pools, so the
+    cost does not depend on Python loops over candidates.
+
+    Args:
+        vectors: (pools, candidates, dimension) normalized candidate vectors
+        relevance: (pools, candidates) relevance scores, -inf marking padding
+        k: Number of candidates to pick per pool
+        lambda_mult: 1.0 ranks purely by relevance, 0.0 purely by novelty
+
+    Returns:
+        (pools, min(k, candidates)) column indices in pick order, padded with -1
+    """
+    pools, candidates = relevance.shape
+    k = min(k, candidates)
+    picked = np.full((pools, k), -1, dtype=np.int64)
+    if k <= 0:
+        return picked
+
+    similarity = vectors @ vectors.transpose(0, 2, 1)
+    available = np.isfinite(relevance)
+    redundancy = np.zeros((pools, candidates), dtype=np.float32)
+    arange = np.arange(pools)
+
+    for step in range(k):
+        marginal = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        marginal = np.where(available, marginal, -np.inf)
+        best = marginal.argmax(axis=1)
+        found = available[arange, best]
+        if not found.any():
+            break
+        picked[found, step] = best[found]
+        available[arange[found], best[found]] = False
+
+        chosen = similarity[arange, best]
+        redundancy = chosen if step == 0 else np.maximum(redundancy, chosen)
+
+    return picked
+
+
+def merge_top_k(scores: np.ndarray, ids: np.ndarray, block_scores: np.ndarray,
+                offset: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge one block's scores into a running per-query top-k
+
+    Args:
+        scores: Running (queries, k) best scores
+        ids: Running (queries, k) best row ids
+        block_scores: (queries, rows) scores of the block
+        offset: Row id of the block's first row
+        k: Number of results per query
+
+    Returns:
+        Updated (scores, ids)
+    """
+    top = top_k_rows(block_scores, k)
+    merged_scores = np.concatenate([scores, np.take_along_axis(block_scores, top, axis=1)], axis=1)
+    merged_ids = np.concatenate([ids, top + offset], axis=1)
+    best = top_k_rows(merged_scores, k)
+    return np.take_along_axis(merged_scores, best, axis=1), np.take_along_axis(merged_ids, best, axis=1)
+
+
+def scan_blocks(queries: np.ndarray, k: int, blocks: List[np.ndarray],
+                offset: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact top-k over consecutive embedding blocks
+
+    One matrix-matrix product per block, keeping a running top-k per query.
+
+    Args:
+        queries: 2-D float32 matrix of normalized query vectors
+        k: Number of results per query
+        blocks: Normalized float32 embedding blocks in row order
+        offset: Row id of the first block's first row
+
+    Returns:
+        (scores, ids) matrices of shape (len(queries), k), padded with -inf / -1
+    """
+    scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    ids = np.full((len(queries), k), -1, dtype=np.int64)
+    for block in blocks:
+        scores, ids = merge_top_k(scores, ids, queries @ block.T, offset, k)
+        offset += len(block)
+    return scores, ids
+
+
+def concatenate_blocks(blocks: List[np.ndarray]) -> np.ndarray:
+    """Stack embedding blocks into one contiguous float32 matrix"""
+    if not blocks:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.ascontiguousarray(np.concatenate(blocks), dtype=np.float32)
+
+
+class ExactIndex:
+    """
+    Brute-force inner-product search directly over the store's normalized blocks
+
+    Index backends share one interface: build / add / reset change the index
+    in place, while extended returns a new version and leaves the current one
+    untouched for searches still using it. search takes an optional
+    SegmentView, so a search reads rows as of that view rather than the
+    store's latest state.
+    """
+
+    index_type = "exact"
+
+    def __init__(self, get_blocks: Callable[[], List[np.ndarray]]):
+        """
+        Args:
+            get_blocks: Returns the store's normalized float32 embedding blocks in row order
+        """
+        self._get_blocks = get_blocks
+
+    @property
+    def ntotal(self) -> int:
+        return sum(len(block) for block in self._get_blocks())
+
+    def build(self, vectors: np.ndarray):
+        pass
+
+    def add(self, vectors: np.ndarray):
+        pass
+
+    def reset(self):
+        pass
+
+    def extended(self, vectors: np.ndarray) -> "ExactIndex":
+        # Nothing is stored beyond the segments, so every version is the same
+        return self
+
+    def search(self, queries: np.ndarray, k: int, view=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search normalized queries against all stored vectors
+
+        Args:
+            queries: 2-D float32 matrix of normalized query vectors
+            k: Number of results per query
+            view: SegmentView to scan (defaults to the store's current blocks)
+
+        Returns:
+            (scores, ids) matrices of shape (len(queries), k), padded with -inf / -1
+        """
+        blocks = view.vector_blocks() if view is not None else self._get_blocks()
+        return scan_blocks(queries, k, blocks)
+
+    def needs_save(self) -> bool:
+        return False
+
+    def save(self, directory: str):
+        pass
+
+    def load(self, directory: str, expected_count: int) -> bool:
+        return True
+
+
+class FaissIndex:
+    """
+    FAISS inner-product index (flat, IVF or HNSW) kept alongside the store
+
+    IVF is retrained from the store's vectors whenever the corpus has grown by
+    Config.VECTOR_INDEX_RETRAIN_FACTOR since the last training.
+    """
+
+    def __init__(self, index_type: str, dimension: int, get_vectors: Callable[[], np.ndarray]):
+        """
+        Args:
+            index_type: "flat", "ivf" or "hnsw"
+            dimension: Embedding dimension
+            get_vectors: Returns the store's current normalized float32 matrix (used for retraining)
+        """
+        if faiss is None:
+            raise ImportError("faiss is not installed")
+
+        self.index_type = index_type
+        self.dimension = dimension
+        self._get_vectors = get_vectors
+        self._index = None
+        self.trained_count = 0
+        self.persisted_count = 0
+
+    @property
+    def ntotal(self) -> int:
+        return self._index.ntotal if self._index is not None else 0
+
+    def _params(self) -> Dict[str, Any]:
+        if self.index_type == "ivf":
+            return {"nlist": Config.VECTOR_INDEX_IVF_NLIST, "nprobe": Config.VECTOR_INDEX_IVF_NPROBE}
+        if self.index_type == "hnsw":
+            return {
+                "m": Config.VECTOR_INDEX_HNSW_M,
+                "ef_construction": Config.VECTOR_INDEX_HNSW_EF_CONSTRUCTION,
+                "ef_search": Config.VECTOR_INDEX_HNSW_EF_SEARCH
+            }
+        return {}
+
+    def _new_index(self, training_vectors: np.ndarray):
+        if self.index_type == "flat":
+            return faiss.IndexFlatIP(self.dimension)
+
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(self.dimension, Config.VECTOR_INDEX_HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = Config.VECTOR_INDEX_HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = Config.VECTOR_INDEX_HNSW_EF_SEARCH
+            return index
+
+        # IVF: scale the number of lists with the corpus (~4 * sqrt(n)) up to the configured cap
+        count = len(training_vectors)
+        nlist = max(1, min(Config.VECTOR_INDEX_IVF_NLIST, int(4 * math.sqrt(count)), count))
+        quantizer = faiss.IndexFlatIP(self.dimension)
+        index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(training_vectors)
+        index.nprobe = min(Config.VECTOR_INDEX_IVF_NPROBE, nlist)
+        self.trained_count = count
+        logger.info(f"Trained IVF index with {nlist} lists on {count} vectors")
+        return index
+
+    def build(self, vectors: np.ndarray):
+        """Rebuild the index from scratch over all vectors"""
+        self._index = None
+        self.trained_count = 0
+        self.persisted_count = 0
+        if len(vectors) == 0:
+            return
+        self._index = self._new_index(vectors)
+        self._index.add(vectors)
+        logger.info(f"Built {self.index_type} index over {len(vectors)} vectors")
+
+    def _needs_rebuild(self, added: int) -> bool:
+        if self._index is None:
+            return True
+        return self.index_type == "ivf" and self.ntotal + added >= Config.VECTOR_INDEX_RETRAIN_FACTOR * self.trained_count
+
+    def add(self, vectors: np.ndarray):
+        """Add vectors incrementally, retraining IVF when the corpus has outgrown it"""
+        if self._needs_rebuild(len(vectors)):
+            self.build(self._get_vectors())
+            return
+
+        self._index.add(vectors)
+
+    def extended(self, vectors: np.ndarray) -> "FaissIndex":
+        """
+        A new version of the index with vectors added, leaving this one unchanged
+
+        FAISS indexes must not be searched while they are being added to,
+        so the new version starts from a copy (or a rebuild, when add
+        would rebuild anyway).
+        """
+        version = FaissIndex(self.index_type, self.dimension, self._get_vectors)
+        version.trained_count = self.trained_count
+        version.persisted_count = self.persisted_count
+        if not self._needs_rebuild(len(vectors)):
+            version._index = faiss.clone_index(self._index)
+        version.add(vectors)
+        return version
+
+    def reset(self):
+        self._index = None
+        self.trained_count = 0
+        self.persisted_count = 0
+
+    def search(self, queries: np.ndarray, k: int, view=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search normalized queries (the vectors live in the index, so view is not needed)
+
+        Returns:
+            (scores, ids) matrices of shape (len(queries), k), padded with -inf / -1
+        """
+        if self._index is None or self.ntotal == 0:
+            return (np.full((len(queries), k), -np.inf, dtype=np.float32),
+                    np.full((len(queries), k), -1, dtype=np.int64))
+
+        scores, ids = self._index.search(np.ascontiguousarray(queries, dtype=np.float32), k)
+        scores[ids < 0] = -np.inf
+        return scores, ids
+
+    def needs_save(self) -> bool:
+        """
+        Whether the in-memory index has grown enough since the last save
+
+        Saving rewrites the whole index, so it only happens once the index has
+        grown by Config.VECTOR_INDEX_SAVE_GROWTH; rows added since then are
+        re-added from the segments on the next load.
+        """
+        if self.ntotal <= self.persisted_count:
+            return False
+        return self.persisted_count == 0 or self.ntotal >= Config.VECTOR_INDEX_SAVE_GROWTH * self.persisted_count
+
+    def save(self, directory: str):
+        """Persist the index and its parameters next to the store"""
+        if self._index is None:
+            for filename in (INDEX_FILENAME, INDEX_META_FILENAME):
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except FileNotFoundError:
+                    pass
+            return
+
+        index_path = os.path.join(directory, INDEX_FILENAME)
+        faiss.write_index(self._index, f"{index_path}.tmp")
+        os.replace(f"{index_path}.tmp", index_path)
+
+        meta_path = os.path.join(directory, INDEX_META_FILENAME)
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump({
+                "index_type": self.index_type,
+                "dimension": self.dimension,
+                "ntotal": self.ntotal,
+                "trained_count": self.trained_count,
+                "params": self._params()
+            }, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+        self.persisted_count = self.ntotal
+
+    def load(self, directory: str, expected_count: int) -> bool:
+        """
+        Load a persisted index if it matches the current configuration and corpus
+
+        The persisted index may cover only a prefix of the corpus; the caller
+        adds the remaining rows.
+
+        Returns:
+            True if loaded, False if the caller should rebuild
+        """
+        index_path = os.path.join(directory, INDEX_FILENAME)
+        meta_path = os.path.join(directory, INDEX_META_FILENAME)
+        if not (os.path.exists(index_path) and os.path.exists(meta_path)):
+            return False
+
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+
+            if (meta.get("index_type") != self.index_type
+                    or meta.get("dimension") != self.dimension
+                    or meta.get("ntotal", 0) > expected_count
+                    or meta.get("params") != self._params()):
+                logger.info("Persisted index does not match configuration or corpus, rebuilding")
+                return False
+
+            self._index = faiss.read_index(index_path)
+            self.trained_count = meta.get("trained_count", 0)
+            self.persisted_count = self._index.ntotal
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to load persisted index: {e}")
+            return False
+
+
+class QuantizedIndex:
+    """
+    Compact int8 or binary codes scanned first, then rescored in float32
+
+    int8 uses symmetric per-dimension scalar quantization (x ~= code * scale),
+    4x smaller than float32. binary keeps one sign bit per dimension, 32x
+    smaller, and ranks by Hamming distance. The best
+    k * Config.VECTOR_INDEX_RESCORE_FACTOR candidates of the first pass are
+    rescored exactly against the float32 vectors in the memory-mapped segments.
+    """
+
+    def __init__(self, index_type: str, dimension: int, get_vectors: Callable[[], np.ndarray],
+                 gather_rows: Callable[[np.ndarray], np.ndarray]):
+        """
+        Args:
+            index_type: "int8" or "binary"
+            dimension: Embedding dimension
+            get_vectors: Returns the store's current normalized float32 matrix (used for retraining)
+            gather_rows: Returns float32 vectors for a sorted array of row ids
+        """
+        self.index_type = index_type
+        self.dimension = dimension
+        self._get_vectors = get_vectors
+        self._gather_rows = gather_rows
+        self._codes: Optional[np.ndarray] = None
+        self._size = 0
+        self.scale: Optional[np.ndarray] = None
+        self.trained_count = 0
+        self.persisted_count = 0
+
+    @property
+    def ntotal(self) -> int:
+        return self._size
+
+    @property
+    def code_bytes(self) -> int:
+        return self._codes[:self._size].nbytes if self._codes is not None else 0
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        if self.index_type == "int8":
+            return np.clip(np.rint(vectors / self.scale), -127, 127).astype(np.int8)
+        return np.packbits(vectors > 0, axis=1)
+
+    def _append_codes(self, codes: np.ndarray):
+        # Grow geometrically so incremental adds stay amortized O(new rows)
+        needed = self._size + len(codes)
+        if self._codes is None or needed > len(self._codes):
+            capacity = max(needed, 2 * (len(self._codes) if self._codes is not None else 0), 1024)
+            grown = np.empty((capacity, codes.shape[1]), dtype=codes.dtype)
+            if self._codes is not None:
+                grown[:self._size] = self._codes[:self._size]
+            self._codes = grown
+        self._codes[self._size:needed] = codes
+        self._size = needed
+
+    def build(self, vectors: np.ndarray):
+        """Fit quantization parameters and encode all vectors"""
+        self.reset()
+        if len(vectors) == 0:
+            return
+        if self.index_type == "int8":
+            self.scale = (np.abs(vectors).max(axis=0) / 127.0).astype(np.float32)
+            self.scale[self.scale == 0] = 1.0
+        self.trained_count = len(vectors)
+        self._append_codes(self._encode(vectors))
+        logger.info(f"Built {self.index_type} index over {len(vectors)} vectors ({self.code_bytes} bytes of codes)")
+
+    def add(self, vectors: np.ndarray):
+        """Encode vectors incrementally, refitting int8 scales when the corpus has outgrown them"""
+        if self._size == 0:
+            self.build(self._get_vectors())
+            return
+
+        if self.index_type == "int8" and self._size + len(vectors) >= Config.VECTOR_INDEX_RETRAIN_FACTOR * self.trained_count:
+            self.build(self._get_vectors())
+            return
+
+        self._append_codes(self._encode(vectors))
+
+    def extended(self, vectors: np.ndarray) -> "QuantizedIndex":
+        """
+        A new version of the index with vectors added, leaving this one unchanged
+
+        Versions share the code buffer: a version only reads its first
+        _size rows, and new codes are written past them (or into a new
+        buffer when it grows), so extending costs only the new rows.
+        """
+        version = QuantizedIndex(self.index_type, self.dimension, self._get_vectors, self._gather_rows)
+        version._codes = self._codes
+        version._size = self._size
+        version.scale = self.scale
+        version.trained_count = self.trained_count
+        version.persisted_count = self.persisted_count
+        version.add(vectors)
+        return version
+
+    def reset(self):
+        self._codes = None
+        self._size = 0
+        self.scale = None
+        self.trained_count = 0
+        self.persisted_count = 0
+
+    def _first_pass(self, queries: np.ndarray, candidates: int) -> np.ndarray:
+        """Approximate top candidates per query from the codes alone"""
+        scores = np.full((len(queries), candidates), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), candidates), -1, dtype=np.int64)
+        codes, size = self._codes, self._size
+
+        if self.index_type == "int8":
+            scaled_queries = queries * self.scale
+        else:
+            query_bits = np.packbits(queries > 0, axis=1)
+
+        for offset in range(0, size, SCAN_BLOCK_ROWS):
+            block = codes[offset:min(offset + SCAN_BLOCK_ROWS, size)]
+            if self.index_type == "int8":
+                block_scores = scaled_queries @ block.astype(np.float32).T
+            else:
+                # Fewer differing sign bits means a smaller angle
+                distances = POPCOUNT[np.bitwise_xor(query_bits[:, None, :], block[None, :, :])].sum(axis=2, dtype=np.int32)
+                block_scores = -distances.astype(np.float32)
+            scores, ids = merge_top_k(scores, ids, block_scores, offset, candidates)
+        return ids
+
+    def search(self, queries: np.ndarray, k: int, view=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search normalized queries: code scan, then exact float32 rescoring
+
+        Args:
+            queries: 2-D float32 matrix of normalized query vectors
+            k: Number of results per query
+            view: SegmentView to rescore from (defaults to the store's current rows)
+
+        Returns:
+            (scores, ids) matrices of shape (len(queries), k), padded with -inf / -1
+        """
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        if self._size == 0:
+            return scores, ids
+
+        gather_rows = view.gather_vectors if view is not None else self._gather_rows
+        candidate_ids = self._first_pass(queries, k * max(1, Config.VECTOR_INDEX_RESCORE_FACTOR))
+        for i, query in enumerate(queries):
+            rows = np.sort(candidate_ids[i][candidate_ids[i] >= 0])
+            exact = gather_rows(rows) @ query
+            top = top_k_rows(exact[None, :], k)[0]
+            scores[i, :len(top)] = exact[top]
+            ids[i, :len(top)] = rows[top]
+        return scores, ids
+
+    def needs_save(self) -> bool:
+        """Whether the codes have grown by Config.VECTOR_INDEX_SAVE_GROWTH since the last save"""
+        if self._size <= self.persisted_count:
+            return False
+        return self.persisted_count == 0 or self._size >= Config.VECTOR_INDEX_SAVE_GROWTH * self.persisted_count
+
+    def save(self, directory: str):
+        """Persist the codes and quantization parameters next to the store"""
+        path = os.path.join(directory, QUANTIZED_INDEX_FILENAME)
+        if self._codes is None:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return
+
+        with open(f"{path}.tmp", "wb") as f:
+            np.savez(
+                f,
+                codes=self._codes[:self._size],
+                scale=self.scale if self.scale is not None else np.empty(0, dtype=np.float32),
+                meta=np.array(json.dumps({
+                    "index_type": self.index_type,
+                    "dimension": self.dimension,
+                    "trained_count": self.trained_count
+                }))
+            )
+        os.replace(f"{path}.tmp", path)
+        self.persisted_count = self._size
+
+    def load(self, directory: str, expected_count: int) -> bool:
+        """
+        Load persisted codes if they match the configuration and cover a prefix of the corpus
+
+        Returns:
+            True if loaded, False if the caller should rebuild
+        """
+        path = os.path.join(directory, QUANTIZED_INDEX_FILENAME)
+        if not os.path.exists(path):
+            return False
+
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                codes = data["codes"]
+                scale = data["scale"]
+
+            if (meta.get("index_type") != self.index_type
+                    or meta.get("dimension") != self.dimension
+                    or len(codes) > expected_count):
+                logger.info("Persisted quantized index does not match configuration or corpus, rebuilding")
+                return False
+
+            self.reset()
+            self.scale = scale if self.index_type == "int8" else None
+            self.trained_count = meta.get("trained_count", 0)
+            self._append_codes(codes)
+            self.persisted_count = self._size
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to load persisted quantized index: {e}")
+            return False
+
+
+def create_index(index_type: str, dimension: int, get_blocks: Callable[[], List[np.ndarray]],
+                 gather_rows: Optional[Callable[[np.ndarray], np.ndarray]] = None):
+    """
+    Create the configured index backend, falling back to exact search without faiss
+
+    Args:
+        index_type: One of INDEX_TYPES
+        dimension: Embedding dimension
+        get_blocks: Returns the store's normalized float32 embedding blocks in row order
+        gather_rows: Returns float32 vectors for sorted row ids (required for quantized indexes)
+
+    Returns:
+        Index backend instance
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown vector index type '{index_type}', expected one of {INDEX_TYPES}")
+
+    if index_type == "exact":
+        if Config.VECTOR_SEARCH_SHARDS > 1:
+            from .sharding import ShardedIndex, get_shard_pool
+            return ShardedIndex(get_blocks, get_shard_pool())
+        return ExactIndex(get_blocks)
+
+    get_vectors = lambda: concatenate_blocks(get_blocks())
+
+    if index_type in QUANTIZED_INDEX_TYPES:
+        if gather_rows is None:
+            raise ValueError(f"'{index_type}' index needs gather_rows for float32 rescoring")
+        return QuantizedIndex(index_type, dimension, get_vectors, gather_rows)
+
+    if faiss is None:
+        logger.warning(f"faiss is not available, using exact search instead of '{index_type}'")
+        return ExactIndex(get_blocks)
+
+    return FaissIndex(index_type, dimension, get_vectors)
@@ -0,0 +1,247 @@
+import math
+import re
+import threading
+from typing import List, Dict, Iterable, Optional, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Keep tool names and versions intact: "c++", "c#", "node.js", "python3.11", "ci/cd"
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#._/-]*")
+TRAILING_PUNCTUATION = "._/-"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase a text into lexical terms without splitting tool names
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        token = token.rstrip(TRAILING_PUNCTUATION)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def _extend_buffer(buffer: Optional[np.ndarray], size: int, values: np.ndarray) -> np.ndarray:
+    """
+    Write values after the first size entries of a buffer, growing it geometrically
+
+    Entries below size are never touched, and growth copies into a new
+    buffer, so readers holding the old buffer and size stay consistent.
+    """
+    needed = size + len(values)
+    if buffer is None or needed > len(buffer):
+        grown = np.zeros(max(needed, 2 * size, 4), dtype=values.dtype)
+        if buffer is not None:
+            grown[:size] = buffer[:size]
+        buffer = grown
+    buffer[size:needed] = values
+    return buffer
+
+
+class BM25Index:
+    """
+    In-process BM25 inverted index over the store's documents
+
+    Postings are compact arrays of (row id, term frequency) appended in row
+    order, so adding documents never rewrites existing postings and querying
+    touches only the postings of the query terms.
+
+    Readers take no lock. Each term's postings and the document lengths
+    are append-only buffers, published with their size as one tuple once
+    the new entries are written, so a search sees a consistent prefix of
+    the index while documents are being added. Adds are serialized with
+    each other.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        # term -> (row id buffer, term frequency buffer, size)
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray, int]] = {}
+        # (document length buffer, documents, total length), replaced as a whole by every add
+        self._totals: Tuple[Optional[np.ndarray], int, int] = (None, 0, 0)
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return self._totals[1]
+
+    def add(self, first_row: int, documents: Iterable[str]):
+        """
+        Index documents for consecutive rows
+
+        Args:
+            first_row: Row id of the first document
+            documents: Document texts in row order
+        """
+        with self._lock:
+            term_rows: Dict[str, Tuple[List[int], List[int]]] = {}
+            lengths: List[int] = []
+            for row, text in enumerate(documents, start=first_row):
+                terms = tokenize(text or "")
+                frequencies: Dict[str, int] = {}
+                for term in terms:
+                    frequencies[term] = frequencies.get(term, 0) + 1
+
+                for term, frequency in frequencies.items():
+                    rows, tfs = term_rows.setdefault(term, ([], []))
+                    rows.append(row)
+                    tfs.append(frequency)
+                lengths.append(len(terms))
+
+            if not lengths:
+                return
+
+            for term, (rows, tfs) in term_rows.items():
+                row_buffer, tf_buffer, size = self._postings.get(term, (None, None, 0))
+                self._postings[term] = (
+                    _extend_buffer(row_buffer, size, np.asarray(rows, dtype=np.int64)),
+                    _extend_buffer(tf_buffer, size, np.asarray(tfs, dtype=np.float32)),
+                    size + len(rows)
+                )
+
+            # Rows the index hasn't seen (e.g. rows without text) keep zero length
+            length_buffer, count, total_length = self._totals
+            padding = np.zeros(max(first_row - count, 0), dtype=np.int32)
+            new_lengths = np.concatenate([padding, np.asarray(lengths, dtype=np.int32)])
+            self._totals = (
+                _extend_buffer(length_buffer, count, new_lengths),
+                count + len(new_lengths),
+                total_length + int(new_lengths.sum())
+            )
+
+    def search(self, query: str, k: int, rows: Optional[np.ndarray] = None,
+               exclude: Optional[np.ndarray] = None, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k rows by BM25 score
+
+        Args:
+            query: Query text
+            k: Number of results
+            rows: Optional sorted row ids to restrict scoring to
+            exclude: Optional sorted row ids to leave out (e.g. deleted rows)
+            limit: Optional row count to stay below (e.g. the rows of a search's snapshot)
+
+        Returns:
+            (row ids, scores), best first; only rows sharing a term with the query
+        """
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        matched_rows, contributions = self._score_terms(set(tokenize(query)), limit)
+
+        if not matched_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # Sum per-term contributions for every row that matched any term
+        unique_rows, inverse = np.unique(np.concatenate(matched_rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions)).astype(np.float32)
+
+        if rows is not None:
+            keep = np.isin(unique_rows, rows, assume_unique=True)
+            unique_rows, scores = unique_rows[keep], scores[keep]
+        if exclude is not None and len(exclude):
+            keep = ~np.isin(unique_rows, exclude, assume_unique=True)
+            unique_rows, scores = unique_rows[keep], scores[keep]
+
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return unique_rows[top], scores[top]
+
+    def score(self, query: str, rows: np.ndarray) -> np.ndarray:
+        """
+        BM25 scores of specific rows (zero for rows sharing no term with the query)
+
+        Args:
+            query: Query text
+            rows: Sorted row ids
+
+        Returns:
+            Scores aligned with rows
+        """
+        scores = np.zeros(len(rows), dtype=np.float32)
+        matched_rows, contributions = self._score_terms(set(tokenize(query)))
+
+        for term_rows, term_scores in zip(matched_rows, contributions):
+            positions = np.searchsorted(rows, term_rows)
+            positions[positions == len(rows)] = 0
+            hit = rows[positions] == term_rows if len(rows) else np.zeros(len(term_rows), dtype=bool)
+            np.add.at(scores, positions[hit], term_scores[hit])
+        return scores
+
+    def _score_terms(self, terms: Iterable[str],
+                     limit: Optional[int] = None) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """
+        Per-term matching rows and BM25 contributions
+
+        Postings can be published ahead of the totals by a concurrent add,
+        so rows are cut at the totals' document count (and at limit).
+        """
+        doc_lengths, count, total_length = self._totals
+        matched_rows = []
+        contributions = []
+        if count == 0:
+            return matched_rows, contributions
+
+        average_length = total_length / count or 1.0
+        end = count if limit is None else min(count, limit)
+
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            row_buffer, tf_buffer, size = posting
+            size = int(np.searchsorted(row_buffer[:size], end))
+            if size == 0:
+                continue
+            term_rows = row_buffer[:size]
+            tfs = tf_buffer[:size]
+
+            idf = math.log(1.0 + (count - size + 0.5) / (size + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * doc_lengths[term_rows] / average_length)
+            matched_rows.append(term_rows)
+            contributions.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+
+        return matched_rows, contributions
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "documents": self.count,
+            "terms": len(self._postings)
+        }
+
+
+def fuse_scores(dense_scores: np.ndarray, lexical_scores: np.ndarray, lexical_max: float,
+                lexical_weight: float) -> np.ndarray:
+    """
+    Blend dense similarity with max-normalized BM25 scores
+
+    Args:
+        dense_scores: Cosine similarity of each candidate row
+        lexical_scores: BM25 score of each candidate row
+        lexical_max: Best BM25 score for the query, used for normalization
+        lexical_weight: Weight of the lexical score in [0, 1]
+
+    Returns:
+        Fused score per candidate row
+    """
+    if lexical_max <= 0:
+        return (1.0 - lexical_weight) * dense_scores
+    return (1.0 - lexical_weight) * dense_scores + lexical_weight * lexical_scores / lexical_max
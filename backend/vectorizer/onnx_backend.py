@@ -0,0 +1,199 @@
+import os
+from typing import List, Optional
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILENAME = "model.onnx"
+QUANTIZED_MODEL_FILENAME = "model.int8.onnx"
+TOKENIZER_FILENAME = "tokenizer.json"
+
+
+def onnx_model_directory(base_path: str, model_name: str) -> str:
+    """Directory holding the exported ONNX files for a HuggingFace model"""
+    return os.path.join(base_path, model_name.replace("/", "__"))
+
+
+def export_onnx_model(model_name: str, output_dir: str, quantize: bool = False, opset: int = 14):
+    """
+    Export a sentence-transformers checkpoint's transformer to ONNX
+
+    Needs torch and transformers (the PyTorch backend's dependencies), so it
+    is typically run once on a build machine; the runtime only needs
+    onnxruntime and tokenizers.
+
+    Args:
+        model_name: HuggingFace model name
+        output_dir: Directory to write model.onnx and tokenizer.json to
+        quantize: Also write a dynamically int8-quantized model.int8.onnx
+        opset: ONNX opset version
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self, wrapped):
+            super().__init__()
+            self.wrapped = wrapped
+
+        def forward(self, *inputs):
+            return self.wrapped(**dict(zip(input_names, inputs)))[0]
+
+    model_path = os.path.join(output_dir, MODEL_FILENAME)
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(model),
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]},
+            opset_version=opset
+        )
+    tokenizer.save_pretrained(output_dir)
+    logger.info(f"Exported {model_name} to {model_path}")
+
+    if quantize:
+        quantize_onnx_model(output_dir)
+
+
+def quantize_onnx_model(model_dir: str):
+    """Write a dynamically int8-quantized copy of an exported model"""
+    try:
+        # onnxruntime.quantization imports the separate onnx package
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as e:
+        raise ImportError(
+            f"Quantizing the ONNX model needs the onnx package ({e}); "
+            f"install it with 'pip install onnx' or set EMBEDDING_ONNX_QUANTIZE=false"
+        ) from e
+
+    quantize_dynamic(
+        os.path.join(model_dir, MODEL_FILENAME),
+        os.path.join(model_dir, QUANTIZED_MODEL_FILENAME),
+        weight_type=QuantType.QInt8
+    )
+    logger.info(f"Quantized ONNX model in {model_dir}")
+
+
+class OnnxSentenceEncoder:
+    """
+    Sentence embeddings from an exported transformer under ONNX Runtime
+
+    Mirrors the SentenceTransformer pipeline of the MiniLM-style models used
+    here (transformer, attention-masked mean pooling, optional L2 normalize)
+    and exposes the same encode / get_sentence_embedding_dimension surface,
+    so SkillEmbedder can use either backend interchangeably.
+    """
+
+    def __init__(self, model_name: str, model_dir: str, quantized: bool = False, num_threads: int = 0,
+                 max_seq_length: int = 256, normalize: bool = True, export_if_missing: bool = True):
+        """
+        Load (exporting first if needed) an ONNX model
+
+        Args:
+            model_name: HuggingFace model name
+            model_dir: Directory with model.onnx / model.int8.onnx and tokenizer.json
+            quantized: Use the dynamically int8-quantized model
+            num_threads: Intra-op threads for ONNX Runtime (0 lets it decide)
+            max_seq_length: Truncation length in tokens
+            normalize: L2-normalize pooled embeddings
+            export_if_missing: Export from the HuggingFace checkpoint when files are missing
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path = os.path.join(model_dir, QUANTIZED_MODEL_FILENAME if quantized else MODEL_FILENAME)
+        if not os.path.exists(model_path):
+            if not export_if_missing:
+                raise FileNotFoundError(f"ONNX model not found: {model_path}")
+            if not os.path.exists(os.path.join(model_dir, MODEL_FILENAME)):
+                export_onnx_model(model_name, model_dir)
+            if quantized:
+                quantize_onnx_model(model_dir)
+
+        options = ort.SessionOptions()
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+        tokenizer_path = os.path.join(model_dir, TOKENIZER_FILENAME)
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.no_padding()
+        # Untruncated copy for measuring text length (chunking)
+        self._counting_tokenizer = Tokenizer.from_file(tokenizer_path)
+        self._counting_tokenizer.no_truncation()
+        self._counting_tokenizer.no_padding()
+
+        self.model_name = model_name
+        self.model_path = model_path
+        self.max_seq_length = max_seq_length
+        self.normalize = normalize
+        self._dimension: Optional[int] = None
+
+        logger.info(f"Loaded ONNX model {model_path} ({num_threads or 'default'} threads)")
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        length = max(len(encoding.ids) for encoding in encodings)
+
+        input_ids = np.zeros((len(texts), length), dtype=np.int64)
+        attention_mask = np.zeros((len(texts), length), dtype=np.int64)
+        for i, encoding in enumerate(encodings):
+            input_ids[i, :len(encoding.ids)] = encoding.ids
+            attention_mask[i, :len(encoding.ids)] = 1
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask, "token_type_ids": np.zeros_like(input_ids)}
+        hidden = self.session.run(None, {name: feeds[name] for name in self.input_names})[0]
+
+        # Mean over real tokens only, as SentenceTransformer's Pooling module does
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self, sentences: List[str], batch_size: int = 32, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        """
+        Embed sentences
+
+        Args:
+            sentences: Texts to embed
+            batch_size: Texts per ONNX Runtime call
+
+        Returns:
+            float32 matrix of embeddings in input order
+        """
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        if not sentences:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        # Batch texts of similar length together to minimize padding
+        order = np.argsort([-len(sentence) for sentence in sentences], kind="stable")
+        embeddings = [None] * len(sentences)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            for position, vector in zip(batch, self._encode_batch([sentences[i] for i in batch])):
+                embeddings[position] = vector
+        return np.stack(embeddings)
+
+    def count_tokens(self, text: str) -> int:
+        """Number of model tokens in text, excluding special tokens"""
+        return len(self._counting_tokenizer.encode(text, add_special_tokens=False).ids)
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        if self._dimension is None:
+            self._dimension = int(self._encode_batch(["dimension probe"]).shape[1])
+        return self._dimension
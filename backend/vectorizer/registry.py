@@ -0,0 +1,216 @@
+import os
+import re
+import shutil
+import threading
+from typing import List, Dict, Any, Optional
+import logging
+from config import Config
+from .batcher import BatchingEmbedder
+from .embedder import SkillEmbedder
+from .embedding_cache import get_embedding_cache
+from .sharding import close_shard_pool, peek_shard_pool
+from .skill_index import get_skill_index
+from .vectorstore import SkillVectorStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COLLECTION = "default"
+COLLECTIONS_DIRECTORY = "collections"
+COLLECTION_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+
+def validate_collection_name(name: str) -> str:
+    """
+    Check that a collection name is safe to use as a directory name
+
+    Raises:
+        ValueError: If the name is empty, too long or has characters other than letters, digits, '_' and '-'
+    """
+    if not isinstance(name, str) or not COLLECTION_NAME_PATTERN.match(name):
+        raise ValueError(f"Invalid collection name '{name}': use up to 64 letters, digits, '_' or '-'")
+    return name
+
+
+class VectorStoreRegistry:
+    """
+    Process-wide owner of the embedding model and vector store collections
+
+    Each named collection is a separate SkillVectorStore with its own
+    directory, index and stats, so a search only touches the collection it
+    names. The default collection lives directly in persist_directory (where
+    the single store used to be) and the others under collections/<name>.
+    The model and each collection are loaded lazily on first use and then
+    shared by every request. Each collection has its own write lock, held
+    only while a store commits (embedding happens outside it); reload and
+    drop close the old store instances, which then refuse writes. With
+    Config.EMBEDDING_BATCHING, the embedder is wrapped in a BatchingEmbedder
+    so concurrent requests share model calls.
+    """
+
+    def __init__(self, model_name: str = Config.EMBEDDING_MODEL, persist_directory: str = "data/vectorstore"):
+        """
+        Initialize the registry without loading anything
+
+        Args:
+            model_name: HuggingFace model name for sentence embeddings
+            persist_directory: Directory to persist vector store data
+        """
+        self.model_name = model_name
+        self.persist_directory = persist_directory
+        self._embedder: Optional[SkillEmbedder] = None
+        self._vectorstores: Dict[str, SkillVectorStore] = {}
+        self._init_lock = threading.Lock()
+        # Per-collection commit locks, shared by every instance opened on the collection
+        self._write_locks: Dict[str, threading.RLock] = {}
+        # Serializes reload and drop
+        self._reload_lock = threading.Lock()
+
+    def get_embedder(self) -> SkillEmbedder:
+        """Get the shared embedder, loading the model on first use"""
+        if self._embedder is None:
+            with self._init_lock:
+                if self._embedder is None:
+                    self._embedder = self._load_embedder()
+        return self._embedder
+
+    def _load_embedder(self) -> SkillEmbedder:
+        embedder = SkillEmbedder(self.model_name)
+        if not Config.EMBEDDING_BATCHING:
+            return embedder
+        return BatchingEmbedder(
+            embedder,
+            max_batch_size=Config.EMBEDDING_BATCH_SIZE,
+            max_wait_ms=Config.EMBEDDING_BATCH_WAIT_MS,
+            num_threads=Config.EMBEDDING_TORCH_THREADS
+        )
+
+    def close(self):
+        """Stop the embedding batch worker and the search shard workers, if any"""
+        if isinstance(self._embedder, BatchingEmbedder):
+            self._embedder.close()
+        close_shard_pool()
+
+    def collection_directory(self, collection: str) -> str:
+        """Persistence directory of a collection"""
+        validate_collection_name(collection)
+        if collection == DEFAULT_COLLECTION:
+            return self.persist_directory
+        return os.path.join(self.persist_directory, COLLECTIONS_DIRECTORY, collection)
+
+    def get_vectorstore(self, collection: str = DEFAULT_COLLECTION, create: bool = True) -> SkillVectorStore:
+        """
+        Get a collection's shared vector store, loading persisted data on first use
+
+        Args:
+            collection: Collection name
+            create: Create the collection if it doesn't exist yet
+
+        Raises:
+            ValueError: If the collection name is invalid
+            LookupError: If the collection doesn't exist and create is False
+        """
+        vectorstore = self._vectorstores.get(collection)
+        if vectorstore is None:
+            directory = self.collection_directory(collection)
+            if not create and collection != DEFAULT_COLLECTION and not os.path.isdir(directory):
+                raise LookupError(f"Collection not found: {collection}")
+            embedder = self.get_embedder()
+            with self._init_lock:
+                vectorstore = self._vectorstores.get(collection)
+                if vectorstore is None:
+                    vectorstore = SkillVectorStore(embedder, directory, write_lock=self._write_lock(collection))
+                    self._vectorstores[collection] = vectorstore
+                    logger.info(f"Loaded collection '{collection}' from {directory}")
+        return vectorstore
+
+    def _write_lock(self, collection: str) -> threading.RLock:
+        return self._write_locks.setdefault(collection, threading.RLock())
+
+    def list_collections(self) -> List[str]:
+        """Names of every collection on disk or loaded, default first"""
+        names = set(self._vectorstores)
+        collections_path = os.path.join(self.persist_directory, COLLECTIONS_DIRECTORY)
+        if os.path.isdir(collections_path):
+            names.update(name for name in os.listdir(collections_path)
+                         if COLLECTION_NAME_PATTERN.match(name) and os.path.isdir(os.path.join(collections_path, name)))
+        names.discard(DEFAULT_COLLECTION)
+        return [DEFAULT_COLLECTION] + sorted(names)
+
+    def drop_collection(self, collection: str) -> bool:
+        """
+        Delete a collection and its files (the default collection is only cleared)
+
+        Returns:
+            True if the collection existed
+        """
+        directory = self.collection_directory(collection)
+        with self._reload_lock:
+            if collection == DEFAULT_COLLECTION:
+                self.get_vectorstore(collection).clear()
+                return True
+
+            vectorstore = self._vectorstores.pop(collection, None)
+            if vectorstore is not None:
+                vectorstore.close()
+            if not os.path.isdir(directory):
+                return vectorstore is not None
+            shutil.rmtree(directory)
+
+        logger.info(f"Dropped collection '{collection}'")
+        return True
+
+    def reload(self, reload_model: bool = False):
+        """
+        Reload the loaded collections from disk, and optionally the embedding model
+
+        Args:
+            reload_model: Also reload the SentenceTransformer model
+        """
+        with self._reload_lock:
+            for vectorstore in self._vectorstores.values():
+                # Purges and compactions write segments in the background; a second
+                # instance on the same directory would treat their files as orphans
+                vectorstore.close()
+            if reload_model:
+                previous = self._embedder
+                self._embedder = self._load_embedder()
+                if isinstance(previous, BatchingEmbedder):
+                    previous.close()
+            embedder = self.get_embedder()
+            self._vectorstores = {
+                collection: SkillVectorStore(embedder, self.collection_directory(collection),
+                                             write_lock=self._write_lock(collection))
+                for collection in self._vectorstores
+            }
+        logger.info(f"Reloaded {len(self._vectorstores)} collections from {self.persist_directory}")
+
+    def get_status(self) -> Dict[str, Any]:
+        cache = get_embedding_cache()
+        shard_pool = peek_shard_pool()
+        skill_index = get_skill_index()
+        return {
+            "model_name": self.model_name,
+            "persist_directory": self.persist_directory,
+            "embedder_loaded": self._embedder is not None,
+            "collections_loaded": sorted(self._vectorstores),
+            "embedding_cache": cache.get_stats() if cache is not None else None,
+            "embedding_batcher": self._embedder.get_stats() if isinstance(self._embedder, BatchingEmbedder) else None,
+            "search_shards": shard_pool.get_stats() if shard_pool is not None else None,
+            "skill_index": skill_index.get_stats() if skill_index is not None else None
+        }
+
+
+_registry: Optional[VectorStoreRegistry] = None
+
+
+def init_registry() -> VectorStoreRegistry:
+    """Create the process-wide registry (called from the FastAPI lifespan)"""
+    global _registry
+    if _registry is None:
+        _registry = VectorStoreRegistry()
+    return _registry
+
+
+def get_registry() -> VectorStoreRegistry:
+    """Get the process-wide registry, creating it if the lifespan hasn't run"""
+    return init_registry()
@@ -0,0 +1,634 @@
+import json
+import math
+import os
+import threading
+from bisect import bisect_right
+from typing import Callable, List, Dict, Any, Set, Tuple, Optional
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+TOMBSTONE_PREFIX = "tomb-"
+SEGMENT_FORMAT_VERSION = 1
+# Rows copied at a time when writing vectors from other segments' memory maps
+COPY_BLOCK_ROWS = 65536
+# Bytes of records read at a time when iterating over a segment
+READ_BLOCK_BYTES = 1 << 20
+
+
+def _fsync_directory(directory: str):
+    """Flush a directory entry so renames inside it survive a crash (no-op where unsupported)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(path: str, write):
+    """Write a file through a temporary name, fsync it, then rename into place"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _write_vectors_atomic(path: str, blocks: List[np.ndarray]):
+    """
+    Write float32 vector blocks as one .npy file without concatenating them in memory
+
+    The output is a memory-mapped file filled COPY_BLOCK_ROWS rows at a time,
+    so memory use stays bounded however large the blocks (usually memory
+    maps of other segments) are. Written through a temporary name, fsynced,
+    then renamed into place.
+    """
+    rows = sum(len(block) for block in blocks)
+    dimension = next((block.shape[1] for block in blocks if block.ndim == 2), 0)
+    tmp_path = f"{path}.tmp"
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(rows, dimension))
+    row = 0
+    for block in blocks:
+        for offset in range(0, len(block), COPY_BLOCK_ROWS):
+            part = block[offset:offset + COPY_BLOCK_ROWS]
+            out[row:row + len(part)] = part
+            row += len(part)
+    out.flush()
+    del out
+    with open(tmp_path, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class Segment:
+    """
+    One immutable on-disk segment
+
+    Files:
+        <name>.npy          float32 embeddings, opened with np.memmap
+        <name>.docs.jsonl   one JSON record per row: {"text": ..., "metadata": ...}
+        <name>.offsets.npy  int64 byte offsets of each record (count + 1 entries)
+    """
+
+    def __init__(self, directory: str, name: str):
+        self.directory = directory
+        self.name = name
+        self.embeddings = np.load(self._path(".npy"), mmap_mode="r")
+        self.offsets = np.load(self._path(".offsets.npy"), mmap_mode="r")
+        self._docs_fd = os.open(self._path(".docs.jsonl"), os.O_RDONLY)
+
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.directory, f"{self.name}{suffix}")
+
+    @property
+    def count(self) -> int:
+        return len(self.embeddings)
+
+    @property
+    def files(self) -> List[str]:
+        return [self._path(suffix) for suffix in (".npy", ".docs.jsonl", ".offsets.npy")]
+
+    def get_record(self, position: int) -> Tuple[str, Dict[str, Any]]:
+        """Read one document and its metadata by position within the segment"""
+        start = int(self.offsets[position])
+        end = int(self.offsets[position + 1])
+        # pread is positional, so concurrent readers can share the descriptor
+        record = json.loads(os.pread(self._docs_fd, end - start, start).decode("utf-8"))
+        return record["text"], record.get("metadata", {})
+
+    def iter_records(self):
+        """Iterate over all (text, metadata) records in order"""
+        # Read through the held descriptor: compaction may already have removed the
+        # file, and positional reads leave the descriptor's offset to other readers
+        offsets = self.offsets
+        position = 0
+        while position < self.count:
+            base = int(offsets[position])
+            end = int(np.searchsorted(offsets, base + READ_BLOCK_BYTES, side="right")) - 1
+            end = min(max(end, position + 1), self.count)
+            data = os.pread(self._docs_fd, int(offsets[end]) - base, base)
+            for row in range(position, end):
+                record = json.loads(data[int(offsets[row]) - base:int(offsets[row + 1]) - base].decode("utf-8"))
+                yield record["text"], record.get("metadata", {})
+            position = end
+
+    def close(self):
+        fd, self._docs_fd = getattr(self, "_docs_fd", None), None
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __del__(self):
+        # Segments replaced by compaction may still be held by in-flight readers,
+        # so the descriptor is closed only once the last reference goes away
+        self.close()
+
+    @staticmethod
+    def write(directory: str, name: str, vectors, records) -> "Segment":
+        """
+        Write a new segment's files durably and open it
+
+        Args:
+            directory: Store directory
+            name: Segment name
+            vectors: float32 embedding matrix, or a list of matrices written one
+                after another (streamed, e.g. the memory maps of merged segments)
+            records: Iterable of (text, metadata), one per row
+
+        Returns:
+            The opened Segment
+        """
+        blocks = vectors if isinstance(vectors, list) else [vectors]
+        rows = sum(len(block) for block in blocks)
+        offsets = [0]
+
+        def write_docs(f):
+            for text, metadata in records:
+                line = json.dumps({"text": text, "metadata": metadata}, ensure_ascii=False).encode("utf-8") + b"\n"
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+
+        _write_atomic(os.path.join(directory, f"{name}.docs.jsonl"), write_docs)
+        if len(offsets) != rows + 1:
+            raise ValueError(f"Segment {name} has {rows} vectors but {len(offsets) - 1} records")
+
+        _write_atomic(os.path.join(directory, f"{name}.offsets.npy"),
+                      lambda f: np.save(f, np.asarray(offsets, dtype=np.int64)))
+        _write_vectors_atomic(os.path.join(directory, f"{name}.npy"), blocks)
+
+        return Segment(directory, name)
+
+
+class SegmentView:
+    """
+    Immutable view of a SegmentStore: its live segments and tombstones at one commit
+
+    Every commit publishes a new view instead of changing the current one,
+    so a reader that holds a view keeps seeing one consistent set of rows.
+    This holds even while appends, compactions or a purge commit newer
+    views. Segment files replaced in the meantime stay readable through
+    the view's open memory maps and descriptors.
+    """
+
+    def __init__(self, segments: List[Segment], deleted: np.ndarray):
+        """
+        Args:
+            segments: Live segments in row order
+            deleted: Sorted row ids of tombstoned rows
+        """
+        self.segments = segments
+        self.starts: List[int] = []
+        total = 0
+        for segment in segments:
+            self.starts.append(total)
+            total += segment.count
+        self.count = total
+        deleted.setflags(write=False)
+        self.deleted = deleted
+
+    @property
+    def live_count(self) -> int:
+        return self.count - len(self.deleted)
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self.segments[0].embeddings.shape[1] if self.segments else None
+
+    def locate(self, row: int) -> Tuple[Segment, int]:
+        """Map a global row id to (segment, position within segment)"""
+        i = bisect_right(self.starts, row) - 1
+        if i < 0 or row - self.starts[i] >= self.segments[i].count:
+            raise IndexError(f"Row {row} out of range")
+        return self.segments[i], row - self.starts[i]
+
+    def get_record(self, row: int) -> Tuple[str, Dict[str, Any]]:
+        """Read a document and its metadata by global row id"""
+        segment, position = self.locate(row)
+        return segment.get_record(position)
+
+    def vector_blocks(self, start: int = 0) -> List[np.ndarray]:
+        """Memory-mapped embedding blocks in row order, from row start on"""
+        if start <= 0:
+            return [segment.embeddings for segment in self.segments]
+        blocks = []
+        for segment, segment_start in zip(self.segments, self.starts):
+            if segment_start + segment.count > start:
+                blocks.append(segment.embeddings[max(start - segment_start, 0):])
+        return blocks
+
+    def read_vectors(self, start: int, end: int) -> np.ndarray:
+        """Embeddings for rows [start, end) as one in-memory matrix"""
+        parts = []
+        for segment, segment_start in zip(self.segments, self.starts):
+            lo = max(start, segment_start) - segment_start
+            hi = min(end, segment_start + segment.count) - segment_start
+            if lo < hi:
+                parts.append(segment.embeddings[lo:hi])
+        if not parts:
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
+        return np.ascontiguousarray(np.concatenate(parts), dtype=np.float32)
+
+    def gather_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Embeddings for an ascending array of row ids
+
+        Args:
+            rows: Sorted global row ids
+
+        Returns:
+            float32 matrix aligned with rows
+        """
+        parts = []
+        for segment, segment_start in zip(self.segments, self.starts):
+            lo, hi = np.searchsorted(rows, [segment_start, segment_start + segment.count])
+            if lo < hi:
+                parts.append(segment.embeddings[rows[lo:hi] - segment_start])
+        if not parts:
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
+        return np.ascontiguousarray(np.concatenate(parts), dtype=np.float32)
+
+    def is_deleted(self, rows: np.ndarray) -> np.ndarray:
+        """Boolean mask of which rows are tombstoned"""
+        if len(self.deleted) == 0:
+            return np.zeros(len(rows), dtype=bool)
+        return np.isin(rows, self.deleted)
+
+    def iter_records(self, start: int = 0):
+        """Iterate over (text, metadata) records in row order, from row start on"""
+        for segment, segment_start in zip(self.segments, self.starts):
+            if segment_start + segment.count <= start:
+                continue
+            records = segment.iter_records()
+            for _ in range(max(start - segment_start, 0)):
+                next(records)
+            yield from records
+
+
+class SegmentStore:
+    """
+    Append-only segmented persistence for embeddings, documents and metadata
+
+    Every append writes one new immutable segment and then atomically replaces
+    the manifest that lists the live segments, so ingest cost is proportional
+    to the new data and a crash never leaves a half-written store. Startup
+    only memory-maps the listed segments. Small adjacent segments are merged
+    by a background compaction thread to keep the segment count bounded.
+
+    Deleted rows are tombstoned: their ids go into a sorted array file that
+    the manifest points to, and readers skip them. Row ids stay stable until
+    a purge rewrites the segments holding tombstones, which renumbers every
+    later row.
+
+    Each commit publishes a new SegmentView; readers that need several
+    reads to agree should take view once and read through it.
+    """
+
+    def __init__(self, directory: str, compact_threshold: int = 8,
+                 on_commit: Optional[Callable[[SegmentView], None]] = None):
+        """
+        Open (or create) a segment store
+
+        Args:
+            directory: Store directory
+            compact_threshold: Number of similar-sized adjacent segments that triggers a merge
+            on_commit: Called with every newly published view (holding the store's lock)
+        """
+        self.directory = directory
+        self.compact_threshold = max(2, compact_threshold)
+        self._state = SegmentView([], np.empty(0, dtype=np.int64))
+        self._on_commit = None
+        self._tombstone_name: Optional[str] = None
+        self._next_id = 1
+        # Segments being written by compaction or a purge, whose files aren't orphans yet
+        self._writing: Set[str] = set()
+        self._lock = threading.Lock()
+        self._compaction: Optional[threading.Thread] = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_manifest()
+        self._on_commit = on_commit
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_FILENAME)
+
+    @property
+    def view(self) -> SegmentView:
+        """The current view (immutable; later commits publish new ones)"""
+        return self._state
+
+    @property
+    def segments(self) -> List[Segment]:
+        return self._state.segments
+
+    @property
+    def count(self) -> int:
+        return self._state.count
+
+    @property
+    def deleted(self) -> np.ndarray:
+        """Sorted row ids of tombstoned rows"""
+        return self._state.deleted
+
+    @property
+    def live_count(self) -> int:
+        return self._state.live_count
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self._state.dimension
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def _load_manifest(self):
+        if not self.exists():
+            return
+
+        with open(self.manifest_path, "r") as f:
+            manifest = json.load(f)
+
+        if manifest.get("version") != SEGMENT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported segment format version {manifest.get('version')}")
+
+        self._next_id = manifest.get("next_segment_id", 1)
+        # Files an earlier instance wrote after its last manifest (e.g. an unfinished merge) keep their ids
+        for filename in os.listdir(self.directory):
+            if filename.startswith(("seg-", TOMBSTONE_PREFIX)):
+                file_id = filename.split(".")[0].rsplit("-", 1)[-1]
+                if file_id.isdigit():
+                    self._next_id = max(self._next_id, int(file_id) + 1)
+        self._tombstone_name = manifest.get("tombstones")
+        deleted = np.empty(0, dtype=np.int64)
+        if self._tombstone_name:
+            deleted = np.load(os.path.join(self.directory, self._tombstone_name))
+        self._set_segments([Segment(self.directory, name) for name in manifest.get("segments", [])], deleted)
+        self._remove_orphans()
+
+    def _set_segments(self, segments: List[Segment], deleted: np.ndarray):
+        # Publish a new view rather than mutating, so readers holding the old one stay consistent
+        self._state = SegmentView(segments, deleted)
+        if self._on_commit is not None:
+            self._on_commit(self._state)
+
+    def _commit(self, segments: List[Segment], deleted: Optional[np.ndarray] = None,
+                tombstone_name: Optional[str] = None):
+        """Atomically publish a new list of live segments (and tombstones, if given)"""
+        if deleted is None:
+            deleted, tombstone_name = self.deleted, self._tombstone_name
+        manifest = {
+            "version": SEGMENT_FORMAT_VERSION,
+            "next_segment_id": self._next_id,
+            "segments": [segment.name for segment in segments],
+            "count": sum(segment.count for segment in segments),
+            "tombstones": tombstone_name
+        }
+        _write_atomic(self.manifest_path, lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")))
+        _fsync_directory(self.directory)
+        self._tombstone_name = tombstone_name
+        self._set_segments(segments, deleted)
+
+    def _remove_orphans(self):
+        """Delete segment and tombstone files left behind by an interrupted or superseded commit"""
+        live = {os.path.basename(path) for segment in self.segments for path in segment.files}
+        if self._tombstone_name:
+            live.add(self._tombstone_name)
+        for filename in os.listdir(self.directory):
+            if filename.split(".")[0] in self._writing:
+                continue
+            if filename.startswith(("seg-", TOMBSTONE_PREFIX)) and filename not in live:
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except OSError:
+                    pass
+
+    def _take_id(self) -> int:
+        """Next file id, skipping ids whose files exist (written by another instance on this directory)"""
+        while True:
+            file_id = self._next_id
+            self._next_id += 1
+            names = [f"seg-{file_id:06d}{suffix}" for suffix in (".npy", ".docs.jsonl", ".offsets.npy")]
+            names.append(f"{TOMBSTONE_PREFIX}{file_id:06d}.npy")
+            if not any(os.path.exists(os.path.join(self.directory, name)) for name in names):
+                return file_id
+
+    def _new_name(self, writing: bool = False) -> str:
+        """Reserve a segment name (writing: protect its files from orphan removal until released)"""
+        name = f"seg-{self._take_id():06d}"
+        if writing:
+            self._writing.add(name)
+        return name
+
+    def append(self, vectors: np.ndarray, documents: List[str], metadata: List[Dict[str, Any]]) -> int:
+        """
+        Durably append rows as a new segment
+
+        Args:
+            vectors: Normalized float32 embeddings
+            documents: Document texts
+            metadata: Metadata dictionaries
+
+        Returns:
+            Row id of the first appended row
+        """
+        with self._lock:
+            first_row = self.count
+            segment = Segment.write(self.directory, self._new_name(), vectors, zip(documents, metadata))
+            self._commit(self.segments + [segment])
+
+        self.maybe_compact()
+        return first_row
+
+    def locate(self, row: int) -> Tuple[Segment, int]:
+        """Map a global row id to (segment, position within segment)"""
+        return self._state.locate(row)
+
+    def get_record(self, row: int) -> Tuple[str, Dict[str, Any]]:
+        """Read a document and its metadata by global row id"""
+        return self._state.get_record(row)
+
+    def vector_blocks(self) -> List[np.ndarray]:
+        """Memory-mapped embedding blocks in row order"""
+        return self._state.vector_blocks()
+
+    def read_vectors(self, start: int, end: int) -> np.ndarray:
+        """Embeddings for rows [start, end) as one in-memory matrix"""
+        return self._state.read_vectors(start, end)
+
+    def gather_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Embeddings for an ascending array of row ids (see SegmentView.gather_vectors)"""
+        return self._state.gather_vectors(rows)
+
+    def is_deleted(self, rows: np.ndarray) -> np.ndarray:
+        """Boolean mask of which rows are tombstoned"""
+        return self._state.is_deleted(rows)
+
+    def delete_rows(self, rows: np.ndarray) -> int:
+        """
+        Durably tombstone rows
+
+        Args:
+            rows: Global row ids (out-of-range and already deleted rows are ignored)
+
+        Returns:
+            Number of rows newly tombstoned
+        """
+        with self._lock:
+            rows = np.asarray(rows, dtype=np.int64)
+            rows = rows[(rows >= 0) & (rows < self.count)]
+            deleted = np.union1d(self.deleted, rows).astype(np.int64)
+            added = len(deleted) - len(self.deleted)
+            if added == 0:
+                return 0
+
+            name = f"{TOMBSTONE_PREFIX}{self._take_id():06d}.npy"
+            _write_atomic(os.path.join(self.directory, name), lambda f: np.save(f, deleted))
+            self._commit(self.segments, deleted, name)
+            self._remove_orphans()
+        return added
+
+    def rewrite_without_deleted(self) -> List[Segment]:
+        """
+        Write replacement segments with tombstoned rows dropped
+
+        Segments without tombstones are reused as-is and fully deleted
+        segments are dropped. The result is not live until commit_rewrite;
+        the caller must keep appends and compactions out until then.
+
+        Returns:
+            The segment list to commit
+        """
+        view = self._state
+        segments, starts, deleted = view.segments, view.starts, view.deleted
+        rewritten = []
+        for segment, start in zip(segments, starts):
+            lo, hi = np.searchsorted(deleted, [start, start + segment.count])
+            if lo == hi:
+                rewritten.append(segment)
+                continue
+            if hi - lo == segment.count:
+                continue
+
+            keep = np.ones(segment.count, dtype=bool)
+            keep[deleted[lo:hi] - start] = False
+            with self._lock:
+                name = self._new_name(writing=True)
+            records = (record for record, kept in zip(segment.iter_records(), keep) if kept)
+            rewritten.append(Segment.write(self.directory, name, segment.embeddings[keep], records))
+        return rewritten
+
+    def commit_rewrite(self, segments: List[Segment]):
+        """Publish segments from rewrite_without_deleted, clearing tombstones and renumbering rows"""
+        with self._lock:
+            removed = [segment for segment in self.segments if segment not in segments]
+            self._commit(segments, np.empty(0, dtype=np.int64), None)
+            self._writing.difference_update(segment.name for segment in segments)
+            self._remove_orphans()
+        logger.info(f"Purged tombstoned rows, rewrote {len(removed)} segments")
+
+    def iter_records(self):
+        """Iterate over all (text, metadata) records in row order"""
+        return self._state.iter_records()
+
+    def read_all_vectors(self) -> np.ndarray:
+        """All embeddings as one in-memory matrix (used for index rebuilds)"""
+        blocks = self.vector_blocks()
+        if not blocks:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.ascontiguousarray(np.concatenate(blocks), dtype=np.float32)
+
+    def _pick_compaction_run(self, segments: List[Segment]) -> Optional[Tuple[int, int]]:
+        """
+        Find the newest run of adjacent segments in the same size tier
+
+        Size tiers are powers of the threshold, so each row is rewritten only
+        O(log N) times over the life of the store.
+        """
+        if len(segments) < self.compact_threshold:
+            return None
+
+        tiers = [int(math.log(max(segment.count, 1), self.compact_threshold)) for segment in segments]
+        end = len(segments)
+        while end > 0:
+            start = end - 1
+            while start > 0 and tiers[start - 1] == tiers[end - 1]:
+                start -= 1
+            if end - start >= self.compact_threshold:
+                return start, end
+            end = start
+        return None
+
+    def maybe_compact(self):
+        """Start a background compaction if there are enough small segments"""
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        if self._pick_compaction_run(self.segments) is None:
+            return
+
+        self._compaction = threading.Thread(target=self.compact, name="segment-compaction", daemon=True)
+        self._compaction.start()
+
+    def compact(self) -> bool:
+        """
+        Merge the newest run of similar-sized segments into one
+
+        Returns:
+            True if a merge was committed
+        """
+        segments = self.segments
+        run = self._pick_compaction_run(segments)
+        if run is None:
+            return False
+
+        start, end = run
+        merging = segments[start:end]
+        # Tombstones refer to row ids, which a merge keeps, so they carry over unchanged
+        with self._lock:
+            name = self._new_name(writing=True)
+        try:
+            # Copied from the segments' memory maps block by block, never loaded whole
+            records = (record for segment in merging for record in segment.iter_records())
+            merged = Segment.write(self.directory, name, [segment.embeddings for segment in merging], records)
+
+            with self._lock:
+                # Appends only add at the end, so the merged run is still in place
+                current = self.segments
+                self._commit(current[:start] + [merged] + current[end:])
+                self._writing.discard(name)
+
+            for segment in merging:
+                for path in segment.files:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+            logger.info(f"Compacted {len(merging)} segments ({merged.count} rows) into {name}")
+            return True
+        except Exception as e:
+            with self._lock:
+                self._writing.discard(name)
+            logger.error(f"Segment compaction failed: {e}")
+            return False
+
+    def wait_for_compaction(self):
+        if self._compaction is not None:
+            self._compaction.join()
+
+    def clear(self):
+        """Remove every segment and the manifest"""
+        self.wait_for_compaction()
+        with self._lock:
+            self._commit([], np.empty(0, dtype=np.int64), None)
+            self._remove_orphans()
+            os.remove(self.manifest_path)
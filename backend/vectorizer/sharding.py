@@ -0,0 +1,467 @@
+import heapq
+import multiprocessing
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from multiprocessing.connection import wait
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import numpy as np
+import logging
+from config import Config
+from .index import SCAN_BLOCK_ROWS, ExactIndex, merge_top_k, scan_blocks
+
+logger = logging.getLogger(__name__)
+
+# Each worker scans with one BLAS thread, so N shards use N cores without oversubscription
+BLAS_THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+class ShardBusyError(TimeoutError):
+    """Raised when every connection to a shard worker stays checked out past the timeout"""
+
+
+class ShardScanError(RuntimeError):
+    """Raised when a shard worker answers a request with an error (the worker itself is fine)"""
+
+# (segment file, row id of the file's first row, first row to scan, end row) within one file
+Piece = Tuple[str, int, int, int]
+
+
+def partition_blocks(blocks: List[np.ndarray], shards: int) -> List[List[Piece]]:
+    """
+    Split memory-mapped blocks into equal row ranges, one per shard
+
+    Ranges cut across segment boundaries, so shards stay balanced however
+    the rows are spread over segments.
+
+    Args:
+        blocks: Memory-mapped embedding blocks in row order
+        shards: Number of shards
+
+    Returns:
+        Pieces to scan per shard
+    """
+    total = sum(len(block) for block in blocks)
+    bounds = np.linspace(0, total, shards + 1).astype(np.int64)
+    pieces: List[List[Piece]] = [[] for _ in range(shards)]
+
+    block_start = 0
+    for block in blocks:
+        block_end = block_start + len(block)
+        for shard in range(shards):
+            lo = max(int(bounds[shard]), block_start)
+            hi = min(int(bounds[shard + 1]), block_end)
+            if lo < hi:
+                pieces[shard].append((block.filename, block_start, lo - block_start, hi - block_start))
+        block_start = block_end
+    return pieces
+
+
+def scan_pieces(queries: np.ndarray, k: int, pieces: List[Piece],
+                open_block: Callable[[str], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact top-k over row ranges of memory-mapped blocks, SCAN_BLOCK_ROWS rows at a time"""
+    scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    ids = np.full((len(queries), k), -1, dtype=np.int64)
+    for filename, block_start, lo, hi in pieces:
+        block = open_block(filename)
+        for start in range(lo, hi, SCAN_BLOCK_ROWS):
+            end = min(start + SCAN_BLOCK_ROWS, hi)
+            scores, ids = merge_top_k(scores, ids, queries @ block[start:end].T, block_start + start, k)
+    return scores, ids
+
+
+def merge_shard_results(results: List[Tuple[np.ndarray, np.ndarray]], num_queries: int,
+                        k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge per-shard top-k lists with a heap
+
+    Returns:
+        (scores, ids) matrices of shape (num_queries, k), padded with -inf / -1
+    """
+    scores = np.full((num_queries, k), -np.inf, dtype=np.float32)
+    ids = np.full((num_queries, k), -1, dtype=np.int64)
+    for i in range(num_queries):
+        candidates = (
+            (float(score), int(row))
+            for shard_scores, shard_ids in results
+            for score, row in zip(shard_scores[i], shard_ids[i])
+            if row >= 0
+        )
+        best = heapq.nlargest(k, candidates)
+        if best:
+            scores[i, :len(best)] = [score for score, _ in best]
+            ids[i, :len(best)] = [row for _, row in best]
+    return scores, ids
+
+
+def _shard_worker(conns):
+    """Worker process loop: answer pings and scan requests on any connection until told to stop"""
+    # Segments are immutable, so a file opened once stays valid until it drops out of use
+    open_blocks: Dict[str, np.ndarray] = {}
+
+    def open_block(filename: str) -> np.ndarray:
+        block = open_blocks.get(filename)
+        if block is None:
+            block = np.load(filename, mmap_mode="r")
+            open_blocks[filename] = block
+        return block
+
+    conns = list(conns)
+    while conns:
+        for conn in wait(conns):
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                conns.remove(conn)
+                continue
+            if message is None:
+                return
+
+            if message[0] == "ping":
+                reply = ("ok", os.getpid())
+            else:
+                _, queries, k, pieces = message
+                try:
+                    reply = ("ok", scan_pieces(queries, k, pieces, open_block))
+                except Exception as e:
+                    reply = ("error", repr(e))
+                # Forget segments that compaction or a purge replaced
+                live = {piece[0] for piece in pieces}
+                for filename in [name for name in open_blocks if name not in live]:
+                    del open_blocks[filename]
+
+            try:
+                conn.send(reply)
+            except OSError:
+                # The caller gave up on this connection
+                conns.remove(conn)
+
+
+@contextmanager
+def _single_threaded_blas():
+    """Start child processes with single-threaded BLAS (the parent's settings are restored)"""
+    saved = {name: os.environ.get(name) for name in BLAS_THREAD_VARIABLES}
+    os.environ.update({name: "1" for name in BLAS_THREAD_VARIABLES})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+class _ShardWorker:
+    """One worker process and the pool of connections searches check out to talk to it"""
+
+    def __init__(self, context, shard: int, connections: int):
+        pairs = [context.Pipe() for _ in range(max(1, connections))]
+        self.process = context.Process(target=_shard_worker, args=([child for _, child in pairs],),
+                                       name=f"vector-shard-{shard}", daemon=True)
+        with _single_threaded_blas():
+            self.process.start()
+        for _, child in pairs:
+            child.close()
+        self.idle: "queue.Queue" = queue.Queue()
+        for parent, _ in pairs:
+            self.idle.put(parent)
+        self.retired = False
+
+    def checkout(self, timeout: float):
+        """Take an idle connection (raises queue.Empty if none frees up in time)"""
+        return self.idle.get(timeout=timeout)
+
+    def checkin(self, conn):
+        """Return a connection after a complete request and reply"""
+        if self.retired:
+            conn.close()
+        else:
+            self.idle.put(conn)
+
+    def retire(self):
+        """
+        Stop the process and close idle connections
+
+        Connections checked out by searches in flight are closed by their
+        holders, which see EOF once the process is gone.
+        """
+        self.retired = True
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=1.0)
+        self._close_idle()
+
+    def stop(self):
+        """Ask the process to exit, terminating it if it doesn't"""
+        self.retired = True
+        try:
+            conn = self.idle.get_nowait()
+            conn.send(None)
+            conn.close()
+        except (queue.Empty, OSError, EOFError):
+            pass
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._close_idle()
+
+    def _close_idle(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class ShardPool:
+    """
+    Pool of local worker processes that scan memory-mapped segments
+
+    A search scatters the queries to every worker, each scanning an equal
+    slice of the rows, and merges the per-shard top-k lists. Workers map
+    the segment files themselves, so the embeddings are shared through the
+    page cache rather than copied.
+
+    Each worker serves several connections, and a search checks out one
+    per worker for its request and reply, so concurrent searches overlap
+    instead of taking turns; a worker answers them in arrival order. Dead
+    workers are restarted before each search. A worker that dies or misses
+    Config.VECTOR_SHARD_TIMEOUT is restarted; one that answers with an
+    error is kept. Either way its slice is scanned in-process, so results
+    stay complete. Only restarts are serialized.
+    """
+
+    def __init__(self, size: int, timeout: float = 10.0, connections: int = 4):
+        """
+        Start the worker processes
+
+        Args:
+            size: Number of shards (worker processes)
+            timeout: Seconds to wait for a worker's reply before restarting it
+            connections: Searches each worker can have in flight at once
+        """
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.connections = max(1, connections)
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.searches = 0
+        self.restarts = 0
+        self.failures = 0
+
+        self._workers: List[_ShardWorker] = [
+            _ShardWorker(self._context, shard, self.connections) for shard in range(self.size)
+        ]
+        logger.info(f"Started {self.size} vector search shard workers")
+
+    def _restart_worker(self, shard: int, worker: _ShardWorker):
+        """Replace a shard's worker, unless another search already replaced it"""
+        with self._lock:
+            if self._closed or self._workers[shard] is not worker:
+                return
+            worker.retire()
+            self.restarts += 1
+            self._workers[shard] = _ShardWorker(self._context, shard, self.connections)
+
+    def _ensure_workers(self):
+        for shard, worker in enumerate(list(self._workers)):
+            if not worker.process.is_alive():
+                logger.warning(f"Shard worker {shard} exited with code {worker.process.exitcode}, restarting")
+                self._restart_worker(shard, worker)
+
+    def _receive(self, conn):
+        if not conn.poll(self.timeout):
+            raise TimeoutError(f"no reply within {self.timeout}s")
+        status, payload = conn.recv()
+        if status != "ok":
+            raise ShardScanError(payload)
+        return payload
+
+    def _request(self, shard: int, message) -> Tuple[_ShardWorker, Any]:
+        """Check out a connection to a shard's worker and send a message on it"""
+        worker = self._workers[shard]
+        try:
+            conn = worker.checkout(self.timeout)
+        except queue.Empty:
+            raise ShardBusyError(f"no free connection within {self.timeout}s")
+        try:
+            conn.send(message)
+        except Exception:
+            conn.close()
+            raise
+        return worker, conn
+
+    def _reply(self, worker: _ShardWorker, conn):
+        """Receive the reply to a request, returning the connection only if it completed cleanly"""
+        try:
+            payload = self._receive(conn)
+        except ShardScanError:
+            # A complete reply, so the connection is still in step
+            worker.checkin(conn)
+            raise
+        except Exception:
+            # A late reply would be read by the next search, so the connection is dropped
+            conn.close()
+            raise
+        worker.checkin(conn)
+        return payload
+
+    def search(self, queries: np.ndarray, k: int, blocks: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scatter a batch of queries to every shard and merge the results
+
+        Args:
+            queries: 2-D float32 matrix of normalized query vectors
+            k: Number of results per query
+            blocks: Memory-mapped embedding blocks in row order
+
+        Returns:
+            (scores, ids) matrices of shape (len(queries), k), padded with -inf / -1
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        pieces = partition_blocks(blocks, self.size)
+        results = []
+        failed = []
+
+        self._ensure_workers()
+        sent = []
+        for shard, shard_pieces in enumerate(pieces):
+            if not shard_pieces:
+                continue
+            try:
+                sent.append((shard, *self._request(shard, ("search", queries, k, shard_pieces))))
+            except ShardBusyError as e:
+                # Busy, not broken: the searches holding its connections restart it if it hangs
+                logger.warning(f"Shard {shard} busy, scanning its rows in-process: {e}")
+                failed.append((shard, None))
+            except (OSError, EOFError) as e:
+                logger.warning(f"Shard {shard} unreachable, scanning its rows in-process: {e}")
+                failed.append((shard, self._workers[shard]))
+
+        for shard, worker, conn in sent:
+            try:
+                results.append(self._reply(worker, conn))
+            except ShardScanError as e:
+                logger.warning(f"Shard {shard} scan failed, scanning its rows in-process: {e}")
+                failed.append((shard, None))
+            except Exception as e:
+                logger.warning(f"Shard {shard} failed, scanning its rows in-process: {e}")
+                failed.append((shard, worker))
+
+        # Only workers that are dead, hung or out of step are restarted
+        for shard, worker in failed:
+            if worker is not None:
+                self._restart_worker(shard, worker)
+        with self._lock:
+            self.failures += len(failed)
+            self.searches += 1
+
+        if failed:
+            by_filename = {block.filename: block for block in blocks}
+            for shard, _ in failed:
+                results.append(scan_pieces(queries, k, pieces[shard], by_filename.__getitem__))
+
+        return merge_shard_results(results, len(queries), k)
+
+    def health_check(self) -> List[Dict[str, Any]]:
+        """
+        Ping every worker, restarting any that are dead or unresponsive
+
+        Returns:
+            Per-shard status before any restart
+        """
+        statuses = []
+        for shard in range(self.size):
+            worker = self._workers[shard]
+            healthy = False
+            busy = False
+            if worker.process.is_alive():
+                try:
+                    healthy = self._reply(*self._request(shard, ("ping",))) == worker.process.pid
+                except ShardBusyError as e:
+                    busy = True
+                    logger.warning(f"Shard {shard} too busy for health check: {e}")
+                except Exception as e:
+                    logger.warning(f"Shard {shard} failed health check: {e}")
+            statuses.append({"shard": shard, "pid": worker.process.pid, "healthy": healthy, "busy": busy})
+            if not healthy and not busy:
+                self._restart_worker(shard, worker)
+        return statuses
+
+    def close(self):
+        """Stop every worker"""
+        with self._lock:
+            self._closed = True
+            for worker in self._workers:
+                worker.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "shards": self.size,
+            "connections_per_shard": self.connections,
+            "alive": sum(1 for worker in self._workers if worker.process.is_alive()),
+            "searches": self.searches,
+            "restarts": self.restarts,
+            "failures": self.failures
+        }
+
+
+class ShardedIndex(ExactIndex):
+    """
+    Exact search with the scan spread over a ShardPool
+
+    Small stores (below Config.VECTOR_SHARD_MIN_ROWS) and blocks that are
+    not memory-mapped files are scanned in-process, where scatter overhead
+    would dominate.
+    """
+
+    def __init__(self, get_blocks: Callable[[], List[np.ndarray]], pool: ShardPool):
+        """
+        Args:
+            get_blocks: Returns the store's normalized float32 embedding blocks in row order
+            pool: Worker pool to scatter scans to
+        """
+        super().__init__(get_blocks)
+        self.pool = pool
+
+    def search(self, queries: np.ndarray, k: int, view=None) -> Tuple[np.ndarray, np.ndarray]:
+        blocks = view.vector_blocks() if view is not None else self._get_blocks()
+        rows = sum(len(block) for block in blocks)
+        if rows < Config.VECTOR_SHARD_MIN_ROWS or not all(isinstance(block, np.memmap) for block in blocks):
+            return scan_blocks(queries, k, blocks)
+        return self.pool.search(queries, k, blocks)
+
+
+_shard_pool: Optional[ShardPool] = None
+_shard_pool_lock = threading.Lock()
+
+
+def get_shard_pool() -> Optional[ShardPool]:
+    """Get the process-wide shard pool, or None if sharded search is disabled"""
+    global _shard_pool
+    if Config.VECTOR_SEARCH_SHARDS <= 1:
+        return None
+    if _shard_pool is None:
+        with _shard_pool_lock:
+            if _shard_pool is None:
+                _shard_pool = ShardPool(Config.VECTOR_SEARCH_SHARDS, Config.VECTOR_SHARD_TIMEOUT,
+                                        Config.VECTOR_SHARD_CONNECTIONS)
+    return _shard_pool
+
+
+def peek_shard_pool() -> Optional[ShardPool]:
+    """The shard pool if it has been started, without starting it"""
+    return _shard_pool
+
+
+def close_shard_pool():
+    """Stop the shard workers, if they were started"""
+    global _shard_pool
+    with _shard_pool_lock:
+        if _shard_pool is not None:
+            _shard_pool.close()
+            _shard_pool = None
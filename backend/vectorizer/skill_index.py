@@ -0,0 +1,317 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Dict, Any, Optional, Set
+import numpy as np
+import logging
+from config import Config
+from team_parser.utils import SKILL_ALIASES, skill_key
+from .vectorstore import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+
+def load_skill_vocabulary(role_skills_path: str) -> List[str]:
+    """
+    Every skill named in the role-skill mapping, in file order without duplicates
+
+    Args:
+        role_skills_path: Path to static_role_skills.json
+
+    Returns:
+        Skill names (empty if the file is missing or malformed)
+    """
+    try:
+        with open(role_skills_path, "r") as f:
+            role_skills = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load skill vocabulary from {role_skills_path}: {e}")
+        return []
+
+    skills: Dict[str, str] = {}
+    for groups in role_skills.values():
+        for group in groups.values():
+            for skill in group:
+                skills.setdefault(skill_key(skill), skill)
+    return list(skills.values())
+
+
+class SkillVocabularyIndex:
+    """
+    In-memory embedding index of canonical skill names
+
+    Resolves raw skill strings ("k8s", "Amazon Web Services", "pyspark") to
+    the canonical skill they mean. A raw string is matched, in order, by
+    case- and whitespace-insensitive name, by SKILL_ALIASES, and otherwise by
+    embedding similarity to the vocabulary, accepted at or above
+    Config.SKILL_MATCH_THRESHOLD. Vocabulary skills whose names contain one
+    another ("React" and "React Native", "Java" and "JavaScript") are related
+    but distinct and embed close together, so an embedding match is never
+    one of them when the raw string names the other ("Java 8" is not
+    "JavaScript"); otherwise a shorter or longer name is fine ("Apache
+    Spark" is "Spark", "Airflow" is "Apache Airflow"). All strings that need the model are
+    embedded in one call and scored with one matrix product, and every
+    resolution is memoized in an LRU, so resolving a whole team costs one
+    vectorized pass the first time and dictionary lookups afterwards.
+
+    The vocabulary is held as a preallocated matrix that doubles when full,
+    so adding observed skills embeds only the new names.
+    """
+
+    def __init__(self, embedder, threshold: float = 0.85, memo_size: int = 10000):
+        """
+        Create an empty index
+
+        Args:
+            embedder: SkillEmbedder (or a wrapper delegating to one)
+            threshold: Minimum cosine similarity for an embedding match
+            memo_size: Maximum number of raw strings whose resolution is memoized
+        """
+        self.embedder = embedder
+        self.threshold = threshold
+        self.memo_size = max(1, memo_size)
+
+        self._skills: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._memo: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.exact_matches = 0
+        self.embedding_matches = 0
+        self.unmatched = 0
+        self.memo_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def _append(self, skills: List[str], vectors: np.ndarray):
+        """Add names and their normalized vectors (caller holds the lock)"""
+        count = len(self._skills)
+        needed = count + len(skills)
+        if self._vectors is None or needed > len(self._vectors):
+            grown = np.zeros((max(needed, 2 * count, 64), vectors.shape[1]), dtype=np.float32)
+            if self._vectors is not None:
+                grown[:count] = self._vectors[:count]
+            self._vectors = grown
+        self._vectors[count:needed] = vectors
+        for skill in skills:
+            self._positions[skill_key(skill)] = len(self._skills)
+            self._skills.append(skill)
+        # Earlier misses may match the new names
+        self._memo.clear()
+
+    def add_skills(self, skills: Iterable[str], canonical: bool = False) -> int:
+        """
+        Grow the vocabulary
+
+        Args:
+            skills: Skill names
+            canonical: Add every new name as-is (the role-skill mapping). Otherwise
+                (skills observed in team data) only names that don't already resolve
+                to a vocabulary skill are added, so "K8s" doesn't become a second
+                "Kubernetes".
+
+        Returns:
+            Number of names added
+        """
+        names: Dict[str, str] = {}
+        for skill in skills:
+            if isinstance(skill, str) and skill.strip():
+                names.setdefault(skill_key(skill), " ".join(skill.split()))
+        with self._lock:
+            candidates = [name for key, name in names.items() if key not in self._positions]
+        if not canonical and candidates:
+            candidates = [name for name, match in zip(candidates, self.resolve(candidates)) if match is None]
+        if not candidates:
+            return 0
+
+        vectors = normalize_rows(self.embedder.embed_text(candidates))
+        with self._lock:
+            keep = [i for i, name in enumerate(candidates) if skill_key(name) not in self._positions]
+            self._append([candidates[i] for i in keep], vectors[keep])
+
+        logger.info(f"Added {len(keep)} skills to the skill vocabulary index ({len(self._skills)} total)")
+        return len(keep)
+
+    def _match_name(self, key: str) -> Optional[str]:
+        """Canonical skill for an exact or alias match (caller holds the lock)"""
+        position = self._positions.get(key)
+        if position is not None:
+            return self._skills[position]
+        alias = SKILL_ALIASES.get(key)
+        if alias is not None:
+            position = self._positions.get(skill_key(alias))
+            return self._skills[position] if position is not None else alias
+        return None
+
+    def resolve(self, skills: List[str]) -> List[Optional[str]]:
+        """
+        Resolve raw skill strings to canonical skills in one batch
+
+        Args:
+            skills: Raw skill strings
+
+        Returns:
+            The canonical skill for each string, or None where nothing is close enough
+        """
+        resolved: List[Optional[str]] = [None] * len(skills)
+        pending: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, skill in enumerate(skills):
+                key = skill_key(skill)
+                if not key:
+                    continue
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    resolved[i] = self._memo[key]
+                    self.memo_hits += 1
+                    continue
+                match = self._match_name(key)
+                if match is not None:
+                    resolved[i] = match
+                    self.exact_matches += 1
+                    self._remember(key, match)
+                else:
+                    pending.setdefault(key, []).append(i)
+            count = len(self._skills)
+            vocabulary = self._vectors[:count] if count else None
+            names = list(self._skills)
+
+        if not pending:
+            return resolved
+
+        keys = list(pending)
+        matches: List[Optional[str]] = [None] * len(keys)
+        if vocabulary is not None:
+            texts = [skills[pending[key][0]].strip() for key in keys]
+            scores = normalize_rows(self.embedder.embed_text(texts)) @ vocabulary.T
+            matches = [self._best_match(key, row, names) for key, row in zip(keys, scores)]
+
+        with self._lock:
+            for key, match in zip(keys, matches):
+                if match is None:
+                    self.unmatched += 1
+                else:
+                    self.embedding_matches += 1
+                self._remember(key, match)
+                for i in pending[key]:
+                    resolved[i] = match
+        return resolved
+
+    def _best_match(self, key: str, scores: np.ndarray, names: List[str]) -> Optional[str]:
+        """Highest-scoring skill at or above the threshold that key doesn't distinguish from a skill it names"""
+        words = key.split()
+        # Vocabulary skills spelled out word for word in the raw string
+        named = {" ".join(words[start:end]) for start in range(len(words)) for end in range(start + 1, len(words) + 1)}
+        named = {phrase for phrase in named if phrase in self._positions}
+
+        above = np.flatnonzero(scores >= self.threshold)
+        for position in above[np.argsort(-scores[above])]:
+            name_key = skill_key(names[position])
+            # "react" when "react native" is named, or "javascript" when only "java" is
+            if not any(other != name_key and (name_key in other or (name_key not in named and other in name_key))
+                       for other in named):
+                return names[position]
+        return None
+
+    def _remember(self, key: str, match: Optional[str]):
+        self._memo[key] = match
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    def canonicalize(self, skills: List[str]) -> List[str]:
+        """Canonical name of each skill, or the cleaned-up raw string where nothing matches"""
+        return [
+            match if match is not None else " ".join(skill.split())
+            for skill, match in zip(skills, self.resolve(skills))
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "skills": len(self._skills),
+            "threshold": self.threshold,
+            "memoized": len(self._memo),
+            "memo_hits": self.memo_hits,
+            "exact_matches": self.exact_matches,
+            "embedding_matches": self.embedding_matches,
+            "unmatched": self.unmatched
+        }
+
+
+_skill_index: Optional[SkillVocabularyIndex] = None
+# Guards _skill_index, _building and _pending_skills (not held while embedding)
+_skill_index_lock = threading.Lock()
+_building = False
+# Team skills observed before the index finished building
+_pending_skills: Set[str] = set()
+
+
+def get_skill_index() -> Optional[SkillVocabularyIndex]:
+    """Get the process-wide skill index, or None until init_skill_index has built it"""
+    return _skill_index
+
+
+def init_skill_index(team_skills: Iterable[str] = ()) -> Optional[SkillVocabularyIndex]:
+    """
+    Build the process-wide skill index (called once at startup, off the event loop)
+
+    Embeds every skill of the role-skill mapping, then adds observed team
+    skills that don't resolve to one of them. Skills observed during the
+    build are handed over when the index is published, in the same locked
+    step, so none are lost.
+
+    Args:
+        team_skills: Skills of the team data known at startup
+
+    Returns:
+        The index, or None if disabled, the build failed or another build is in progress
+    """
+    global _skill_index, _building
+    if not Config.SKILL_INDEX_ENABLED:
+        return None
+
+    with _skill_index_lock:
+        if _skill_index is not None or _building:
+            return _skill_index
+        _building = True
+
+    try:
+        from .registry import get_registry
+
+        index = SkillVocabularyIndex(get_registry().get_embedder(), Config.SKILL_MATCH_THRESHOLD,
+                                     Config.SKILL_RESOLVE_CACHE_SIZE)
+        index.add_skills(load_skill_vocabulary(Config.ROLE_SKILLS_PATH), canonical=True)
+        index.add_skills(list(team_skills))
+    except Exception as e:
+        logger.error(f"Failed to build skill vocabulary index: {e}")
+        with _skill_index_lock:
+            _building = False
+        return None
+
+    with _skill_index_lock:
+        pending = list(_pending_skills)
+        _pending_skills.clear()
+        _skill_index = index
+        _building = False
+
+    if pending:
+        observe_skills(pending)
+    return index
+
+
+def observe_skills(skills: List[str]):
+    """Add skills seen in uploaded team data to the index (or remember them until it is built)"""
+    if not Config.SKILL_INDEX_ENABLED:
+        return
+    with _skill_index_lock:
+        index = _skill_index
+        if index is None:
+            _pending_skills.update(skills)
+            return
+    try:
+        index.add_skills(skills)
+    except Exception as e:
+        logger.warning(f"Failed to add observed skills to the skill index: {e}")
@@ -1,208 +1,957 @@
 import numpy as np
 import os
 import pickle
-from typing import List, Dict, Any, Tuple, Optional
-from sklearn.metrics.pairwise import cosine_similarity
+import threading
+from typing import Callable, Iterable, List, Dict, Any, Set, Tuple, Optional, Union
+from itertools import islice
+from .content_hashes import HASHES_FILENAME, ContentHashIndex, record_hash
 from .embedder import SkillEmbedder
+from .filters import MetadataIndex, score_candidates, validate_filter
+from .index import concatenate_blocks, create_index, mmr_select, scan_blocks, top_k_rows
+from .lexical import BM25Index, fuse_scores
+from .segments import SegmentStore, SegmentView
+from config import Config
 import logging
 
 logger = logging.getLogger(__name__)
 
+LEGACY_FILENAMES = ["embeddings.pkl", "documents.pkl", "metadata.pkl"]
+# Records read per add when building the metadata and lexical indexes
+RECORD_INDEX_BATCH_ROWS = 4096
+
+
+class VectorStoreClosedError(RuntimeError):
+    """A write reached a store that was closed (its collection was reloaded or dropped)"""
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize embedding rows as contiguous float32
+
+    Args:
+        vectors: 1-D vector or 2-D matrix of embeddings
+
+    Returns:
+        2-D float32 matrix with unit-length rows (zero rows stay zero)
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms, dtype=np.float32)
+
+class StoreSnapshot:
+    """
+    One published version of a SkillVectorStore, as searches see it
+
+    Pins a segment view (rows, records and tombstones), the index version
+    covering the view's first `indexed` rows, and the metadata and lexical
+    indexes once they are built. A snapshot is never changed after it is
+    published. Writers publish a replacement, and the row-keyed indexes
+    it shares with earlier snapshots only ever grow past those
+    snapshots' rows. The epoch changes whenever rows are renumbered.
+    """
+
+    def __init__(self, epoch: int, view: SegmentView, index,
+                 metadata_index: Optional[MetadataIndex] = None, lexical_index: Optional[BM25Index] = None):
+        self.epoch = epoch
+        self.view = view
+        self.index = index
+        # The exact index scans the view itself; other index versions cover a prefix of its rows
+        self.indexed = view.count if index.index_type == "exact" else index.ntotal
+        self.metadata_index = metadata_index
+        self.lexical_index = lexical_index
+
+    def replace(self, **changes) -> "StoreSnapshot":
+        """A copy of the snapshot with some fields replaced"""
+        fields = {
+            "epoch": self.epoch,
+            "view": self.view,
+            "index": self.index,
+            "metadata_index": self.metadata_index,
+            "lexical_index": self.lexical_index
+        }
+        fields.update(changes)
+        return StoreSnapshot(**fields)
+
 class SkillVectorStore:
     """
-    Simple in-memory vector store for skill-related document retrieval using scikit-learn
+    Vector store for skill-related document retrieval
+
+    Data lives in append-only, memory-mapped segments of L2-normalized float32
+    embeddings plus offset-indexed document/metadata files. Search goes through
+    a pluggable index backend: exact brute force over the segment blocks, a
+    FAISS flat / IVF / HNSW index, or int8 / binary quantized codes rescored
+    in float32, each persisted next to the store. Filtered searches
+    resolve matching rows through an inverted metadata index and score only
+    those rows. Hybrid searches fuse dense similarity with BM25 scores from an
+    in-process lexical index, which helps exact tool names and versions.
+    A persistent content-hash index lets ingestion skip chunks and files
+    that are already stored without embedding them again.
+
+    Rows carrying a "doc_id" in their metadata form an addressable document
+    that can be deleted or upserted. Deleted rows are tombstoned and skipped
+    by every search at once; once enough of the store is tombstoned, a
+    background purge rewrites the affected segments and rebuilds the
+    row-keyed indexes.
+
+    Searches read one StoreSnapshot and take no locks, so ingestion, purges
+    and compaction never block them or change what they see halfway
+    through. Writers build the next version beside the published one
+    and swap it in atomically. Index versions are copy-on-write; rows
+    appended since the current version (fewer than
+    Config.VECTOR_INDEX_DELTA_ROWS) are scanned exactly until the next
+    version takes them in.
     """
-    
-    def __init__(self, embedder: SkillEmbedder, persist_directory: str = "data/vectorstore"):
+
+    def __init__(self, embedder: SkillEmbedder, persist_directory: str = "data/vectorstore",
+                 index_type: Optional[str] = None, write_lock: Optional[threading.RLock] = None):
         """
         Initialize the vector store
-        
+
         Args:
             embedder: SkillEmbedder instance
             persist_directory: Directory to persist vector store data
+            index_type: "exact", "flat", "ivf", "hnsw", "int8" or "binary" (defaults to Config.VECTOR_INDEX_TYPE)
+            write_lock: Lock serializing commits, shared with later instances on the same directory
         """
         self.embedder = embedder
         self.persist_directory = persist_directory
-        self.embeddings = []
-        self.documents = []
-        self.metadata = []
-        
+
         # Create directory if it doesn't exist
         os.makedirs(persist_directory, exist_ok=True)
-        
-        # Try to load existing data
-        self._load_data()
-        
-        logger.info(f"Initialized vector store at {persist_directory}")
-    
-    def _load_data(self):
-        """Load existing embeddings and documents if available"""
-        try:
-            embeddings_path = os.path.join(self.persist_directory, "embeddings.pkl")
-            docs_path = os.path.join(self.persist_directory, "documents.pkl")
-            meta_path = os.path.join(self.persist_directory, "metadata.pkl")
-            
-            if os.path.exists(embeddings_path):
-                with open(embeddings_path, "rb") as f:
-                    self.embeddings = pickle.load(f)
-                
-                with open(docs_path, "rb") as f:
-                    self.documents = pickle.load(f)
-                
-                with open(meta_path, "rb") as f:
-                    self.metadata = pickle.load(f)
-                
-                logger.info(f"Loaded existing data with {len(self.documents)} documents")
-            else:
-                logger.info("No existing data found, will create new store")
-        except Exception as e:
-            logger.warning(f"Failed to load existing data: {e}")
-    
-    def _save_data(self):
-        """Save embeddings and documents"""
+
+        # Serializes publishing snapshots (searches never take it)
+        self._snapshot_lock = threading.Lock()
+        self._snapshot: Optional[StoreSnapshot] = None
+
+        # Open existing segments (memory-mapped, so this is cheap regardless of size)
+        self._segments = SegmentStore(persist_directory, Config.VECTOR_STORE_COMPACT_THRESHOLD,
+                                      on_commit=self._on_segments_commit)
+        self._migrate_legacy_data()
+
+        # Serializes commits with each other and with background purges (never held while embedding)
+        self._write_lock = write_lock or threading.RLock()
+        self._purge_thread: Optional[threading.Thread] = None
+        self._closed = False
+        # Documents being upserted; a second upsert of the same document waits for the first
+        self._upserting: Set[str] = set()
+        self._upserts_done = threading.Condition()
+
+        # Load the persisted index and catch it up with rows added since it was saved
+        self._dimension = self._segments.dimension or self.embedder.get_embedding_dimension()
+        index = self._new_index(index_type or Config.VECTOR_INDEX_TYPE)
+        if not index.load(persist_directory, self._segments.count):
+            index.build(self._segments.read_all_vectors())
+        if index.ntotal < self._segments.count:
+            index.add(self._segments.read_vectors(index.ntotal, self._segments.count))
+        self._save_index(index)
+
+        # Content hashes of stored rows and ingested files, caught up with the segments
+        self._hashes = ContentHashIndex(os.path.join(persist_directory, HASHES_FILENAME))
+        self._sync_hashes()
+
+        # Metadata and lexical indexes are built on the first filtered or hybrid search
+        self._record_index_lock = threading.Lock()
+        self._snapshot = StoreSnapshot(0, self._segments.view, index)
+
+        logger.info(f"Initialized vector store at {persist_directory} with {self._segments.count} documents")
+
+    def _migrate_legacy_data(self):
+        """Convert a pickled store from older versions into a segment"""
+        embeddings_path = os.path.join(self.persist_directory, "embeddings.pkl")
+        if self._segments.exists() or not os.path.exists(embeddings_path):
+            return
+
         try:
-            embeddings_path = os.path.join(self.persist_directory, "embeddings.pkl")
-            docs_path = os.path.join(self.persist_directory, "documents.pkl")
-            meta_path = os.path.join(self.persist_directory, "metadata.pkl")
-            
-            with open(embeddings_path, "wb") as f:
-                pickle.dump(self.embeddings, f)
-            
-            with open(docs_path, "wb") as f:
-                pickle.dump(self.documents, f)
-            
-            with open(meta_path, "wb") as f:
-                pickle.dump(self.metadata, f)
-            
-            logger.info(f"Saved data with {len(self.documents)} documents")
+            loaded = []
+            for filename in LEGACY_FILENAMES:
+                with open(os.path.join(self.persist_directory, filename), "rb") as f:
+                    loaded.append(pickle.load(f))
+            embeddings, documents, metadata = loaded
+
+            if len(documents):
+                self._segments.append(normalize_rows(embeddings), documents, metadata)
+
+            for filename in LEGACY_FILENAMES:
+                os.remove(os.path.join(self.persist_directory, filename))
+
+            logger.info(f"Migrated {len(documents)} documents from pickled store to segments")
         except Exception as e:
-            logger.error(f"Failed to save data: {e}")
-    
-    def add_documents(self, documents: List[str], metadata: Optional[List[Dict[str, Any]]] = None):
+            logger.warning(f"Failed to migrate existing data: {e}")
+
+    def _new_index(self, index_type: str):
+        return create_index(index_type, self._dimension, self._segments.vector_blocks, self._segments.gather_vectors)
+
+    def _save_index(self, index):
+        """Persist an index version once it has grown enough since the last save"""
+        if index.needs_save():
+            try:
+                index.save(self.persist_directory)
+            except Exception as e:
+                logger.error(f"Failed to save index: {e}")
+
+    def _next_index(self, index, view: SegmentView, force: bool = False):
+        """
+        The index version to publish with a view
+
+        Rows the index doesn't cover yet are added to a new version once there
+        are Config.VECTOR_INDEX_DELTA_ROWS of them (or when forced); until
+        then searches scan them exactly.
+        """
+        if index.index_type == "exact":
+            return index
+        unindexed = view.count - index.ntotal
+        if unindexed <= 0 or (not force and unindexed < Config.VECTOR_INDEX_DELTA_ROWS):
+            return index
+
+        index = index.extended(view.read_vectors(index.ntotal, view.count))
+        self._save_index(index)
+        return index
+
+    def _on_segments_commit(self, view: SegmentView):
+        """
+        Show segment commits that keep the rows (compactions, tombstones) to searches at once
+
+        Commits that add or renumber rows are published by the writer, together
+        with the matching index versions.
+        """
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and view.count == snapshot.view.count:
+                self._snapshot = snapshot.replace(view=view)
+
+    def _publish(self, snapshot: StoreSnapshot):
+        with self._snapshot_lock:
+            self._snapshot = snapshot
+
+    def _sync_hashes(self):
+        """Hash rows appended after the hash index was last written (e.g. after a crash)"""
+        hashed = self._hashes.rows
+        count = self._segments.count
+        if hashed < count:
+            records = islice(self._segments.iter_records(), hashed, count)
+            self._hashes.add_chunks(hashed, [record_hash(document, metadata) for document, metadata in records])
+            logger.info(f"Hashed {count - hashed} rows missing from the content hash index")
+
+    @staticmethod
+    def _index_records(metadata_index: MetadataIndex, lexical_index: BM25Index, view: SegmentView, start: int):
+        """Add a view's records from row start on to the metadata and lexical indexes"""
+        records = view.iter_records(start)
+        row = start
+        while True:
+            batch = list(islice(records, RECORD_INDEX_BATCH_ROWS))
+            if not batch:
+                break
+            metadata_index.add(row, [metadata for _, metadata in batch])
+            lexical_index.add(row, [document for document, _ in batch])
+            row += len(batch)
+
+    def _get_record_indexes(self, snapshot: StoreSnapshot) -> Tuple[MetadataIndex, BM25Index]:
+        """
+        Get the metadata and lexical indexes covering a snapshot's rows
+
+        Both are built from the segments in one pass on first use (after
+        startup, or after a purge renumbered the rows) and published with
+        the current snapshot; writers then keep them up to date. Only
+        searches arriving during the build wait for it.
+        """
+        if snapshot.metadata_index is not None:
+            return snapshot.metadata_index, snapshot.lexical_index
+
+        with self._record_index_lock:
+            current = self._snapshot
+            if current.epoch == snapshot.epoch and current.metadata_index is not None:
+                return current.metadata_index, current.lexical_index
+
+            metadata_index = MetadataIndex()
+            lexical_index = BM25Index()
+            self._index_records(metadata_index, lexical_index, snapshot.view, 0)
+
+            with self._snapshot_lock:
+                current = self._snapshot
+                # After a purge the indexes still serve this snapshot, but aren't published
+                if current.epoch == snapshot.epoch:
+                    # Catch up with rows published while building
+                    self._index_records(metadata_index, lexical_index, current.view, snapshot.view.count)
+                    self._snapshot = current.replace(metadata_index=metadata_index, lexical_index=lexical_index)
+
+            logger.info(f"Built metadata and lexical indexes over {lexical_index.count} documents")
+            return metadata_index, lexical_index
+
+    def add_documents(self, documents: List[str], metadata: Optional[List[Dict[str, Any]]] = None,
+                      deduplicate: bool = True) -> int:
         """
         Add documents to the vector store
-        
+
         Args:
             documents: List of document texts
             metadata: List of metadata dictionaries for each document
+            deduplicate: Skip documents already stored (or repeated in this batch); see record_hash
+
+        Returns:
+            Number of documents added
         """
         if not documents:
-            return
-        
+            return 0
+
+        # Prepare metadata
+        if metadata is None:
+            metadata = [{"source": f"doc_{i}"} for i in range(len(documents))]
+
+        hashes = [record_hash(document, row_metadata) for document, row_metadata in zip(documents, metadata)]
+        embeddings = self._embed_new(documents, metadata, hashes, deduplicate)
+        with self._write_lock:
+            return self._append(*embeddings, deduplicate)
+
+    def _embed_new(self, documents: List[str], metadata: List[Dict[str, Any]], hashes: List[str],
+                   deduplicate: bool) -> Tuple[List[str], List[Dict[str, Any]], List[str], Optional[np.ndarray]]:
+        """Embed the documents of a batch that aren't stored yet (runs without the write lock)"""
         try:
+            if deduplicate:
+                seen = self._hashes.find_chunks(hashes)
+                keep = []
+                for i, h in enumerate(hashes):
+                    if h not in seen:
+                        seen.add(h)
+                        keep.append(i)
+                if len(keep) < len(documents):
+                    logger.info(f"Skipping {len(documents) - len(keep)} documents already in the vector store")
+                    documents = [documents[i] for i in keep]
+                    metadata = [metadata[i] for i in keep]
+                    hashes = [hashes[i] for i in keep]
+                if not documents:
+                    return documents, metadata, hashes, None
+
             # Generate embeddings
-            embeddings = self.embedder.embed_text(documents)
-            
-            # Prepare metadata
-            if metadata is None:
-                metadata = [{"source": f"doc_{i}"} for i in range(len(documents))]
-            
-            # Add to store
-            self.embeddings.extend(embeddings.tolist())
-            self.documents.extend(documents)
-            self.metadata.extend(metadata)
-            
+            return documents, metadata, hashes, normalize_rows(self.embedder.embed_text(documents))
+
+        except Exception as e:
+            logger.error(f"Failed to add documents: {e}")
+            raise
+
+    def _append(self, documents: List[str], metadata: List[Dict[str, Any]], hashes: List[str],
+                embeddings: Optional[np.ndarray], deduplicate: bool) -> int:
+        """Store embedded documents and publish a snapshot with them (caller holds the write lock)"""
+        self._check_open()
+        if deduplicate and documents:
+            # Another writer may have stored some of them while these were embedded
+            stored = self._hashes.find_chunks(hashes)
+            if stored:
+                keep = [i for i, h in enumerate(hashes) if h not in stored]
+                documents = [documents[i] for i in keep]
+                metadata = [metadata[i] for i in keep]
+                hashes = [hashes[i] for i in keep]
+                embeddings = embeddings[keep]
+        if not documents:
+            return 0
+
+        try:
+            # Durably append a new segment, then publish a snapshot that includes it
+            first_row = self._segments.append(embeddings, documents, metadata)
+            self._hashes.add_chunks(first_row, hashes)
+            index = self._next_index(self._snapshot.index, self._segments.view)
+
+            with self._snapshot_lock:
+                snapshot = self._snapshot
+                # Skip rows a concurrent first build already picked up from the segments
+                if snapshot.lexical_index is not None and snapshot.lexical_index.count <= first_row:
+                    snapshot.metadata_index.add(first_row, metadata)
+                    snapshot.lexical_index.add(first_row, documents)
+                self._snapshot = snapshot.replace(view=self._segments.view, index=index)
+
             logger.info(f"Added {len(documents)} documents to vector store")
-            
-            # Save data
-            self._save_data()
-            
+            return len(documents)
+
         except Exception as e:
             logger.error(f"Failed to add documents: {e}")
             raise
-    
-    def search(self, query: str, k: int = 5) -> List[Tuple[str, float, Dict[str, Any]]]:
+
+    def _check_open(self):
+        """Refuse writes once closed (caller holds the write lock)"""
+        if self._closed:
+            raise VectorStoreClosedError(f"Vector store at {self.persist_directory} was closed; "
+                                         f"its collection was reloaded or dropped")
+
+    def get_ingested_document(self, document_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previously ingested file
+
+        Args:
+            document_hash: file_hash of the raw file
+
+        Returns:
+            {"source", "chunks"} recorded when it was ingested, or None
+        """
+        return self._hashes.get_document(document_hash)
+
+    def record_ingested_document(self, document_hash: str, source: str, chunks: int):
+        """Mark a file as the ingested version of source, so re-uploads of it can be skipped"""
+        with self._write_lock:
+            self._check_open()
+            self._hashes.add_document(document_hash, source, chunks)
+
+    def _document_rows(self, doc_id: str) -> np.ndarray:
+        """Live rows of an addressable document (caller holds the write lock)"""
+        snapshot = self._snapshot
+        rows = self._get_record_indexes(snapshot)[0].match({"doc_id": doc_id})
+        return self._live_rows(snapshot.view, rows)
+
+    @staticmethod
+    def _live_rows(view: SegmentView, rows: np.ndarray) -> np.ndarray:
+        """Sorted rows that exist in a view and aren't tombstoned"""
+        rows = rows[:np.searchsorted(rows, view.count)]
+        return rows[~view.is_deleted(rows)]
+
+    def _delete_rows(self, rows: np.ndarray) -> int:
+        """Tombstone rows and forget their hashes (caller holds the write lock)"""
+        if len(rows) == 0:
+            return 0
+        deleted = self._segments.delete_rows(rows)
+        self._hashes.remove_rows(rows)
+        self.maybe_purge()
+        return deleted
+
+    def delete(self, doc_id: str) -> int:
+        """
+        Delete every row of a document
+
+        Rows are tombstoned, so searches stop returning them immediately;
+        their space is reclaimed by a later purge.
+
+        Args:
+            doc_id: The "doc_id" the rows were added with
+
+        Returns:
+            Number of rows deleted
+        """
+        with self._write_lock:
+            self._check_open()
+            deleted = self._delete_rows(self._document_rows(doc_id))
+            self._hashes.remove_documents(doc_id)
+
+        logger.info(f"Deleted document {doc_id} ({deleted} rows)")
+        return deleted
+
+    def upsert(self, doc_id: str, text: Union[str, List[str]],
+               metadata: Optional[Union[Dict[str, Any], List[Dict[str, Any]]]] = None) -> Dict[str, int]:
+        """
+        Insert or replace a document
+
+        Args:
+            doc_id: Stable document id
+            text: Document text, or its chunks
+            metadata: Metadata shared by every chunk, or one dictionary per chunk
+
+        Returns:
+            Counts of rows "added", "skipped" (unchanged) and "removed"
+        """
+        texts = [text] if isinstance(text, str) else list(text)
+        if metadata is None or isinstance(metadata, dict):
+            metadata = [dict(metadata or {}) for _ in texts]
+        if len(metadata) != len(texts):
+            raise ValueError(f"Got {len(metadata)} metadata entries for {len(texts)} chunks")
+        return self.upsert_chunks(doc_id, zip(texts, metadata))
+
+    def upsert_chunks(self, doc_id: str, chunks: Iterable[Tuple[str, Dict[str, Any]]],
+                      batch_size: int = 0, progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+        """
+        Replace a document with a stream of chunks
+
+        Chunks are consumed lazily and embedded in batches, without the
+        write lock; it is only held while each embedded batch is committed.
+        Chunks identical to a current row of the document (same text and
+        metadata apart from the chunk ordinal) keep that row without being
+        embedded again; rows the new version no longer contains are
+        tombstoned at the end, so the cost is proportional to what changed.
+        Upserts of the same document run one at a time.
+
+        Args:
+            doc_id: Stable document id, stored as metadata["doc_id"]
+            chunks: (text, metadata) pairs
+            batch_size: Chunks per embedding call (defaults to Config.INGEST_BATCH_SIZE)
+            progress: Called after each batch with the rows added and skipped so far
+
+        Returns:
+            Counts of rows "added", "skipped" (unchanged) and "removed"
+        """
+        batch_size = batch_size or Config.INGEST_BATCH_SIZE
+        with self._upserts_done:
+            while doc_id in self._upserting:
+                self._upserts_done.wait()
+            self._upserting.add(doc_id)
+        try:
+            current = set()
+            added = 0
+            skipped = 0
+
+            iterator = iter(chunks)
+            while True:
+                batch = list(islice(iterator, batch_size))
+                if not batch:
+                    break
+                texts = [text for text, _ in batch]
+                metadata = [{**chunk_metadata, "doc_id": doc_id} for _, chunk_metadata in batch]
+                hashes = [record_hash(text, row_metadata) for text, row_metadata in zip(texts, metadata)]
+                current.update(hashes)
+                embeddings = self._embed_new(texts, metadata, hashes, True)
+                with self._write_lock:
+                    batch_added = self._append(*embeddings, True)
+                added += batch_added
+                skipped += len(batch) - batch_added
+                if progress is not None:
+                    progress(added, skipped)
+
+            # Row ids are read at the end, since a purge may renumber them while batches are embedded
+            with self._write_lock:
+                self._check_open()
+                rows = self._document_rows(doc_id)
+                row_hashes = self._hashes.hashes_for_rows(rows)
+                stale = np.array([row for row in rows if row_hashes.get(int(row)) not in current], dtype=np.int64)
+                removed = self._delete_rows(stale)
+        finally:
+            with self._upserts_done:
+                self._upserting.discard(doc_id)
+                self._upserts_done.notify_all()
+
+        logger.info(f"Upserted document {doc_id}: {added} added, {skipped} unchanged, {removed} removed")
+        return {"added": added, "skipped": skipped, "removed": removed}
+
+    def maybe_purge(self):
+        """Start a background purge once Config.VECTOR_STORE_PURGE_RATIO of the rows are tombstoned"""
+        deleted = len(self._segments.deleted)
+        if deleted == 0 or deleted < Config.VECTOR_STORE_PURGE_RATIO * self._segments.count:
+            return
+        if self._purge_thread is not None and self._purge_thread.is_alive():
+            return
+
+        self._purge_thread = threading.Thread(target=self.purge, name="vectorstore-purge", daemon=True)
+        self._purge_thread.start()
+
+    def purge(self) -> bool:
+        """
+        Reclaim the space of tombstoned rows
+
+        Only segments holding tombstones are rewritten, but purging renumbers
+        later rows, so the index is rebuilt over the new segments before they
+        go live and the hash and record indexes are rebuilt after. Searches
+        keep using the previous snapshot until the new segments and index
+        are published together. Row-keyed files on disk are dropped before
+        the switch, so a crash in between leads to a rebuild rather than
+        stale row ids.
+
+        Returns:
+            True if tombstones were purged
+        """
+        try:
+            with self._write_lock:
+                if self._closed or len(self._segments.deleted) == 0:
+                    return False
+
+                self._segments.wait_for_compaction()
+                index_type = self._snapshot.index.index_type
+                segments = self._segments.rewrite_without_deleted()
+                index = self._new_index(index_type)
+                index.build(concatenate_blocks([segment.embeddings for segment in segments]))
+
+                self._new_index(index_type).save(self.persist_directory)
+                self._hashes.reset_chunks()
+                self._segments.commit_rewrite(segments)
+                self._publish(StoreSnapshot(self._snapshot.epoch + 1, self._segments.view, index))
+
+                index.save(self.persist_directory)
+                self._sync_hashes()
+
+            logger.info(f"Purged tombstones, {self._segments.count} rows remain")
+            return True
+        except Exception as e:
+            logger.error(f"Purge failed: {e}")
+            return False
+
+    def wait_for_purge(self):
+        if self._purge_thread is not None:
+            self._purge_thread.join()
+
+    def close(self):
+        """
+        Refuse further writes and wait for background purge and compaction
+
+        Afterwards the directory can be reopened by a new instance; writes
+        still holding this one fail with VectorStoreClosedError.
+        """
+        with self._write_lock:
+            self._closed = True
+            self._segments.wait_for_compaction()
+        # A purge waiting for the lock sees the store closed and gives up
+        self.wait_for_purge()
+
+    def flush(self):
+        """Wait for background compaction and purge, then index every row and persist the index in full"""
+        self.wait_for_purge()
+        with self._write_lock:
+            self._check_open()
+            self._segments.wait_for_compaction()
+            index = self._next_index(self._snapshot.index, self._segments.view, force=True)
+            with self._snapshot_lock:
+                self._snapshot = self._snapshot.replace(view=self._segments.view, index=index)
+            index.save(self.persist_directory)
+
+    def search(self, query: str, k: int = 5, filters: Optional[Dict[str, Any]] = None,
+               hybrid: Optional[bool] = None, mmr: bool = False, mmr_lambda: Optional[float] = None,
+               mmr_candidates: Optional[int] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
         """
         Search for similar documents
-        
+
         Args:
             query: Search query
             k: Number of results to return
-            
+            filters: Optional metadata filter, e.g. {"source": "guide.pdf", "page": {"$lte": 3}}
+            hybrid: Fuse BM25 with dense scores (defaults to Config.VECTOR_HYBRID_SEARCH)
+            mmr: Diversify results with maximal marginal relevance (see search_groups)
+            mmr_lambda: Relevance / novelty trade-off (defaults to Config.VECTOR_MMR_LAMBDA)
+            mmr_candidates: Candidates MMR chooses from (defaults to k * Config.VECTOR_MMR_CANDIDATE_FACTOR)
+
         Returns:
             List of tuples: (document_text, similarity_score, metadata)
         """
+        return self.search_groups([[query]], k, filters, hybrid, mmr, mmr_lambda, mmr_candidates)[0]
+
+    def search_many(self, queries: List[str], k: Union[int, List[int]] = 5, filters: Optional[Dict[str, Any]] = None,
+                    hybrid: Optional[bool] = None, mmr: bool = False, mmr_lambda: Optional[float] = None,
+                    mmr_candidates: Optional[int] = None) -> List[List[Tuple[str, float, Dict[str, Any]]]]:
+        """
+        Search for several queries at once
+
+        All queries are embedded in one model call and scored against the
+        index in one batch, so a request that needs several retrievals pays
+        for roughly one embedding pass and one matrix product.
+
+        With filters, only rows whose metadata matches are scored, so the cost
+        is proportional to the matching subset rather than the whole store.
+        In hybrid mode, dense and BM25 candidates are pooled and re-ranked by
+        a weighted blend of cosine similarity and max-normalized BM25 score.
+
+        Args:
+            queries: Search queries
+            k: Number of results to return, either shared or one per query
+            filters: Optional metadata filter applied to every query (see filters.validate_filter)
+            hybrid: Fuse BM25 with dense scores (defaults to Config.VECTOR_HYBRID_SEARCH)
+            mmr: Diversify each query's results with maximal marginal relevance (see search_groups)
+            mmr_lambda: Relevance / novelty trade-off (defaults to Config.VECTOR_MMR_LAMBDA)
+            mmr_candidates: Candidates MMR chooses from (defaults to k * Config.VECTOR_MMR_CANDIDATE_FACTOR)
+
+        Returns:
+            One list of (document_text, similarity_score, metadata) tuples per query
+
+        Raises:
+            ValueError: If the filter is malformed
+        """
+        return self.search_groups([[query] for query in queries], k, filters, hybrid, mmr, mmr_lambda, mmr_candidates)
+
+    def search_groups(self, groups: List[List[str]], k: Union[int, List[int]] = 5,
+                      filters: Optional[Dict[str, Any]] = None, hybrid: Optional[bool] = None,
+                      mmr: bool = False, mmr_lambda: Optional[float] = None,
+                      mmr_candidates: Optional[int] = None) -> List[List[Tuple[str, float, Dict[str, Any]]]]:
+        """
+        Search groups of queries, returning one merged result list per group
+
+        Every query of every group is embedded and scored in one batch (as in
+        search_many). The candidates of a group's queries are then pooled,
+        each row keeping its best score, so a group answers "context for any
+        of these queries" without the same row appearing twice.
+
+        With mmr, each query first retrieves a wider candidate pool and the
+        group's k results are picked by maximal marginal relevance
+        (index.mmr_select) over the pooled candidates' embeddings, trading
+        relevance against similarity to what was already picked. This drops
+        near-duplicates such as overlapping chunks of one passage, so a fixed
+        context budget covers more distinct information. Scores returned are
+        still the rows' relevance.
+
+        Args:
+            groups: Lists of queries; each list produces one result list
+            k: Number of results to return, either shared or one per group
+            filters: Optional metadata filter applied to every query (see filters.validate_filter)
+            hybrid: Fuse BM25 with dense scores (defaults to Config.VECTOR_HYBRID_SEARCH)
+            mmr: Diversify results with maximal marginal relevance
+            mmr_lambda: 1.0 ranks by relevance only, 0.0 by novelty only (defaults to Config.VECTOR_MMR_LAMBDA)
+            mmr_candidates: Candidates per query MMR chooses from (defaults to k * Config.VECTOR_MMR_CANDIDATE_FACTOR)
+
+        Returns:
+            One list of (document_text, similarity_score, metadata) tuples per group
+
+        Raises:
+            ValueError: If the filter is malformed
+        """
+        if not groups:
+            return []
+
+        ks = list(k) if isinstance(k, (list, tuple)) else [k] * len(groups)
+        if len(ks) != len(groups):
+            raise ValueError(f"Got {len(ks)} values of k for {len(groups)} searches")
+        if filters:
+            validate_filter(filters)
+        if hybrid is None:
+            hybrid = Config.VECTOR_HYBRID_SEARCH
+        if mmr_lambda is None:
+            mmr_lambda = Config.VECTOR_MMR_LAMBDA
+
         try:
-            if not self.embeddings:
-                return []
-            
-            # Generate query embedding
-            query_embedding = self.embedder.embed_text(query)
-            
-            # Calculate similarities
-            similarities = cosine_similarity([query_embedding], self.embeddings)[0]
-            
-            # Get top k results
-            top_indices = np.argsort(similarities)[::-1][:k]
-            
+            # Everything below reads this one snapshot, however writers move on meanwhile
+            snapshot = self._snapshot
+            view = snapshot.view
+            queries = [query for group in groups for query in group]
+            if view.live_count == 0 or max(ks) <= 0 or not queries:
+                return [[] for _ in groups]
+
+            # Generate all query embeddings in one forward pass
+            query_embeddings = normalize_rows(self.embedder.embed_text(queries))
+
+            # MMR picks k from a wider pool; hybrid ranking re-scores a wider pool of dense candidates
+            k_max = max(ks)
+            pool = max(mmr_candidates or k_max * Config.VECTOR_MMR_CANDIDATE_FACTOR, k_max) if mmr else k_max
+            candidates = pool * Config.VECTOR_HYBRID_CANDIDATE_FACTOR if hybrid else pool
+
+            # Rows are unit length, so inner product is the cosine similarity
+            rows = None
+            if filters:
+                rows = self._live_rows(view, self._get_record_indexes(snapshot)[0].match(filters))
+                scores, ids = score_candidates(query_embeddings, view.gather_vectors(rows), rows, candidates)
+            else:
+                scores, ids = self._search_live(snapshot, query_embeddings, candidates)
+
+            if hybrid:
+                scores, ids = self._fuse_lexical(snapshot, queries, query_embeddings, ids, pool, candidates, rows)
+
+            if any(len(group) != 1 for group in groups):
+                scores, ids = self._merge_groups(groups, scores, ids)
+            if mmr:
+                scores, ids = self._diversify(view, scores, ids, k_max, mmr_lambda)
+
             results = []
-            for idx in top_indices:
-                if similarities[idx] > 0:  # Only include positive similarities
-                    results.append((
-                        self.documents[idx],
-                        float(similarities[idx]),
-                        self.metadata[idx] if idx < len(self.metadata) else {}
-                    ))
-            
-            logger.debug(f"Search returned {len(results)} results for query: {query}")
+            for group_scores, group_ids, group_k in zip(scores, ids, ks):
+                group_results = []
+                for score, idx in zip(group_scores[:group_k], group_ids[:group_k]):
+                    if idx >= 0 and score > 0:  # Only include positive similarities
+                        document, metadata = view.get_record(int(idx))
+                        group_results.append((document, float(score), metadata))
+                results.append(group_results)
+
+            logger.debug(f"Batched search returned {sum(len(r) for r in results)} results for {len(queries)} queries")
             return results
-            
+
         except Exception as e:
             logger.error(f"Search failed: {e}")
-            return []
-    
-    def search_skills(self, skills: List[str], k: int = 5) -> List[Tuple[str, float, Dict[str, Any]]]:
+            return [[] for _ in groups]
+
+    @staticmethod
+    def _merge_groups(groups: List[List[str]], scores: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pool per-query results into one ranking per group, keeping each row's best score
+
+        Returns:
+            (scores, ids) matrices with one row per group, best first, padded with -inf / -1
+        """
+        merged = []
+        start = 0
+        for group in groups:
+            group_ids = ids[start:start + len(group)].ravel()
+            group_scores = scores[start:start + len(group)].ravel()
+            start += len(group)
+
+            keep = group_ids >= 0
+            group_ids, group_scores = group_ids[keep], group_scores[keep]
+            # Sort by row, best score first, and keep each row's first occurrence
+            order = np.lexsort((-group_scores, group_ids))
+            group_ids, group_scores = group_ids[order], group_scores[order]
+            first = np.ones(len(group_ids), dtype=bool)
+            first[1:] = group_ids[1:] != group_ids[:-1]
+            group_ids, group_scores = group_ids[first], group_scores[first]
+
+            best = np.argsort(-group_scores, kind="stable")
+            merged.append((group_scores[best], group_ids[best]))
+
+        width = max(1, max(len(group_ids) for _, group_ids in merged))
+        merged_scores = np.full((len(groups), width), -np.inf, dtype=np.float32)
+        merged_ids = np.full((len(groups), width), -1, dtype=np.int64)
+        for i, (group_scores, group_ids) in enumerate(merged):
+            merged_scores[i, :len(group_ids)] = group_scores
+            merged_ids[i, :len(group_ids)] = group_ids
+        return merged_scores, merged_ids
+
+    def _diversify(self, view: SegmentView, scores: np.ndarray, ids: np.ndarray, k: int,
+                   lambda_mult: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Re-rank each row of candidates by maximal marginal relevance
+
+        Returns:
+            (scores, ids) matrices of shape (len(scores), k) in pick order, padded with -inf / -1
+        """
+        valid = ids >= 0
+        relevance = np.where(valid, scores, -np.inf).astype(np.float32)
+
+        # Gather every candidate's embedding in one pass over the segments
+        unique_rows, positions = np.unique(ids[valid], return_inverse=True)
+        vectors = np.zeros(ids.shape + (self._dimension,), dtype=np.float32)
+        vectors[valid] = view.gather_vectors(unique_rows)[positions]
+
+        picked = mmr_select(vectors, relevance, k, lambda_mult)
+        found = picked >= 0
+        columns = np.where(found, picked, 0)
+        picked_scores = np.where(found, np.take_along_axis(scores, columns, axis=1), -np.inf)
+        picked_ids = np.where(found, np.take_along_axis(ids, columns, axis=1), -1)
+        return picked_scores, picked_ids
+
+    @staticmethod
+    def _search_index(snapshot: StoreSnapshot, query_embeddings: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k rows of a snapshot: its index version, plus an exact scan of rows that version doesn't cover
+
+        Returns:
+            (scores, ids) matrices of shape (len(queries), k), padded with -inf / -1
+        """
+        view = snapshot.view
+        scores, ids = snapshot.index.search(query_embeddings, k, view)
+        if snapshot.indexed >= view.count:
+            return scores, ids
+
+        tail_scores, tail_ids = scan_blocks(query_embeddings, k, view.vector_blocks(snapshot.indexed), snapshot.indexed)
+        scores = np.concatenate([scores, tail_scores], axis=1)
+        ids = np.concatenate([ids, tail_ids], axis=1)
+        best = top_k_rows(scores, k)
+        return np.take_along_axis(scores, best, axis=1), np.take_along_axis(ids, best, axis=1)
+
+    def _search_live(self, snapshot: StoreSnapshot, query_embeddings: np.ndarray,
+                     k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k rows from the index, skipping tombstones
+
+        The index still holds tombstoned rows, so the search is widened until
+        every query has k live results or the index has nothing more to give.
+
+        Returns:
+            (scores, ids) matrices of shape (len(queries), k), padded with -inf / -1
+        """
+        deleted = snapshot.view.deleted
+        if len(deleted) == 0:
+            return self._search_index(snapshot, query_embeddings, k)
+
+        fetch = k + min(len(deleted), k)
+        while True:
+            scores, ids = self._search_index(snapshot, query_embeddings, fetch)
+            live = (ids >= 0) & ~np.isin(ids, deleted)
+            exhausted = (ids >= 0).sum(axis=1).min() < fetch or fetch >= snapshot.view.count
+            if exhausted or live.sum(axis=1).min() >= k:
+                break
+            fetch *= 2
+
+        live_scores = np.full((len(ids), k), -np.inf, dtype=np.float32)
+        live_ids = np.full((len(ids), k), -1, dtype=np.int64)
+        for i in range(len(ids)):
+            keep_scores, keep_ids = scores[i][live[i]][:k], ids[i][live[i]][:k]
+            live_scores[i, :len(keep_ids)] = keep_scores
+            live_ids[i, :len(keep_ids)] = keep_ids
+        return live_scores, live_ids
+
+    def _fuse_lexical(self, snapshot: StoreSnapshot, queries: List[str], query_embeddings: np.ndarray,
+                      dense_ids: np.ndarray, k: int, candidates: int,
+                      rows: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Re-rank dense candidates pooled with BM25 candidates by fused score
+
+        Args:
+            snapshot: Snapshot the search reads
+            queries: Query texts
+            query_embeddings: Normalized query matrix
+            dense_ids: Dense candidate row ids per query (-1 padded)
+            k: Number of results per query
+            candidates: Number of BM25 candidates per query
+            rows: Rows allowed by a metadata filter, or None for all
+
+        Returns:
+            (scores, ids) matrices of shape (len(queries), k), padded with -inf / -1
+        """
+        view = snapshot.view
+        lexical_index = self._get_record_indexes(snapshot)[1]
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+
+        for i, (query, query_embedding) in enumerate(zip(queries, query_embeddings)):
+            lexical_rows, lexical_scores = lexical_index.search(query, candidates, rows, view.deleted, view.count)
+            pool = np.union1d(dense_ids[i][dense_ids[i] >= 0], lexical_rows)
+            if len(pool) == 0:
+                continue
+
+            # Exact cosine and BM25 for every pooled row, so neither side is scored as zero by omission
+            dense_scores = view.gather_vectors(pool) @ query_embedding
+            lexical_max = float(lexical_scores[0]) if len(lexical_scores) else 0.0
+            fused = fuse_scores(dense_scores, lexical_index.score(query, pool), lexical_max,
+                                Config.VECTOR_HYBRID_LEXICAL_WEIGHT)
+
+            top = top_k_rows(fused[None, :], k)[0]
+            scores[i, :len(top)] = fused[top]
+            ids[i, :len(top)] = pool[top]
+
+        return scores, ids
+
+    def search_skills(self, skills: List[str], k: int = 5,
+                      hybrid: Optional[bool] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
         """
         Search for documents related to specific skills
-        
+
         Args:
             skills: List of skills to search for
             k: Number of results to return
-            
+            hybrid: Fuse BM25 with dense scores (defaults to Config.VECTOR_HYBRID_SEARCH)
+
         Returns:
             List of tuples: (document_text, similarity_score, metadata)
         """
         query = f"skills: {', '.join(skills)}"
-        return self.search(query, k)
-    
-    def search_role_skills(self, role: str, skills: List[str], k: int = 5) -> List[Tuple[str, float, Dict[str, Any]]]:
+        return self.search(query, k, hybrid=hybrid)
+
+    def search_role_skills(self, role: str, skills: List[str], k: int = 5,
+                           hybrid: Optional[bool] = None) -> List[Tuple[str, float, Dict[str, Any]]]:
         """
         Search for documents related to role and skills combination
-        
+
         Args:
             role: Job role
             skills: List of skills
             k: Number of results to return
-            
+            hybrid: Fuse BM25 with dense scores (defaults to Config.VECTOR_HYBRID_SEARCH)
+
         Returns:
             List of tuples: (document_text, similarity_score, metadata)
         """
         query = f"{role} role with skills: {', '.join(skills)}"
-        return self.search(query, k)
-    
+        return self.search(query, k, hybrid=hybrid)
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Get vector store statistics
-        
+
         Returns:
             Dictionary with stats
         """
+        snapshot = self._snapshot
         return {
-            "total_documents": len(self.documents),
-            "embedding_dimension": self.embedder.get_embedding_dimension()
+            "total_documents": snapshot.view.live_count,
+            "deleted_documents": len(snapshot.view.deleted),
+            "embedding_dimension": self.embedder.get_embedding_dimension(),
+            "index_type": snapshot.index.index_type,
+            "unindexed_rows": snapshot.view.count - snapshot.indexed,
+            "segments": len(snapshot.view.segments),
+            "content_hashes": self._hashes.get_stats(),
+            "lexical_index": snapshot.lexical_index.get_stats() if snapshot.lexical_index is not None else None
         }
-    
+
     def clear(self):
         """Clear all documents from the vector store"""
-        self.embeddings = []
-        self.documents = []
-        self.metadata = []
-        
-        # Remove saved files
-        for filename in ["embeddings.pkl", "documents.pkl", "metadata.pkl"]:
-            try:
-                os.remove(os.path.join(self.persist_directory, filename))
-            except FileNotFoundError:
-                pass
-        
-        logger.info("Cleared vector store") 
\ No newline at end of file
+        with self._write_lock:
+            self._check_open()
+            self._segments.clear()
+            index = self._new_index(self._snapshot.index.index_type)
+            index.save(self.persist_directory)
+            self._hashes.clear()
+            self._publish(StoreSnapshot(self._snapshot.epoch + 1, self._segments.view, index))
+
+        logger.info("Cleared vector store")